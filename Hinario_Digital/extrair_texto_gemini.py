@@ -1,6 +1,11 @@
 import json
 import re
 import os
+import sys
+
+# Tokenizador compartilhado com o player (compartilhado/silabas.py)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # raiz do repositório (compartilhado/)
+from compartilhado.silabas import tokenizar
 
 # ===================== CAMINHOS =====================
 BASE_PATH = r'C:\Users\psoares\pyNestle\Private\Hinario_Digital'
@@ -100,35 +105,8 @@ def separar_estrofes_e_coro():
 
 # ===================== 3. PROCESSAMENTO DE TEXTO =====================
 def processar_linha_texto(texto):
-    # Regex: __ (pl), '' (rc), _ (pc), " (rl), - (hifen), espaços
-    padrao = r'(__|\'\'|[_"\-]|\s+)'
-    tokens_raw = re.split(padrao, texto)
-    
-    lista_final = []
-    
-    for token in tokens_raw:
-        if not token: continue
-        token_limpo = token.strip()
-        
-        if token_limpo == '': pass
-        elif token == '-':
-            if lista_final: lista_final[-1] += "-"
-            else: lista_final.append("-")
-        else:
-            simbolos_pausa = ["''", '"', "_", "__"]
-            if token_limpo in simbolos_pausa:
-                lista_final.append(token_limpo)
-            else:
-                # Limpa pontuação estranha, permite , . ; : ! ? ~
-                limpo = re.sub(r'[^\w\',~\-.;:!?]', '', token)
-                eh_pontuacao = token_limpo in [",", ";", ".", "!", "?", ":"]
-                
-                if eh_pontuacao:
-                    if lista_final and lista_final[-1] not in simbolos_pausa:
-                        lista_final[-1] += token_limpo
-                elif limpo or token_limpo: 
-                    lista_final.append(token)
-    return lista_final
+    # __ (pl), '' (rc), _ (pc), " (rl), - (hifen); pontuação solta é colada na sílaba anterior
+    return [t.texto for t in tokenizar(texto, colar_pontuacao=True)]
 
 # ===================== 4. SINCRONIZAÇÃO INTELIGENTE =====================
 def sincronizar(dicionario_ritmos, blocos_texto):
@@ -1,7 +1,11 @@
 import os
 import re
+import sys
 import pytesseract
-from PIL import Image, ImageEnhance, ImageDraw, ImageFilter
+from PIL import Image, ImageDraw, ImageFilter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # raiz do repositório (compartilhado/)
+from compartilhado.enhance import contrast_lut, threshold_lut, gray_mean
 
 # ===================== CONFIGURAÇÃO =====================
 NUMERO = 1
@@ -18,10 +22,9 @@ def melhorar_imagem_para_ocr(img_crop):
     fator_aumento = 3
     w, h = img.size
     img = img.resize((w * fator_aumento, h * fator_aumento), Image.Resampling.LANCZOS)
-    enhancer = ImageEnhance.Contrast(img)
-    img = enhancer.enhance(2.0)
-    limiar = 160 
-    img = img.point(lambda p: 0 if p < limiar else 255)
+    # Contraste 2.0 + limiar 160 numa tabela so (uma passada no buffer)
+    limiar = 160
+    img = img.point(list(threshold_lut(contrast_lut(gray_mean(img), 2.0), limiar)))
     img = img.filter(ImageFilter.SHARPEN)
     return img
 
@@ -6,6 +6,8 @@ class ImageProcessor:
         self.beta = 0               # brilho
         self.zoom = 1.0             # zoom
         self.inverted = False       # inversão de cores
+        self._lut_key = None        # (alpha, beta, inverted) da tabela atual
+        self._lut = None
 
     def load_image(self, path):
         import cv2
@@ -17,12 +19,8 @@ class ImageProcessor:
         if self.original_gray is None:
             return None
         import cv2
-        import numpy as np
-        # aplicar brilho e contraste
-        adjusted = cv2.convertScaleAbs(self.original_gray, alpha=self.alpha, beta=self.beta)
-        # inverter cores
-        if self.inverted:
-            adjusted = cv2.bitwise_not(adjusted)
+        # brilho, contraste e inversão numa tabela só: uma passada, sem imagem intermediária
+        adjusted = cv2.LUT(self.original_gray, self.get_lut())
         # aplicar zoom
         if self.zoom != 1.0:
             h, w = adjusted.shape[:2]
@@ -31,6 +29,17 @@ class ImageProcessor:
         self.image = adjusted
         return adjusted
 
+    def get_lut(self):
+        """Tabela de 256 valores equivalente a convertScaleAbs(alpha, beta) + bitwise_not (se invertido)"""
+        key = (self.alpha, self.beta, self.inverted)
+        if key != self._lut_key:
+            import numpy as np
+            lut = np.clip(np.rint(np.abs(np.arange(256, dtype=np.float32) * self.alpha + self.beta)), 0, 255).astype(np.uint8)
+            if self.inverted:
+                lut = 255 - lut
+            self._lut, self._lut_key = lut, key
+        return self._lut
+
     # --- Setters ---
     def set_brightness(self, val):
         self.beta = val
@@ -130,25 +130,9 @@ class ConfigManager:
 config_manager = ConfigManager()
 
 # --- TOKENIZAÇÃO ---
-def _get_syllable_tokens(text_line):
-    # Regex captura: __ (pl), '' (rc), _ (pc), " (rl), - (hifen)
-    padrao = r'(__|\'\'|[_"\-]|\s+)'
-    tokens_raw = re.split(padrao, text_line)
-    lista_final = []
-    for token in tokens_raw:
-        if not token: continue
-        token_limpo = token.strip()
-        if token_limpo == '': pass
-        elif token == '-':
-            if lista_final: lista_final[-1] += "-"
-            else: lista_final.append("-")
-        else:
-            simbolos_pausa = ["''", '"', "_", "__"]
-            if token_limpo in simbolos_pausa: lista_final.append(token_limpo)
-            else:
-                limpo = re.sub(r'[^\w\',~\-.;:!?]', '', token) 
-                if limpo or token_limpo in [",", ";", ".", "!", "?", ":"]: lista_final.append(token)
-    return lista_final
+# Mesmo tokenizador do player novo (compartilhado/silabas.py)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # raiz do repositório (compartilhado/)
+from compartilhado.silabas import get_syllable_tokens as _get_syllable_tokens
 
 def ler_arquivo_hino(num):
     for f in [f"hino_{num:03d}.json", f"hino_{num}.json"]:
@@ -0,0 +1,104 @@
+import time
+import logging
+from PySide6.QtCore import QObject, QTimer, Qt, Signal
+
+NS_POR_MS = 1_000_000
+TOLERANCIA_NS = NS_POR_MS   # acordou até 1ms antes do prazo: considera no tempo
+
+log = logging.getLogger(__name__)
+
+class AgendadorKaraoke(QObject):
+    """ Relógio único da execução: sílabas e batidas do metrônomo são agendadas contra prazos
+        absolutos em time.monotonic_ns(). Atraso de um disparo não se acumula nos seguintes.
+        O jitter e a deriva medidos vão para o log ao fim de cada estrofe e ao parar. """
+    silaba = Signal(int)    # índice da sílaba que começa agora
+    batida = Signal()
+    fim = Signal()          # terminou a duração da última sílaba
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.timer = QTimer(self); self.timer.setSingleShot(True); self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.timeout.connect(self._tick)
+        self.prazos = []        # início absoluto (ns) de cada sílaba; o último item é o fim da estrofe
+        self.proxima = 0        # próxima sílaba a disparar
+        self.proxima_batida = 0; self.periodo_batida = 0
+        self.rodando = False; self.pausado = False; self.t_pausa = 0
+        self.atrasos = []       # atraso medido (ns) de cada sílaba disparada
+
+    def ativo(self): return self.rodando and not self.pausado
+
+    def iniciar(self, duracoes_ms, bpm):
+        agora = time.monotonic_ns()
+        self.prazos = [agora]
+        for ms in duracoes_ms: self.prazos.append(self.prazos[-1] + int(ms * NS_POR_MS))
+        self.proxima = 0; self.atrasos = []
+        self.periodo_batida = int(60000 / bpm * NS_POR_MS); self.proxima_batida = agora
+        self.rodando = True; self.pausado = False
+        self._tick()
+
+    def parar(self):
+        if self.rodando: self._registrar("parada")
+        self.timer.stop(); self.rodando = False; self.pausado = False
+
+    def pausar(self):
+        if not self.ativo(): return
+        self.timer.stop(); self.pausado = True; self.t_pausa = time.monotonic_ns()
+
+    def continuar(self):
+        if not (self.rodando and self.pausado): return
+        delta = time.monotonic_ns() - self.t_pausa
+        self.prazos = [p + delta for p in self.prazos]; self.proxima_batida += delta
+        self.pausado = False; self._agendar()
+
+    def mudar_andamento(self, duracoes_ms, bpm):
+        """ Reescala o restante da estrofe: a sílaba atual mantém a fração já cantada. """
+        if not self.rodando: return
+        agora = self.t_pausa if self.pausado else time.monotonic_ns()
+        atual = self.proxima - 1
+        if 0 <= atual < len(duracoes_ms):
+            ini, fim = self.prazos[atual], self.prazos[atual + 1]
+            fracao = (agora - ini) / (fim - ini) if fim > ini else 1.0
+            novo_fim = agora + int(duracoes_ms[atual] * NS_POR_MS * max(0.0, 1.0 - fracao))
+            self.prazos[atual + 1:] = [novo_fim]
+            for ms in duracoes_ms[atual + 1:]: self.prazos.append(self.prazos[-1] + int(ms * NS_POR_MS))
+        novo_periodo = int(60000 / bpm * NS_POR_MS)
+        if self.periodo_batida > 0:
+            restante = max(0, self.proxima_batida - agora)
+            self.proxima_batida = agora + restante * novo_periodo // self.periodo_batida
+        self.periodo_batida = novo_periodo
+        if not self.pausado: self._agendar()
+
+    def _tick(self):
+        if not self.ativo(): return
+        agora = time.monotonic_ns()
+        if self.proxima_batida - TOLERANCIA_NS <= agora:
+            # Batidas perdidas (ex.: janela ocupada) não piscam em rajada: pula para a seguinte
+            while self.proxima_batida - TOLERANCIA_NS <= agora: self.proxima_batida += self.periodo_batida
+            self.batida.emit()
+            if not self.ativo(): return
+        n = len(self.prazos) - 1
+        if self.proxima <= n and self.prazos[self.proxima] - TOLERANCIA_NS <= agora:
+            # Se mais de uma sílaba venceu, só a mais recente é destacada
+            while self.proxima < n and self.prazos[self.proxima + 1] - TOLERANCIA_NS <= agora: self.proxima += 1
+            self.atrasos.append(max(0, agora - self.prazos[self.proxima]))
+            if self.proxima == n: self.rodando = False; self._registrar("fim da estrofe"); self.fim.emit(); return
+            self.proxima += 1; self.silaba.emit(self.proxima - 1)
+        if self.ativo(): self._agendar()
+
+    def _agendar(self):
+        prazo = min(self.prazos[self.proxima], self.proxima_batida)
+        self.timer.start(max(0, (prazo - time.monotonic_ns()) // NS_POR_MS))
+
+    def estatisticas(self):
+        """ Atraso medido dos disparos em ms: médio, máximo e o do último (deriva atual). """
+        if not self.atrasos: return {'eventos': 0, 'jitter_medio_ms': 0.0, 'jitter_max_ms': 0.0, 'deriva_ms': 0.0}
+        return {'eventos': len(self.atrasos),
+                'jitter_medio_ms': round(sum(self.atrasos) / len(self.atrasos) / NS_POR_MS, 3),
+                'jitter_max_ms': round(max(self.atrasos) / NS_POR_MS, 3),
+                'deriva_ms': round(self.atrasos[-1] / NS_POR_MS, 3)}
+
+    def _registrar(self, motivo):
+        e = self.estatisticas()
+        if e['eventos']:
+            log.info(f"Agendador ({motivo}): {e['eventos']} disparos, jitter médio {e['jitter_medio_ms']}ms, "
+                     f"máximo {e['jitter_max_ms']}ms, deriva {e['deriva_ms']}ms")
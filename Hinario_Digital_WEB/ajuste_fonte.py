@@ -0,0 +1,37 @@
+from collections import OrderedDict
+from PySide6.QtGui import QTextCursor, QTextDocument
+from fontes import fonte
+
+class AjustadorFonte:
+    """ Maior tamanho de fonte (de max_zoom para baixo, de 2 em 2) em que o texto cabe na área útil.
+        Busca binária sobre os tamanhos candidatos + cache LRU por (texto, largura, altura, espaçamento, faixa). """
+    def __init__(self, capacidade=256):
+        self.capacidade = capacidade
+        self.cache = OrderedDict()
+        self.layouts = 0   # quantos layouts completos já foram medidos (diagnóstico)
+
+    def melhor_tamanho(self, texto, largura, altura, espacamento, min_zoom, max_zoom):
+        chave = (texto, largura, altura, espacamento, min_zoom, max_zoom)
+        if chave in self.cache: self.cache.move_to_end(chave); return self.cache[chave]
+        candidatos = list(range(max_zoom, min_zoom - 1, -2))   # decrescente, igual à busca linear antiga
+        doc = QTextDocument(); doc.setPlainText(texto); doc.setTextWidth(largura)
+        # A margem inferior dos blocos não depende da fonte: aplica uma vez só
+        curs = QTextCursor(doc); curs.beginEditBlock(); blk = doc.begin()
+        while blk.isValid():
+            fmt = blk.blockFormat(); fmt.setBottomMargin(espacamento); curs.setPosition(blk.position()); curs.setBlockFormat(fmt); blk = blk.next()
+        curs.endEditBlock()
+        # Quanto menor a fonte, menor a altura: procura o primeiro candidato que cabe
+        lo, hi = 0, len(candidatos)
+        while lo < hi:
+            meio = (lo + hi) // 2
+            if self._cabe(doc, candidatos[meio], altura): hi = meio
+            else: lo = meio + 1
+        best = candidatos[lo] if lo < len(candidatos) else min_zoom
+        self.cache[chave] = best
+        if len(self.cache) > self.capacidade: self.cache.popitem(last=False)
+        return best
+
+    def _cabe(self, doc, tamanho, altura):
+        self.layouts += 1
+        doc.setDefaultFont(fonte(tamanho, negrito=True))
+        return doc.size().height() <= altura * 0.95
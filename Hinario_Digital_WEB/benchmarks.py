@@ -0,0 +1,110 @@
+""" Micro-benchmarks do player. Uso: python benchmarks.py [nome ...]  (sem nomes roda todos) """
+import os
+import re
+import sys
+import glob
+import json
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # raiz do repositório (compartilhado/)
+
+def medir(func, repeticoes):
+    t0 = time.perf_counter()
+    for _ in range(repeticoes): func()
+    return (time.perf_counter() - t0) / repeticoes * 1000   # ms por chamada
+
+def bench_destaque():
+    """ Custo por passo do destaque: documento inteiro em fmt_norm + sílaba (antigo) x só as duas faixas. """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication, QTextEdit
+    from PySide6.QtGui import QFont, QTextCharFormat, QTextCursor, QColor
+    app = QApplication.instance() or QApplication(sys.argv)
+    fmt_norm = QTextCharFormat(); fmt_norm.setForeground(QColor("white")); fmt_norm.setFont(QFont("Arial", 60, QFont.Weight.Bold))
+    fmt_dest = QTextCharFormat(); fmt_dest.setForeground(QColor("yellow")); fmt_dest.setFont(QFont("Arial", 90, QFont.Weight.Bold))
+    print(f"{'sílabas':>8} {'inteiro ms/passo':>18} {'incremental ms/passo':>22}")
+    for n_silabas in (40, 120, 400, 1200):
+        linhas = []; indices = []; pos = 0
+        for i in range(n_silabas):
+            sil = f"sí{i % 10}"
+            if i and i % 8 == 0: linhas.append("\n"); pos += 1
+            elif i: linhas.append(" "); pos += 1
+            linhas.append(sil); indices.append((pos, len(sil))); pos += len(sil)
+        texto = QTextEdit(); texto.resize(1280, 720); texto.setPlainText("".join(linhas)); texto.show(); app.processEvents()
+        doc = texto.document(); estado = {'i': 0, 'ant': None}
+
+        def passo_inteiro():
+            st, ln = indices[estado['i'] % n_silabas]; estado['i'] += 1
+            reset = QTextCursor(doc); reset.select(QTextCursor.Document); reset.setCharFormat(fmt_norm); reset.clearSelection()
+            cur = QTextCursor(doc); cur.setPosition(st); cur.movePosition(QTextCursor.Right, QTextCursor.KeepAnchor, ln); cur.setCharFormat(fmt_dest); texto.setTextCursor(cur)
+            app.processEvents()
+
+        def passo_incremental():
+            faixa = indices[estado['i'] % n_silabas]; estado['i'] += 1
+            if estado['ant']:
+                st, ln = estado['ant']; cur = QTextCursor(doc); cur.setPosition(st); cur.movePosition(QTextCursor.Right, QTextCursor.KeepAnchor, ln); cur.setCharFormat(fmt_norm)
+            st, ln = estado['ant'] = faixa
+            cur = QTextCursor(doc); cur.setPosition(st); cur.movePosition(QTextCursor.Right, QTextCursor.KeepAnchor, ln); cur.setCharFormat(fmt_dest); texto.setTextCursor(cur)
+            app.processEvents()
+
+        rep = max(20, 4000 // n_silabas)
+        t_inteiro = medir(passo_inteiro, rep)
+        estado['i'] = 0; t_incr = medir(passo_incremental, rep)
+        print(f"{n_silabas:>8} {t_inteiro:>18.3f} {t_incr:>22.3f}")
+        texto.close()
+
+def _get_syllable_tokens_antigo(text_line):
+    # Versão anterior a compartilhado/silabas.py (split + strip + re.sub por token), mantida só para comparação
+    padrao = r'(__|\'\'|[_"\-]|\s+)'
+    tokens_raw = re.split(padrao, text_line)
+    lista_final = []
+    for token in tokens_raw:
+        if not token: continue
+        token_limpo = token.strip()
+        if token_limpo == '': pass
+        elif token == '-':
+            if lista_final: lista_final[-1] += "-"
+            else: lista_final.append("-")
+        else:
+            simbolos_pausa = ["''", '"', "_", "__"]
+            if token_limpo in simbolos_pausa: lista_final.append(token_limpo)
+            else:
+                limpo = re.sub(r'[^\w\',~\-.;:!?]', '', token)
+                if limpo or token_limpo in [",", ";", ".", "!", "?", ":"]: lista_final.append(token)
+    return lista_final
+
+def _corpus_hinos():
+    """ Todos os hinos JSON: pasta configurada + os que estão no repositório (Hinario_Digital). """
+    from config import HINOS_FOLDER_PATH
+    base = os.path.dirname(os.path.abspath(__file__))
+    arquivos = glob.glob(os.path.join(HINOS_FOLDER_PATH, "*.json")) + glob.glob(os.path.join(base, "..", "Hinario_Digital", "**", "*.json"), recursive=True)
+    hinos = []
+    for arq in arquivos:
+        try:
+            with open(arq, 'r', encoding='utf-8') as f: d = json.load(f)
+        except Exception: continue
+        if isinstance(d, dict) and d.get('estrofes'): hinos.append(d)
+    return hinos
+
+def bench_tokenizador():
+    """ get_syllable_tokens antigo x silabas.py sobre o corpus inteiro (confere também o resultado). """
+    from compartilhado.silabas import get_syllable_tokens, tokenizar_hino
+    hinos = _corpus_hinos()
+    linhas = [l.get('texto_silabado', '').strip() for h in hinos for e in h['estrofes'] for l in e.get('linhas', [])]
+    if not linhas: print("Nenhum hino encontrado."); return
+    for l in linhas: assert get_syllable_tokens(l) == _get_syllable_tokens_antigo(l), l
+    rep = max(5, 200000 // len(linhas))
+    t_antigo = medir(lambda: [_get_syllable_tokens_antigo(l) for l in linhas], rep)
+    t_novo = medir(lambda: [get_syllable_tokens(l) for l in linhas], rep)
+    t_hino = medir(lambda: [tokenizar_hino(h) for h in hinos], rep)
+    t_pos = medir(lambda: [tokenizar_hino(h, com_posicoes=True) for h in hinos], rep)
+    print(f"{len(hinos)} hinos, {len(linhas)} linhas")
+    print(f"antigo:               {t_antigo:8.3f} ms/corpus")
+    print(f"silabas:              {t_novo:8.3f} ms/corpus ({t_antigo / t_novo:.1f}x)")
+    print(f"tokenizar_hino:       {t_hino:8.3f} ms/corpus")
+    print(f"tokenizar_hino (pos): {t_pos:8.3f} ms/corpus")
+
+BENCHMARKS = {'destaque': bench_destaque, 'tokenizador': bench_tokenizador}
+
+if __name__ == "__main__":
+    for nome in (sys.argv[1:] or BENCHMARKS):
+        print(f"== {nome} =="); BENCHMARKS[nome]()
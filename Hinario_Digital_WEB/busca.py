@@ -0,0 +1,120 @@
+import re
+import math
+import bisect
+import unicodedata
+from compartilhado.silabas import get_syllable_tokens, SIMBOLOS_PAUSA
+
+# Marcas do texto silabado que não fazem parte das palavras
+RE_HIFEN_SILABA = re.compile(r"\s*-\s+|\s+-\s*")     # "Maî- tre" / "Maî -tre" -> "Maître"
+RE_LIGADURA = re.compile(r"[‿~]")                    # "ne‿a" -> "ne a"
+RE_PAUSAS = re.compile(r"__|''|[_\"]")
+RE_PALAVRA = re.compile(r"\w+")
+TROCAS_ESPECIAIS = str.maketrans({"œ": "oe", "Œ": "oe", "æ": "ae", "Æ": "ae"})
+
+PESO_TITULO = 2.0
+BONUS_FRASE = 5.0
+
+def texto_legivel(texto_silabado):
+    """ Junta as sílabas e remove as marcas de pausa/ligadura, mantendo acentos (forma usada nos termos do índice). """
+    txt = RE_PAUSAS.sub(" ", texto_silabado)
+    txt = RE_HIFEN_SILABA.sub("", txt)
+    txt = RE_LIGADURA.sub(" ", txt)
+    return " ".join(txt.split())
+
+def texto_exibicao(texto_silabado):
+    """ A linha como o player mostra com hífens: sílabas da mesma palavra coladas pelo hífen ("en-ten-dre").
+        Hífen de sílaba e de palavra composta são iguais no texto silabado; juntar tudo viraria "Faisnous". """
+    partes = []; colar = True
+    for token in get_syllable_tokens(texto_silabado.strip()):
+        if token in SIMBOLOS_PAUSA: colar = False; continue
+        if not colar: partes.append(" ")
+        partes.append(token); colar = token.endswith("-")
+    return " ".join(RE_LIGADURA.sub(" ", "".join(partes)).split())
+
+def remover_acentos(texto):
+    txt = unicodedata.normalize("NFKD", texto.translate(TROCAS_ESPECIAIS))
+    return "".join(c for c in txt if not unicodedata.combining(c)).casefold()
+
+def tokenizar_busca(texto):
+    """ Palavras normalizadas (sem acento, minúsculas) de um texto silabado ou digitado. """
+    return RE_PALAVRA.findall(remover_acentos(texto_legivel(texto)))
+
+def tokenizar_partes(texto):
+    """ Como tokenizar_busca, mas com o hífen separando: "Fais- nous" -> fais, nous.
+        O texto silabado não distingue hífen de sílaba de hífen de palavra composta, então o
+        índice guarda as duas formas ("faisnous" e "fais", "nous"). """
+    txt = RE_HIFEN_SILABA.sub(" ", RE_PAUSAS.sub(" ", texto))
+    return RE_PALAVRA.findall(remover_acentos(RE_LIGADURA.sub(" ", txt)))
+
+class IndiceBusca:
+    """ Índice invertido sobre títulos e linhas de todas as estrofes.
+        Documento = (numero, estrofe_idx); estrofe_idx == -1 representa o título. """
+    def __init__(self):
+        self.postings = {}      # termo -> {doc: frequência}
+        self.vocabulario = []   # termos ordenados, para completar o último termo digitado
+        self.docs = {}          # doc -> (termos em ordem unidos por espaço, linhas para exibir)
+        self.titulos = {}       # numero -> título
+
+    def construir(self, titulos, estrofes):
+        """ titulos: [(numero, titulo)]; estrofes: [(numero, estrofe_idx, rotulo, texto com \\n entre linhas)] """
+        for num, titulo in titulos:
+            self.titulos[num] = titulo
+            self._adicionar((num, -1), [titulo or ""])
+        for num, idx, _, texto in estrofes:
+            self._adicionar((num, idx), texto.split("\n"))
+        self.vocabulario = sorted(self.postings)
+        return self
+
+    def _adicionar(self, doc, linhas):
+        termos = []; partes = []
+        for linha in linhas:
+            unidas = tokenizar_busca(linha); termos.extend(unidas)
+            vistas = set(unidas); partes.extend(t for t in tokenizar_partes(linha) if t not in vistas)
+        if not termos: return
+        self.docs[doc] = (" " + " ".join(termos), [texto_exibicao(l) for l in linhas])
+        for t in termos + partes:
+            p = self.postings.setdefault(t, {})
+            p[doc] = p.get(doc, 0) + 1
+
+    def _expandir(self, termo, prefixo):
+        if not prefixo: return [termo] if termo in self.postings else []
+        i = bisect.bisect_left(self.vocabulario, termo); achados = []
+        while i < len(self.vocabulario) and self.vocabulario[i].startswith(termo):
+            achados.append(self.vocabulario[i]); i += 1
+        return achados
+
+    def buscar(self, consulta, limite=50):
+        """ Retorna [(numero, estrofe_idx, pontuação, trecho)] do mais para o menos relevante.
+            O último termo vale como prefixo enquanto a palavra ainda está sendo digitada. """
+        termos = tokenizar_busca(consulta)
+        if not termos: return []
+        ultimo_prefixo = not consulta[-1:].isspace()
+        n_docs = max(1, len(self.docs)); pontos = {}; acertos = {}
+        for i, termo in enumerate(termos):
+            variantes = self._expandir(termo, ultimo_prefixo and i == len(termos) - 1)
+            vistos = set()
+            for v in variantes:
+                post = self.postings[v]; idf = math.log(1 + n_docs / len(post))
+                for doc, tf in post.items():
+                    peso = PESO_TITULO if doc[1] == -1 else 1.0
+                    pontos[doc] = pontos.get(doc, 0.0) + idf * (1 + math.log(tf)) * peso
+                    if doc not in vistos: vistos.add(doc); acertos[doc] = acertos.get(doc, 0) + 1
+        if not pontos: return []
+        frase = " " + " ".join(termos)
+        resultado = []
+        for doc, p in pontos.items():
+            if len(termos) > 1 and frase in self.docs[doc][0]: p += BONUS_FRASE
+            resultado.append((acertos[doc], p, doc))
+        # Primeiro quem tem todos os termos, depois a pontuação
+        resultado.sort(key=lambda r: (-r[0], -r[1], r[2]))
+        saida = []
+        for _, p, (num, idx) in resultado[:limite]:
+            saida.append((num, idx, round(p, 3), self._trecho((num, idx), termos)))
+        return saida
+
+    def _trecho(self, doc, termos):
+        _, linhas = self.docs[doc]
+        for linha in linhas:
+            norm = tokenizar_busca(linha) + tokenizar_busca(linha.replace("-", ""))   # partes e palavra unida
+            if any(t in norm or any(n.startswith(t) for n in norm) for t in termos): return linha
+        return linhas[0] if linhas else ""
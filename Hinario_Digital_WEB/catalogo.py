@@ -0,0 +1,84 @@
+import os
+import re
+import json
+import sqlite3
+import threading
+from config import CONFIG_DB_FILE, HINOS_FOLDER_PATH
+
+# Cada linha guarda o que a biblioteca precisa para se desenhar sem abrir o JSON.
+# (mtime_ns, tamanho) decidem se o arquivo precisa ser relido.
+CAMPOS_CATALOGO = ("arquivo", "numero", "titulo", "idioma", "tom", "bpm", "n_estrofes", "mtime_ns", "tamanho")
+
+class CatalogoHinos:
+    """ Índice persistente (SQLite) dos metadados dos hinos da pasta HINOS_FOLDER_PATH.
+        A conexão é compartilhada entre a interface e a thread de atualização: todo acesso passa por self.lock. """
+    def __init__(self, pasta=HINOS_FOLDER_PATH, db_file=CONFIG_DB_FILE):
+        self.pasta = pasta
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS catalogo_hinos (
+            arquivo TEXT PRIMARY KEY, numero INTEGER, titulo TEXT, idioma TEXT, tom TEXT,
+            bpm INTEGER, n_estrofes INTEGER, mtime_ns INTEGER, tamanho INTEGER, valido INTEGER)""")
+        # Texto silabado de cada estrofe, para o índice de busca não precisar reabrir os JSON
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS catalogo_estrofes (
+            arquivo TEXT, estrofe_idx INTEGER, rotulo TEXT, texto TEXT, PRIMARY KEY (arquivo, estrofe_idx))""")
+        self.conn.commit()
+
+    def listar(self):
+        """ Hinos válidos já catalogados, ordenados pelo número. Não toca na pasta. """
+        with self.lock:
+            cur = self.conn.execute(f"SELECT {', '.join(CAMPOS_CATALOGO)} FROM catalogo_hinos WHERE valido = 1 ORDER BY numero, arquivo")
+            return [dict(zip(CAMPOS_CATALOGO, row)) for row in cur.fetchall()]
+
+    def listar_estrofes(self):
+        """ [(numero, estrofe_idx, rotulo, texto)] de todos os hinos válidos, linhas separadas por \\n. """
+        with self.lock:
+            return self.conn.execute("""SELECT h.numero, e.estrofe_idx, e.rotulo, e.texto FROM catalogo_estrofes e
+                JOIN catalogo_hinos h ON h.arquivo = e.arquivo WHERE h.valido = 1 ORDER BY h.numero, e.estrofe_idx""").fetchall()
+
+    def atualizar(self):
+        """ Compara a pasta com o catálogo e relê só os arquivos novos ou alterados.
+            Retorna quantas entradas mudaram (0 = a lista em tela continua válida). """
+        if not os.path.exists(self.pasta): return 0
+        with self.lock:
+            conhecidos = {arq: (mt, tam) for arq, mt, tam in self.conn.execute("SELECT arquivo, mtime_ns, tamanho FROM catalogo_hinos")}
+        presentes = set(); novos = []; estrofes = []
+        with os.scandir(self.pasta) as it:
+            for entry in it:
+                if not entry.name.endswith('.json') or not entry.is_file(): continue
+                presentes.add(entry.name)
+                st = entry.stat()
+                if conhecidos.get(entry.name) != (st.st_mtime_ns, st.st_size):
+                    novos.append(self._ler_metadados(entry.name, st, estrofes))
+        removidos = [arq for arq in conhecidos if arq not in presentes]
+        if not novos and not removidos: return 0
+        with self.lock:
+            with self.conn:
+                self.conn.executemany("INSERT OR REPLACE INTO catalogo_hinos VALUES (?,?,?,?,?,?,?,?,?,?)", novos)
+                self.conn.executemany("DELETE FROM catalogo_hinos WHERE arquivo = ?", [(arq,) for arq in removidos])
+                self.conn.executemany("DELETE FROM catalogo_estrofes WHERE arquivo = ?", [(n[0],) for n in novos] + [(arq,) for arq in removidos])
+                self.conn.executemany("INSERT INTO catalogo_estrofes VALUES (?,?,?,?)", estrofes)
+        return len(novos) + len(removidos)
+
+    def _ler_metadados(self, arquivo, st, estrofes):
+        m = re.search(r"(\d+)", arquivo)
+        num = int(m.group(1)) if m else 0
+        try:
+            with open(os.path.join(self.pasta, arquivo), 'r', encoding='utf-8') as f: data = json.load(f)
+            bpm = data.get('BPM')
+            try: bpm = int(bpm) if bpm is not None else None
+            except (TypeError, ValueError): bpm = None
+            linhas_estrofes = []  # só entram no índice depois do arquivo inteiro lido
+            for idx, est in enumerate(data.get('estrofes') or []):
+                if not isinstance(est, dict): continue
+                tipo = str(est.get('tipo') or '')
+                rotulo = "Coro" if tipo.lower() == 'coro' else f"{tipo or 'Est'} {est.get('numero') or ''}".strip()
+                texto = "\n".join((l.get('texto_silabado') or '') for l in (est.get('linhas') or []) if isinstance(l, dict))
+                linhas_estrofes.append((arquivo, idx, rotulo, texto))
+            registro = (arquivo, num, data.get('titulo', 'Sem Título'), data.get('idioma'), data.get('tom'),
+                        bpm, len(data.get('estrofes') or []), st.st_mtime_ns, st.st_size, 1)
+            estrofes.extend(linhas_estrofes)
+            return registro
+        except Exception:
+            # Arquivo inválido fica registrado para não ser relido até mudar de novo
+            return (arquivo, num, None, None, None, None, 0, st.st_mtime_ns, st.st_size, 0)
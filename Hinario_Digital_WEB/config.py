@@ -1,5 +1,7 @@
 import sqlite3
 import os
+import atexit
+import threading
 
 # --- CAMINHOS ---
 # Ajuste o caminho conforme sua necessidade real
@@ -38,30 +40,32 @@ DEFAULT_PARAMS = {
     'cor_nota_normal': "#00BFFF",
     'cor_nota_destaque': "#32CD32",
     'cor_barra_navegacao': "#000080",
-    'BPM_padrao': BPM_INICIAL
+    'BPM_padrao': BPM_INICIAL,
+    'arquivos_fonte': "arial.ttf, Arial.ttf, LiberationSans-Regular.ttf, DejaVuSans.ttf, FreeSans.ttf"  # ordem de preferência (FontRegistry; vale ao abrir o player)
 }
 
 class ConfigManager:
+    """ Uma conexão só, cache em memória de todas as chaves e gravação adiada opcional. """
+    ATRASO_GRAVACAO = 0.8  # segundos sem novas alterações antes de gravar o lote pendente
+
     def __init__(self):
+        self.lock = threading.RLock()
+        self.conn = None; self.cache = {}; self.pendentes = {}; self.timer_gravacao = None
         self.iniciar_banco_config()
+        atexit.register(self.descarregar)
 
     def iniciar_banco_config(self):
         try:
-            conn = sqlite3.connect(CONFIG_DB_FILE)
-            conn.execute("CREATE TABLE IF NOT EXISTS configuracoes (chave TEXT PRIMARY KEY, valor TEXT)")
-            conn.commit(); conn.close()
+            self.conn = sqlite3.connect(CONFIG_DB_FILE, check_same_thread=False)
+            self.conn.execute("CREATE TABLE IF NOT EXISTS configuracoes (chave TEXT PRIMARY KEY, valor TEXT)")
+            self.conn.commit()
+            # Carrega tudo de uma vez: a tabela tem poucas dezenas de chaves
+            self.cache = dict(self.conn.execute("SELECT chave, valor FROM configuracoes").fetchall())
         except: pass
             
     def get(self, chave, tipo=str):
-        val = None
-        try:
-            conn = sqlite3.connect(CONFIG_DB_FILE)
-            cursor = conn.cursor()
-            cursor.execute("SELECT valor FROM configuracoes WHERE chave = ?", (chave,))
-            res = cursor.fetchone()
-            conn.close()
-            if res: val = res[0]
-        except: pass
+        with self.lock:
+            val = self.pendentes.get(chave, self.cache.get(chave))
         
         if val is None:
             val = DEFAULT_PARAMS.get(chave)
@@ -74,19 +78,32 @@ class ConfigManager:
             except: pass
         return val
         
-    def set(self, chave, valor):
-        try:
-            conn = sqlite3.connect(CONFIG_DB_FILE)
-            conn.execute("INSERT OR REPLACE INTO configuracoes (chave, valor) VALUES (?, ?)", (chave, str(valor)))
-            conn.commit(); conn.close()
-        except: pass
+    def set(self, chave, valor, adiado=False):
+        """ adiado=True junta gravações seguidas (ex.: cliques no BPM) em uma única transação. """
+        with self.lock:
+            self.pendentes[chave] = str(valor)
+            if not adiado: self.descarregar(); return
+            if self.timer_gravacao: self.timer_gravacao.cancel()
+            self.timer_gravacao = threading.Timer(self.ATRASO_GRAVACAO, self.descarregar)
+            self.timer_gravacao.daemon = True; self.timer_gravacao.start()
+
+    def descarregar(self):
+        """ Grava no banco tudo o que está pendente. """
+        with self.lock:
+            if self.timer_gravacao: self.timer_gravacao.cancel(); self.timer_gravacao = None
+            if not self.pendentes: return
+            lote = list(self.pendentes.items()); self.pendentes = {}
+            self.cache.update(lote)
+            try:
+                with self.conn: self.conn.executemany("INSERT OR REPLACE INTO configuracoes (chave, valor) VALUES (?, ?)", lote)
+            except: pass
 
     def carregar_config(self, chave, padrao=None): 
         res = self.get(chave)
         return res if res is not None else padrao
 
-    def salvar_config(self, chave, valor): 
-        self.set(chave, valor)
+    def salvar_config(self, chave, valor, adiado=False): 
+        self.set(chave, valor, adiado)
 
 # Instância global para ser usada nos outros arquivos
 config_manager = ConfigManager()
\ No newline at end of file
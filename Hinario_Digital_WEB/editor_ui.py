@@ -1,3 +1,4 @@
+import copy
 import json
 import os
 from PySide6.QtWidgets import (
@@ -10,7 +11,8 @@ from PySide6.QtCore import Qt
 from PySide6.QtGui import QFont, QColor
 
 from config import config_manager, COR_INICIAR, COR_BARRA_PADRAO, HINOS_FOLDER_PATH
-from logic import NOTE_CODES, get_syllable_tokens, ler_arquivo_hino
+from logic import NOTE_CODES, ler_arquivo_hino, atualizar_cache_hino, invalidar_hino
+from compartilhado.silabas import get_syllable_tokens
 
 class ConfigDialog(QDialog):
     def __init__(self, parent=None):
@@ -216,7 +218,7 @@ class EditorDialog(QDialog):
         # CORREÇÃO: Força o fundo do diálogo para escuro (#222) para garantir que labels amarelas sejam visíveis
         self.setStyleSheet("background-color: #222; color: white;")
         
-        self.hino_num = hino_num; self.estrofe_idx = estrofe_idx; self.hino_data = ler_arquivo_hino(hino_num)
+        self.hino_num = hino_num; self.estrofe_idx = estrofe_idx; self.hino_data = copy.deepcopy(ler_arquivo_hino(hino_num))  # cópia: o original é compartilhado com o player
         self.app_colors = {}; 
         if parent: self.app_colors = parent.colors
         else: self.app_colors = {'cor_fundo_texto': 'black', 'cor_texto_normal': 'white'}
@@ -322,5 +324,6 @@ class EditorDialog(QDialog):
         try:
             path = os.path.join(HINOS_FOLDER_PATH, f"hino_{self.hino_num:03d}.json")
             with open(path, 'w', encoding='utf-8') as f: json.dump(self.hino_data, f, indent=2, ensure_ascii=False)
+            atualizar_cache_hino(self.hino_num, path, self.hino_data)
             self.accept()
-        except Exception as e: print(f"Erro salvar: {e}")
\ No newline at end of file
+        except Exception as e: invalidar_hino(self.hino_num); print(f"Erro salvar: {e}")
\ No newline at end of file
@@ -0,0 +1,37 @@
+""" Fontes Qt do player, da mesma fonte que o renderer usa: o arquivo vem do FontRegistry
+    compartilhado (compartilhado/font_registry.py, com os arquivos da chave 'arquivos_fonte'),
+    é carregado uma vez no Qt com addApplicationFont e a família devolvida fica em cache,
+    junto com os QFont por tamanho. """
+import logging
+
+from config import config_manager
+from compartilhado.font_registry import FontRegistry
+
+log = logging.getLogger(__name__)
+
+_familia = None; _qfonts = {}
+
+def familia():
+    """ Família Qt do arquivo resolvido pelo FontRegistry (exige QApplication criada). """
+    global _familia
+    if _familia is None:
+        from PySide6.QtGui import QFontDatabase, QFont
+        FontRegistry.configure(config_manager.get('arquivos_fonte'))
+        caminho = FontRegistry.resolve()
+        id_fonte = QFontDatabase.addApplicationFont(caminho) if caminho else -1
+        familias = QFontDatabase.applicationFontFamilies(id_fonte) if id_fonte != -1 else []
+        if familias:
+            _familia = familias[0]
+            log.info(f"Fonte da interface: {_familia} ({caminho})")
+        else:
+            _familia = QFont().defaultFamily()
+            log.warning(f"Fonte do FontRegistry indisponível no Qt ({caminho}); usando {_familia}")
+    return _familia
+
+def fonte(tamanho, negrito=False):
+    """ QFont da família resolvida; devolve cópia (quem recebe pode alterar à vontade). """
+    from PySide6.QtGui import QFont
+    chave = (int(tamanho), negrito)
+    f = _qfonts.get(chave)
+    if f is None: f = _qfonts[chave] = QFont(familia(), chave[0], QFont.Weight.Bold if negrito else QFont.Weight.Normal)
+    return QFont(f)
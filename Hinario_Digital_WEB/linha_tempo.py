@@ -0,0 +1,88 @@
+from array import array
+from config import config_manager
+from logic import NOTE_DURATIONS_BASE
+from compartilhado.silabas import get_syllable_tokens
+
+PAUSE_SYMBOLS = ("''", "_", '"', "__")
+# Pausas com tempo fixo (ms vindo da configuração), codificadas em um byte por sílaba
+CODIGOS_PAUSA = {'rc': 1, 'pc': 2, 'rl': 3, 'pl': 4}
+TEMPOS_PAUSA = {1: ('time_rc', 300), 2: ('time_pc', 500), 3: ('time_rl', 800), 4: ('time_pl', 1000)}
+
+class LinhaDoTempo:
+    """ Estrofe compilada uma vez na carga do hino: texto exibido e arrays paralelos por sílaba.
+        Mudar BPM ou navegar entre estrofes só recalcula durações, sem re-tokenizar nada. """
+    __slots__ = ('textos', 'inicios', 'comprimentos', 'fracoes', 'fermatas', 'pausas', '_indices', '_duracoes')
+
+    def __init__(self):
+        self.textos = {}; self.inicios = {}; self.comprimentos = {}   # chave: mostrar_hifens (True/False)
+        self.fracoes = array('d')    # fração da semínima (NOTE_DURATIONS_BASE)
+        self.fermatas = array('b')   # 1 se a nota tem fermata
+        self.pausas = array('b')     # 0 = nota; 1..4 = rc/pc/rl/pl (tempo fixo)
+        self._indices = {}; self._duracoes = {}
+
+    def __len__(self): return len(self.fracoes)
+
+    def texto(self, mostrar_hifens): return self.textos[bool(mostrar_hifens)]
+
+    def indices(self, mostrar_hifens):
+        """ [(inicio, comprimento) ou None] no formato que o player usa para destacar. """
+        chave = bool(mostrar_hifens)
+        if chave not in self._indices:
+            self._indices[chave] = [None if st < 0 else (st, ln) for st, ln in zip(self.inicios[chave], self.comprimentos[chave])]
+        return self._indices[chave]
+
+    def duracoes_ms(self, bpm, unidade_bpm="sm"):
+        """ Duração (ms) de cada sílaba numa única passada sobre as frações: bpm <= 0 dá 500 ms,
+            pausas rc/pc/rl/pl usam o tempo fixo da configuração, notas a fração da unidade do BPM
+            (vezes fermata_factor com fermata), nunca abaixo de 50 ms. Guardada por BPM e configuração. """
+        fator_fermata = config_manager.get('fermata_factor', float)
+        fixos = [0] + [config_manager.get(k, int) or padrao for k, padrao in (TEMPOS_PAUSA[i] for i in range(1, 5))]
+        chave = (bpm, unidade_bpm, fator_fermata, tuple(fixos))
+        if chave in self._duracoes: return self._duracoes[chave]
+        if bpm <= 0: durs = [500] * len(self)
+        else:
+            ms_seminima = (60000 / bpm) / NOTE_DURATIONS_BASE.get(unidade_bpm, 1.0)
+            durs = [fixos[p] if p else max(50, int(ms_seminima * f * fator_fermata if fe else ms_seminima * f))
+                    for f, fe, p in zip(self.fracoes, self.fermatas, self.pausas)]
+        self._duracoes[chave] = durs
+        return durs
+
+def _montar_texto(linhas_tokens, mostrar_hifens):
+    # Mesma regra de espaçamento que o player sempre usou em load_estrofe
+    partes = []; inicios = array('l'); comprimentos = array('l'); pos = 0
+    for l_idx, tokens in enumerate(linhas_tokens):
+        if l_idx > 0: partes.append("\n"); pos += 1
+        for k, token in enumerate(tokens):
+            if token in PAUSE_SYMBOLS:
+                inicios.append(-1); comprimentos.append(0); continue
+            display_token = token
+            if not mostrar_hifens and display_token.endswith('-'): display_token = display_token[:-1]
+            prefix = ""
+            if k > 0:
+                prev = tokens[k-1]
+                if not prev.endswith('-') and prev not in PAUSE_SYMBOLS: prefix = " "
+            partes.append(prefix + display_token)
+            inicios.append(pos + len(prefix)); comprimentos.append(len(display_token))
+            pos += len(prefix) + len(display_token)
+    return "".join(partes), inicios, comprimentos
+
+def compilar_estrofe(est):
+    tl = LinhaDoTempo(); linhas_tokens = []
+    for line in est.get('linhas', []):
+        tokens = get_syllable_tokens(line.get('texto_silabado', '').strip())
+        notes = list(line.get('notas_codes', []))
+        if len(notes) < len(tokens): notes += ["sm"] * (len(tokens) - len(notes))
+        for note in notes[:len(tokens)]:
+            code = note.strip().lower(); fermata = "_fermata" in code
+            if fermata: code = code.replace("_fermata", "")
+            tl.fracoes.append(NOTE_DURATIONS_BASE.get(code, 1.0))
+            tl.fermatas.append(1 if fermata else 0)
+            tl.pausas.append(CODIGOS_PAUSA.get(code, 0))
+        linhas_tokens.append(tokens)
+    for mostrar in (True, False):
+        tl.textos[mostrar], tl.inicios[mostrar], tl.comprimentos[mostrar] = _montar_texto(linhas_tokens, mostrar)
+    return tl
+
+def compilar_hino(hino_data):
+    """ Uma LinhaDoTempo por estrofe, na mesma ordem de hino_data['estrofes']. """
+    return [compilar_estrofe(est) for est in hino_data.get('estrofes', [])]
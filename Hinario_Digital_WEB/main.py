@@ -1,8 +1,12 @@
+import os
 import sys
+import logging
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # raiz do repositório (compartilhado/)
 from PySide6.QtWidgets import QApplication
 from player_ui import KaraokePlayer
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
     # Cria a aplicação Qt
     app = QApplication(sys.argv)
     
@@ -1,4 +1,5 @@
 import sys
+import logging
 import os
 import json
 import glob
@@ -15,9 +16,12 @@ from PyQt6.QtGui import (QPixmap, QPainter, QPen, QColor, QAction,
                          QTransform, QImage, QWheelEvent, QIcon, QFont, QBrush, QMouseEvent, QPainterPath, QKeySequence, QShortcut)
 
 # Importações para processamento de imagem
-from PIL import Image, ImageDraw, ImageEnhance, ImageOps, ImageFont
+from PIL import Image, ImageDraw, ImageEnhance, ImageOps
 from pathlib import Path
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # raiz do repositório (compartilhado/)
+from compartilhado.font_registry import FontRegistry
+
 # Pega a pasta onde ESTE arquivo .py está salvo
 BASE_DIR = Path(__file__).parent.resolve()
 
@@ -44,7 +48,8 @@ GLOBAL_CONFIG = {
     "PAGE_WIDTH": 2000,     
     "RIGHT_MARGIN": 150,
     "BOTTOM_PADDING": 50,
-    "SNAP_GRID": 20
+    "SNAP_GRID": 20,
+    "FONT_FILES": "arial.ttf, Arial.ttf, LiberationSans-Regular.ttf, DejaVuSans.ttf, FreeSans.ttf"  # ordem de preferência (FontRegistry)
 }
 
 VALORES_NOTAS = [
@@ -830,12 +835,9 @@ class MainWindow(QMainWindow):
         draw = ImageDraw.Draw(img_out)
 
         # Fontes
-        try:
-            font_note_name = ImageFont.truetype("arial.ttf", 18)
-            font_tag = ImageFont.truetype("arial.ttf", 22) 
-        except:
-            font_note_name = ImageFont.load_default()
-            font_tag = ImageFont.load_default()
+        FontRegistry.configure(GLOBAL_CONFIG.get("FONT_FILES"))
+        font_note_name = FontRegistry.get(18)
+        font_tag = FontRegistry.get(22)
 
         source_images = []
         try:
@@ -1347,6 +1349,7 @@ class MainWindow(QMainWindow):
         self.setWindowTitle(f"Editor Musical Pro - {t} ({c} itens)")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
     app = QApplication(sys.argv)
     app.setStyle("Fusion")
     window = MainWindow()
@@ -1,22 +1,28 @@
-import time
-import os
-import json
-import re
+import threading
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
     QLabel, QPushButton, QLineEdit, QTextEdit, QFrame, QApplication,
     QListWidget, QListWidgetItem, QSplitter, QSizePolicy, QMessageBox,
     QTabWidget, QAbstractItemView # <--- NOVOS IMPORTS
 )
-from PySide6.QtCore import QTimer, Qt
-from PySide6.QtGui import QFont, QTextCharFormat, QTextCursor, QColor, QTextDocument
+from PySide6.QtCore import QTimer, Qt, Signal
+from PySide6.QtGui import QTextCharFormat, QTextCursor, QColor
 
 # Importações dos outros módulos
-from config import config_manager, COR_INICIAR, COR_PERIGO, COR_AUTO_SCALE, COR_EDICAO, COR_BARRA_PADRAO, BPM_INICIAL, HINOS_FOLDER_PATH
-from logic import get_syllable_tokens, calcular_duracao_ms, ler_arquivo_hino, carregar_dados_json
+from config import config_manager, COR_INICIAR, COR_PERIGO, COR_AUTO_SCALE, COR_EDICAO, COR_BARRA_PADRAO, BPM_INICIAL
+from logic import ler_arquivo_hino, carregar_dados_json
+from linha_tempo import compilar_hino
 from editor_ui import EditorDialog, ConfigDialog
+from catalogo import CatalogoHinos
+from agendador import AgendadorKaraoke
+from ajuste_fonte import AjustadorFonte
+from fontes import fonte
+from precarga import PreCarregador
+from busca import IndiceBusca
 
 class KaraokePlayer(QMainWindow):
+    catalogo_pronto = Signal(int, object)   # (entradas mudadas, índice novo ou None) da thread de atualização, entregue na da interface
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Hinário Digital - Player")
@@ -31,24 +37,36 @@ class KaraokePlayer(QMainWindow):
         self.estrofe_idx = 0; self.pos_atual = 0; self.compasso = "4/4"; self.unidade_bpm = "sm"
         
         self.note_durations = []; self.indices = []; self.syllables = []
+        self.linhas_tempo = []   # LinhaDoTempo de cada estrofe do hino carregado
+        self.faixa_destacada = None   # (inicio, comprimento) da sílaba hoje em fmt_dest
         self.estrofes_info = []; self.estrofes_texto = []; self.notas_estrofes = []
-        self.tempo_inicio_nota = 0; self.duracao_nota_orig = 0
-        
         self.indice_coro = -1; self.proxima_eh_coro = False
         self.mostrar_hifens = True
         self.cache_hinos = [] 
+        self.catalogo = CatalogoHinos()
+        self.indice_busca = None  # montado em segundo plano; até lá a busca usa o filtro simples
+        self.catalogo_pronto.connect(self.receber_catalogo)
+        self.lock_catalogo = threading.Lock()   # uma atualização do catálogo por vez
+        self.geracao_catalogo = 0; self.mudancas_pendentes = 0
+        self.precarga = PreCarregador(self); self.precarga.pronto.connect(self.preaquecer_hino)
+        self.item_playlist_atual = None   # item da playlist que está tocando (a linha muda ao arrastar)
         self.is_paused = False
         self.is_fullscreen_mode = False
 
         # Timers
-        self.timer_play = QTimer(self); self.timer_play.setSingleShot(True); self.timer_play.timeout.connect(self.play_step)
+        # Sílabas e metrônomo no mesmo relógio monotônico (prazos absolutos, sem acumular atraso)
+        self.agendador = AgendadorKaraoke(self)
+        self.agendador.silaba.connect(self.play_step); self.agendador.batida.connect(self.flash_beat)
+        self.agendador.fim.connect(self.step_wait_for_next)
         self.timer_wait = QTimer(self); self.timer_wait.timeout.connect(self.step_wait)
         self.wait_sec = 0
-        self.timer_zoom = QTimer(self); self.timer_zoom.setSingleShot(True)
+        # Carga de estrofe, resize e tela cheia passam todos por este timer (ajuste uma vez só)
+        self.timer_zoom = QTimer(self); self.timer_zoom.setSingleShot(True); self.ajustador_fonte = AjustadorFonte()
         self.timer_zoom.timeout.connect(lambda: self.aplicar_zoom(True))
+        self.timer_busca = QTimer(self); self.timer_busca.setSingleShot(True)
+        self.timer_busca.timeout.connect(lambda: self.filtrar_lista_hinos(self.txt_busca.text()))
 
-        # Timer do Metrônomo Visual
-        self.timer_beat = QTimer(self); self.timer_beat.timeout.connect(self.flash_beat)
+        # Metrônomo Visual (batidas vêm do agendador)
         self.current_beat = 1; self.total_beats = 4
 
         self.recarregar_configs()
@@ -113,9 +131,9 @@ class KaraokePlayer(QMainWindow):
         
         # --- ABA BIBLIOTECA ---
         tab_lib = QWidget(); l_lib = QVBoxLayout(tab_lib)
-        self.txt_busca = QLineEdit(); self.txt_busca.setPlaceholderText("🔍 Buscar hino...")
+        self.txt_busca = QLineEdit(); self.txt_busca.setPlaceholderText("🔍 Buscar hino ou trecho da letra...")
         self.txt_busca.setStyleSheet("padding: 6px; color: white; background-color: #333; border: 1px solid #555; border-radius: 4px;")
-        self.txt_busca.textChanged.connect(self.filtrar_lista_hinos)
+        self.txt_busca.textChanged.connect(lambda _: self.timer_busca.start(120))
         l_lib.addWidget(self.txt_busca)
         
         self.lista_hinos = QListWidget()
@@ -138,6 +156,8 @@ class KaraokePlayer(QMainWindow):
         self.lista_playlist.setDragDropMode(QAbstractItemView.InternalMove) # Permite arrastar
         self.lista_playlist.setStyleSheet("QListWidget { background-color: #1E1E1E; color: #EEE; border: none; } QListWidget::item { padding: 10px; border-bottom: 1px solid #333; } QListWidget::item:selected { background-color: #2E8B57; color: white; }")
         self.lista_playlist.itemDoubleClicked.connect(self.hino_selecionado_playlist)
+        self.lista_playlist.model().rowsInserted.connect(lambda *_: self.precarregar_proximo_playlist())
+        self.lista_playlist.model().rowsMoved.connect(lambda *_: self.precarregar_proximo_playlist())
         l_play.addWidget(self.lista_playlist)
         
         h_btns_pl = QHBoxLayout()
@@ -219,8 +239,8 @@ class KaraokePlayer(QMainWindow):
         layout_player.addWidget(self.tb_frame)
         
         # Display
-        self.lbl_title = QLabel("..."); self.lbl_title.setFont(QFont("Arial", 36, QFont.Weight.Bold)); self.lbl_title.setAlignment(Qt.AlignmentFlag.AlignCenter); layout_player.addWidget(self.lbl_title)
-        self.lbl_info = QLabel(""); self.lbl_info.setFont(QFont("Arial", 20)); self.lbl_info.setAlignment(Qt.AlignmentFlag.AlignCenter); layout_player.addWidget(self.lbl_info)
+        self.lbl_title = QLabel("..."); self.lbl_title.setFont(fonte(36, negrito=True)); self.lbl_title.setAlignment(Qt.AlignmentFlag.AlignCenter); layout_player.addWidget(self.lbl_title)
+        self.lbl_info = QLabel(""); self.lbl_info.setFont(fonte(20)); self.lbl_info.setAlignment(Qt.AlignmentFlag.AlignCenter); layout_player.addWidget(self.lbl_info)
         self.texto = QTextEdit(); self.texto.setReadOnly(True); self.texto.setFrameShape(QFrame.Shape.NoFrame); self.texto.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff); self.texto.setStyleSheet("padding: 20px;"); layout_player.addWidget(self.texto)
         
         layout_principal.addWidget(right_container)
@@ -242,7 +262,7 @@ class KaraokePlayer(QMainWindow):
             self.sidebar.hide(); self.tb_frame.hide(); self.showFullScreen()
         else:
             self.sidebar.show(); self.tb_frame.show(); self.showNormal()
-        QTimer.singleShot(100, lambda: self.aplicar_zoom(True))
+        self.timer_zoom.start(100)
 
     # --- FUNÇÕES DA BIBLIOTECA E PLAYLIST ---
     def toggle_sidebar(self):
@@ -250,30 +270,54 @@ class KaraokePlayer(QMainWindow):
         else: self.sidebar.show()
 
     def carregar_lista_hinos(self):
-        self.lista_hinos.clear(); self.cache_hinos = []
-        if not os.path.exists(HINOS_FOLDER_PATH): return
-        files = sorted([f for f in os.listdir(HINOS_FOLDER_PATH) if f.endswith('.json')])
-        for f in files:
-            try:
-                m = re.search(r"(\d+)", f)
-                num = int(m.group(1)) if m else 0
-                with open(os.path.join(HINOS_FOLDER_PATH, f), 'r', encoding='utf-8') as arq:
-                    data = json.load(arq); titulo = data.get('titulo', 'Sem Título')
-                display_text = f"{num}. {titulo}"
-                self.cache_hinos.append((num, display_text))
-            except: pass
-        self.cache_hinos.sort(key=lambda x: x[0])
-        for num, display in self.cache_hinos:
-            item = QListWidgetItem(display); item.setData(Qt.UserRole, num); self.lista_hinos.addItem(item)
+        # Preenche na hora a partir do catálogo salvo; conferir a pasta e montar o índice ficam em segundo plano
+        self.preencher_lista_hinos(self.catalogo.listar())
+        self.geracao_catalogo += 1
+        threading.Thread(target=self.atualizar_catalogo, args=(self.geracao_catalogo, self.indice_busca is None), daemon=True).start()
+
+    def atualizar_catalogo(self, geracao, sem_indice):
+        # Serializado pelo lock: os resultados chegam à interface na ordem em que foram montados, então um
+        # índice antigo nunca sobrescreve um novo. Se já há pedido mais novo, este só acumula as mudanças.
+        with self.lock_catalogo:
+            self.mudancas_pendentes += self.catalogo.atualizar()
+            if geracao != self.geracao_catalogo: return
+            mudou = self.mudancas_pendentes; self.mudancas_pendentes = 0
+            indice = None
+            if mudou or sem_indice:
+                titulos = [(e['numero'], e['titulo']) for e in self.catalogo.listar()]
+                indice = IndiceBusca().construir(titulos, self.catalogo.listar_estrofes())
+            try: self.catalogo_pronto.emit(mudou, indice)
+            except RuntimeError: pass   # janela já fechada
+
+    def receber_catalogo(self, mudou, indice):
+        if indice is not None: self.indice_busca = indice
+        if mudou: self.preencher_lista_hinos(self.catalogo.listar())
+        elif indice is not None: self.filtrar_lista_hinos(self.txt_busca.text())   # refaz a busca em tela
+
+    def preencher_lista_hinos(self, entradas):
+        self.cache_hinos = [(e['numero'], f"{e['numero']}. {e['titulo']}") for e in entradas]
+        self.filtrar_lista_hinos(self.txt_busca.text())
 
     def filtrar_lista_hinos(self, text):
-        self.lista_hinos.clear(); text = text.lower()
-        for num, display in self.cache_hinos:
-            if text in str(num) or text in display.lower():
-                item = QListWidgetItem(display); item.setData(Qt.UserRole, num); self.lista_hinos.addItem(item)
+        self.lista_hinos.setUpdatesEnabled(False); self.lista_hinos.clear(); consulta = text; text = text.strip()
+        if not text or text.isdigit() or self.indice_busca is None:
+            text = text.lower()
+            for num, display in self.cache_hinos:
+                if text in str(num) or text in display.lower():
+                    item = QListWidgetItem(display); item.setData(Qt.UserRole, num); self.lista_hinos.addItem(item)
+        else:
+            # Busca na letra: cada resultado aponta para o hino e a estrofe onde a frase aparece
+            titulos = dict(self.cache_hinos)
+            for num, est_idx, _, trecho in self.indice_busca.buscar(consulta):
+                display = titulos.get(num, f"{num}.")
+                if est_idx >= 0: display += f"\n    ♪ {trecho}"
+                item = QListWidgetItem(display); item.setData(Qt.UserRole, num); item.setData(Qt.UserRole + 1, est_idx)
+                self.lista_hinos.addItem(item)
+        self.lista_hinos.setUpdatesEnabled(True)
 
     def hino_selecionado_lista(self, item):
-        num = item.data(Qt.UserRole); self.carregar_hino(num)
+        num = item.data(Qt.UserRole); est_idx = item.data(Qt.UserRole + 1)
+        self.carregar_hino(num, estrofe=est_idx if est_idx is not None and est_idx > 0 else 0)
 
     def adicionar_a_playlist(self):
         # Pega o item selecionado na biblioteca
@@ -281,7 +325,7 @@ class KaraokePlayer(QMainWindow):
         if not items: return
         for item in items:
             # Clona o item para a playlist
-            new_item = QListWidgetItem(item.text())
+            new_item = QListWidgetItem(item.text().split("\n")[0])
             new_item.setData(Qt.UserRole, item.data(Qt.UserRole))
             self.lista_playlist.addItem(new_item)
         # Muda para a aba playlist para feedback visual
@@ -294,12 +338,31 @@ class KaraokePlayer(QMainWindow):
             self.lista_playlist.takeItem(self.lista_playlist.row(item))
 
     def hino_selecionado_playlist(self, item):
-        num = item.data(Qt.UserRole); self.carregar_hino(num)
+        num = item.data(Qt.UserRole); self.item_playlist_atual = item; self.carregar_hino(num); self.precarregar_proximo_playlist()
+
+    def precarregar_proximo_playlist(self):
+        """ Deixa lido e compilado o hino que vem depois do atual na playlist. """
+        if self.item_playlist_atual is None: return
+        try: row = self.lista_playlist.row(self.item_playlist_atual)
+        except RuntimeError: self.item_playlist_atual = None; return   # item removido da lista
+        if row < 0 or row + 1 >= self.lista_playlist.count(): return
+        num = self.lista_playlist.item(row + 1).data(Qt.UserRole)
+        if num and num != self.hino_atual: self.precarga.agendar(num)
+
+    def preaquecer_hino(self, num):
+        # Pré-carga terminou: mede já o tamanho de fonte da primeira estrofe (precisa da thread da interface)
+        preparado = self.precarga.espiar(num)
+        if preparado and preparado[1]: self.preaquecer_ajuste(preparado[1][0])
+
+    def preaquecer_ajuste(self, tl):
+        h_view = self.texto.viewport().height(); w_view = self.texto.viewport().width()
+        if h_view < 50 or not len(tl): return
+        self.ajustador_fonte.melhor_tamanho(tl.texto(self.mostrar_hifens), w_view - 40, h_view - 40, self.espacamento, self.min_zoom, self.max_zoom)
     # --------------------------------------
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
-        if self.hino_atual > 0 and not self.timer_play.isActive() and self.estrofes_texto: self.timer_zoom.start(150)
+        if self.hino_atual > 0 and not self.agendador.ativo() and self.hino_data: self.timer_zoom.start(150)
 
     def apply_style(self):
         bg = self.colors['cor_fundo_texto']; fg = self.colors['cor_texto_normal']
@@ -308,7 +371,7 @@ class KaraokePlayer(QMainWindow):
         self.tb_frame.setStyleSheet(f"background-color: {self.colors['cor_barra_navegacao']};")
         self.lbl_title.setStyleSheet(f"color: {self.colors['cor_destaque_karaoke']};")
         self.lbl_info.setStyleSheet(f"color: {self.colors['cor_destaque_karaoke']};")
-        font_base = QFont("Arial", int(self.font_size), QFont.Weight.Bold)
+        font_base = fonte(self.font_size, negrito=True)
         self.fmt_norm = QTextCharFormat(); self.fmt_norm.setForeground(QColor(self.colors['cor_texto_normal'])); self.fmt_norm.setFont(font_base)
         self.fmt_dest = QTextCharFormat(); self.fmt_dest.setForeground(QColor(self.colors['cor_destaque_karaoke'])); self.fmt_dest.setFont(font_base) 
         if self.hino_atual > 0: self.aplicar_zoom()
@@ -320,27 +383,20 @@ class KaraokePlayer(QMainWindow):
         cursor.endEditBlock()
 
     def aplicar_zoom(self, forcar=False):
-        if self.timer_play.isActive() or self.hino_atual == 0: return
-        font_base = QFont("Arial", int(self.font_size), QFont.Weight.Bold)
+        if self.agendador.ativo() or self.hino_atual == 0: return
+        font_base = fonte(self.font_size, negrito=True)
         self.texto.setFont(font_base)
         self.fmt_norm = QTextCharFormat(); self.fmt_norm.setForeground(QColor(self.colors['cor_texto_normal'])); self.fmt_norm.setFont(font_base)
-        self.fmt_dest = QTextCharFormat(); self.fmt_dest.setForeground(QColor(self.colors['cor_destaque_karaoke'])); size_dest = min(self.max_zoom, int(self.font_size * 1.5)); self.fmt_dest.setFont(QFont("Arial", size_dest, QFont.Weight.Bold))
+        self.fmt_dest = QTextCharFormat(); self.fmt_dest.setForeground(QColor(self.colors['cor_destaque_karaoke'])); size_dest = min(self.max_zoom, int(self.font_size * 1.5)); self.fmt_dest.setFont(fonte(size_dest, negrito=True))
         cur = QTextCursor(self.texto.document()); cur.clearSelection(); self.texto.setTextCursor(cur)
         if not forcar: return
         QApplication.processEvents(); h_view = self.texto.viewport().height(); w_view = self.texto.viewport().width()
         if h_view < 50: return
         w_util = w_view - 40; h_util = h_view - 40; txt = self.texto.toPlainText()
         if not txt: return
-        doc = QTextDocument(); doc.setPlainText(txt); doc.setTextWidth(w_util)
-        best = self.min_zoom
-        for s in range(self.max_zoom, self.min_zoom -1, -2):
-            f = QFont("Arial", s, QFont.Weight.Bold); doc.setDefaultFont(f); curs = QTextCursor(doc); curs.beginEditBlock(); blk = doc.begin()
-            while blk.isValid():
-                fmt = blk.blockFormat(); fmt.setBottomMargin(self.espacamento); curs.setPosition(blk.position()); curs.setBlockFormat(fmt); blk = blk.next()
-            curs.endEditBlock()
-            if doc.size().height() <= h_util * 0.95: best = s; break
+        best = self.ajustador_fonte.melhor_tamanho(txt, w_util, h_util, self.espacamento, self.min_zoom, self.max_zoom)
         if best != self.font_size:
-            self.font_size = best; config_manager.salvar_config('tamanho_fonte', best); self.aplicar_zoom(); self.aplicar_espacamento()
+            self.font_size = best; config_manager.salvar_config('tamanho_fonte', best, adiado=True); self.aplicar_zoom(); self.aplicar_espacamento()
             cur = QTextCursor(self.texto.document()); cur.select(QTextCursor.Document); cur.setCharFormat(self.fmt_norm); cur.clearSelection(); self.texto.setTextCursor(cur)
 
     def toggle_hifen(self):
@@ -348,12 +404,18 @@ class KaraokePlayer(QMainWindow):
         self.btn_hifen.setText("A-B" if self.mostrar_hifens else "AB")
         if self.hino_atual > 0: self.load_estrofe(self.estrofe_idx)
 
-    def carregar_hino(self, num, force_reload=False):
-        if not force_reload and num == self.hino_atual and self.hino_data: self.load_estrofe(0); return
+    def carregar_hino(self, num, force_reload=False, estrofe=0):
+        # estrofe: a que aparece ao abrir (resultado da busca, volta do editor) - montada uma vez só
+        if not force_reload and num == self.hino_atual and self.hino_data: self.load_estrofe(estrofe); return
         if num < 1 or num > self.max_hinos: return
-        d = ler_arquivo_hino(num)
-        if not d: return
-        self.hino_data = d; self.hino_atual = num
+        preparado = None if force_reload else self.precarga.obter(num)
+        if force_reload: self.precarga.descartar(num)
+        if preparado: d, linhas_tempo = preparado
+        else:
+            d = ler_arquivo_hino(num)
+            if not d: return
+            linhas_tempo = compilar_hino(d)
+        self.hino_data = d; self.hino_atual = num; self.linhas_tempo = linhas_tempo
         self.indice_coro = -1; self.proxima_eh_coro = False; estrofes = d.get('estrofes', [])
         for i, est in enumerate(estrofes):
             if est.get('tipo', '').lower() == 'coro': self.indice_coro = i; break
@@ -372,7 +434,7 @@ class KaraokePlayer(QMainWindow):
         for est in d.get("estrofes", []):
             if est.get('tipo', '').lower() == 'coro': self.estrofes_info.append("Coro")
             else: self.estrofes_info.append(f"{est.get('tipo','Est')} {est.get('numero','')}")
-        self.load_estrofe(0)
+        self.load_estrofe(estrofe if 0 <= estrofe < len(estrofes) else 0)
 
     def load_estrofe(self, idx):
         self.stop_karaoke()
@@ -384,50 +446,23 @@ class KaraokePlayer(QMainWindow):
         else:
             if str(est.get('numero','')).isdigit(): self.ent_est.setText(str(est.get('numero')))
             else: self.ent_est.setText(str(idx+1))
-        self.texto.clear(); self.texto.setFont(QFont("Arial", self.min_zoom, QFont.Weight.Bold))
-        full_text = ""; self.note_durations = []; self.indices = []; current_char_idx = 0
-        PAUSE_SYMBOLS = ["''", "_", '"', "__"]
-        for l_idx, line in enumerate(est.get('linhas', [])):
-            txt = line.get('texto_silabado', '').strip()
-            if l_idx > 0: full_text += "\n"; current_char_idx += 1
-            tokens = get_syllable_tokens(txt); notes = line.get('notas_codes', [])
-            if len(notes) < len(tokens): notes += ["sm"] * (len(tokens) - len(notes))
-            for k, token in enumerate(tokens):
-                note = notes[k]
-                dur = calcular_duracao_ms(note, self.bpm, self.unidade_bpm)
-                self.note_durations.append(dur)
-                if token in PAUSE_SYMBOLS: self.indices.append(None)
-                else:
-                    display_token = token
-                    if not self.mostrar_hifens and display_token.endswith('-'): display_token = display_token[:-1]
-                    prefix = ""
-                    if k > 0:
-                        prev = tokens[k-1]
-                        if not prev.endswith('-') and prev not in PAUSE_SYMBOLS: prefix = " "
-                    if k > 0:
-                        prev = tokens[k-1]
-                        if prev.endswith('-') and not self.mostrar_hifens: prefix = ""
-                        elif prev.endswith('-') and self.mostrar_hifens: prefix = ""
-                    if k == 0: prefix = ""
-                    word_to_display = prefix + display_token; full_text += word_to_display
-                    start_pos = current_char_idx + len(prefix); self.indices.append((start_pos, len(display_token)))
-                    current_char_idx += len(word_to_display)
+        self.texto.clear(); self.texto.setFont(fonte(self.min_zoom, negrito=True))
+        tl = self.linhas_tempo[idx]; full_text = tl.texto(self.mostrar_hifens)
+        self.indices = tl.indices(self.mostrar_hifens); self.note_durations = tl.duracoes_ms(self.bpm, self.unidade_bpm)
         self.texto.setText(full_text); self.texto.setAlignment(Qt.AlignmentFlag.AlignLeft)
-        QTimer.singleShot(50, lambda: self.aplicar_zoom(True))
+        self.timer_zoom.start(50)
 
     # --- LÓGICA DE PLAY/PAUSE/RESUME ---
     def toggle_play_pause(self):
         if self.hino_atual == 0: return
-        if self.timer_play.isActive() or self.timer_wait.isActive(): self.pausar()
+        if self.agendador.ativo() or self.timer_wait.isActive(): self.pausar()
         elif self.is_paused: self.continuar()
         else: self.iniciar_karaoke_com_delay()
 
     def pausar(self):
         self.is_paused = True
-        self.timer_play.stop(); self.timer_wait.stop(); self.timer_beat.stop()
+        self.agendador.pausar(); self.timer_wait.stop()
         self.btn_start.setText("CONTINUAR"); self.btn_start.setStyleSheet("background-color: #FFA500; color: black; font-weight: bold; padding: 6px; border-radius: 4px;")
-        elapsed = (time.time() * 1000) - self.tempo_inicio_nota
-        self.tempo_restante_pausa = max(0, self.duracao_nota_orig - elapsed)
         self.lbl_info.setText(f"{self.lbl_info.text()} (PAUSADO)"); self.lbl_info.setStyleSheet("color: yellow;")
         self.lbl_beat_light.setStyleSheet("background-color: #333; border-radius: 10px; border: 1px solid #555;")
 
@@ -435,11 +470,9 @@ class KaraokePlayer(QMainWindow):
         self.is_paused = False
         self.btn_start.setText("PAUSAR"); self.btn_start.setStyleSheet(f"background:{COR_INICIAR}; color:white; font-weight:bold; padding: 6px; border-radius: 4px;")
         txt = self.lbl_info.text().replace(" (PAUSADO)", ""); self.lbl_info.setText(txt); self.lbl_info.setStyleSheet(f"color: {self.colors['hl']};")
-        ms_beat = 60000 / self.bpm
-        self.timer_beat.start(int(ms_beat))
-        if self.tempo_restante_pausa > 0:
-            self.timer_play.start(int(self.tempo_restante_pausa)); self.tempo_inicio_step = time.time() * 1000 - (self.duracao_nota_orig - self.tempo_restante_pausa)
-        else: self.play_step()
+        if self.agendador.pausado: self.agendador.continuar()
+        elif self.indices and self.pos_atual >= len(self.indices): self.step_wait_for_next()
+        else: self.start_karaoke()
 
     def reiniciar_estrofe(self):
         if self.hino_atual == 0: return
@@ -456,13 +489,15 @@ class KaraokePlayer(QMainWindow):
         else: self.start_karaoke()
 
     def start_karaoke(self): 
-        self.is_paused = False; self.pos_atual = 0; self.tempo_inicio_nota = 0; self.current_beat = 1
-        ms_beat = 60000 / self.bpm
-        self.timer_beat.start(int(ms_beat)); self.flash_beat(); self.play_step()
+        self.is_paused = False; self.pos_atual = 0; self.current_beat = 1
+        # Uma normalização completa por estrofe; daqui em diante play_step só mexe em duas faixas
+        cur = QTextCursor(self.texto.document()); cur.select(QTextCursor.Document); cur.setCharFormat(self.fmt_norm); cur.clearSelection(); self.faixa_destacada = None
+        self.agendador.iniciar(self.note_durations, self.bpm)
+        QTimer.singleShot(0, self.preaquecer_proximo)
 
     def stop_karaoke(self):
-        self.timer_play.stop(); self.timer_wait.stop(); self.timer_beat.stop()
-        self.is_paused = False; self.tempo_restante_pausa = 0
+        self.agendador.parar(); self.timer_wait.stop()
+        self.is_paused = False; self.faixa_destacada = None
         self.lbl_beat_light.setStyleSheet("background-color: #333; border-radius: 10px; border: 1px solid #555;")
         self.btn_start.setText("INICIAR"); self.btn_start.setStyleSheet(f"background:{COR_INICIAR}; color:white; font-weight:bold; padding: 6px; border-radius: 4px;")
         self.lbl_info.setStyleSheet(f"color: {self.colors['hl']};")
@@ -481,33 +516,43 @@ class KaraokePlayer(QMainWindow):
         self.current_beat += 1
         if self.current_beat > self.total_beats: self.current_beat = 1
 
-    def play_step(self):
-        if self.pos_atual >= len(self.indices): self.timer_play.stop(); self.timer_beat.stop(); self.step_wait_for_next(); return
-        ms = self.note_durations[self.pos_atual]; self.duracao_nota_orig = ms; self.tempo_inicio_nota = time.time() * 1000
-        idx_info = self.indices[self.pos_atual]
-        if idx_info is not None:
-            st, ln = idx_info
-            try:
-                if hasattr(self, 'fmt_norm'):
-                    reset_cur = QTextCursor(self.texto.document()); reset_cur.select(QTextCursor.Document); reset_cur.setCharFormat(self.fmt_norm); reset_cur.clearSelection()
-            except: pass
-            cur = QTextCursor(self.texto.document()); cur.setPosition(st); cur.movePosition(QTextCursor.Right, QTextCursor.KeepAnchor, ln); cur.setCharFormat(self.fmt_dest); cur.clearSelection(); self.texto.setTextCursor(cur); self.texto.ensureCursorVisible()
-        else:
-            try:
-                if hasattr(self, 'fmt_norm'):
-                    reset_cur = QTextCursor(self.texto.document()); reset_cur.select(QTextCursor.Document); reset_cur.setCharFormat(self.fmt_norm); reset_cur.clearSelection()
-            except: pass
-        self.pos_atual += 1; self.timer_play.start(int(ms))
-
-    def step_wait_for_next(self):
-        proximo_idx = -1
+    def play_step(self, pos):
+        self.pos_atual = pos + 1
+        try: self.destacar_faixa(self.indices[pos])
+        except: pass
+
+    def destacar_faixa(self, faixa):
+        """ Restiliza só a sílaba anterior e a atual (pausa = nenhuma), nunca o documento inteiro. """
+        doc = self.texto.document()
+        if self.faixa_destacada is not None and self.faixa_destacada != faixa:
+            st, ln = self.faixa_destacada
+            cur = QTextCursor(doc); cur.setPosition(st); cur.movePosition(QTextCursor.Right, QTextCursor.KeepAnchor, ln); cur.setCharFormat(self.fmt_norm)
+        self.faixa_destacada = faixa
+        if faixa is None: return
+        st, ln = faixa
+        cur = QTextCursor(doc); cur.setPosition(st); cur.movePosition(QTextCursor.Right, QTextCursor.KeepAnchor, ln); cur.setCharFormat(self.fmt_dest); cur.clearSelection(); self.texto.setTextCursor(cur); self.texto.ensureCursorVisible()
+
+    def proxima_estrofe_idx(self):
+        """ (próxima estrofe a tocar, próxima estrofe real depois do coro ou None). Não altera o estado. """
         if self.indice_coro != -1 and self.estrofe_idx != self.indice_coro:
-            proximo_idx = self.indice_coro; self.proxima_estrofe_real = self.estrofe_idx + 1
-            if self.proxima_estrofe_real == self.indice_coro: self.proxima_estrofe_real += 1
+            real = self.estrofe_idx + 1
+            if real == self.indice_coro: real += 1
+            return self.indice_coro, real
         elif self.indice_coro != -1 and self.estrofe_idx == self.indice_coro:
-            if hasattr(self, 'proxima_estrofe_real'): proximo_idx = self.proxima_estrofe_real
-            else: proximo_idx = self.estrofe_idx + 1
-        else: proximo_idx = self.estrofe_idx + 1
+            if hasattr(self, 'proxima_estrofe_real'): return self.proxima_estrofe_real, None
+            return self.estrofe_idx + 1, None
+        return self.estrofe_idx + 1, None
+
+    def preaquecer_proximo(self):
+        """ Durante a estrofe: ajuste de fonte da próxima e, na última, pré-carga do próximo hino da playlist. """
+        if not self.hino_data: return
+        proximo_idx, _ = self.proxima_estrofe_idx()
+        if proximo_idx < len(self.linhas_tempo): self.preaquecer_ajuste(self.linhas_tempo[proximo_idx])
+        else: self.precarregar_proximo_playlist()
+
+    def step_wait_for_next(self):
+        proximo_idx, real = self.proxima_estrofe_idx()
+        if real is not None: self.proxima_estrofe_real = real
 
         if proximo_idx < len(self.hino_data.get('estrofes', [])):
             self.wait_sec = self.strofe_delay if self.strofe_delay > 0 else 2
@@ -538,7 +583,7 @@ class KaraokePlayer(QMainWindow):
     def abrir_editor(self):
         if not self.hino_data: return
         self.stop_karaoke(); dlg = EditorDialog(self.hino_atual, self.estrofe_idx, self)
-        if dlg.exec(): self.carregar_hino(self.hino_atual, force_reload=True); self.load_estrofe(self.estrofe_idx)
+        if dlg.exec(): self.carregar_hino(self.hino_atual, force_reload=True, estrofe=self.estrofe_idx); self.carregar_lista_hinos()
 
     def nav_estrofe(self, d):
         if self.hino_atual == 0: return
@@ -560,18 +605,8 @@ class KaraokePlayer(QMainWindow):
                 except: pass
 
     def change_bpm(self, d):
-        self.bpm = max(10, self.bpm + d); self.lbl_bpm.setText(f"BPM: {self.bpm}"); config_manager.salvar_config('BPM_padrao', self.bpm)
-        if self.timer_play.isActive():
-            self.timer_play.stop(); elapsed = (time.time() * 1000) - self.tempo_inicio_nota
-            ratio = elapsed / self.duracao_nota_orig if self.duracao_nota_orig > 0 else 0
-            rem = self.duracao_nota_orig * (1 - ratio); self.timer_play.start(max(10, int(rem)))
-            self.timer_beat.setInterval(int(60000/self.bpm))
-        if self.hino_data:
-             est = self.hino_data['estrofes'][self.estrofe_idx]; new_durs = []
-             for line in est.get('linhas', []):
-                 sils = get_syllable_tokens(line.get('texto_silabado','')); notes = line.get('notas_codes', [])
-                 if len(notes) < len(sils): notes += ["sm"]*(len(sils)-len(notes))
-                 durs = [calcular_duracao_ms(n, self.bpm, self.unidade_bpm) for n in notes[:len(sils)]]; new_durs.extend(durs)
-             self.note_durations = new_durs
+        self.bpm = max(10, self.bpm + d); self.lbl_bpm.setText(f"BPM: {self.bpm}"); config_manager.salvar_config('BPM_padrao', self.bpm, adiado=True)
+        if self.linhas_tempo: self.note_durations = self.linhas_tempo[self.estrofe_idx].duracoes_ms(self.bpm, self.unidade_bpm)
+        if self.agendador.rodando: self.agendador.mudar_andamento(self.note_durations, self.bpm)
 
     def abrir_tela_configuracao(self): dlg = ConfigDialog(self); dlg.exec()
\ No newline at end of file
@@ -0,0 +1,50 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from PySide6.QtCore import QObject, Signal
+from logic import ler_arquivo_hino
+from linha_tempo import compilar_hino
+
+class PreCarregador(QObject):
+    """ Lê e compila os próximos hinos em segundo plano, para a troca de hino não esperar o disco.
+        Só faz trabalho sem Qt (JSON + LinhaDoTempo); o ajuste de fonte fica para a thread da interface. """
+    pronto = Signal(int)   # hino pré-carregado (emitido após o futuro concluir, entregue na thread da interface)
+
+    def __init__(self, parent=None, capacidade=4):
+        super().__init__(parent)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="precarga")
+        self.futuros = OrderedDict(); self.capacidade = capacidade; self.lock = threading.Lock()
+
+    def agendar(self, num):
+        with self.lock:
+            if num in self.futuros: self.futuros.move_to_end(num); return
+            fut = self.futuros[num] = self.executor.submit(self._preparar, num)
+            fut.add_done_callback(lambda f, n=num: f.cancelled() or self._avisar(n))
+            while len(self.futuros) > self.capacidade: self.futuros.popitem(last=False)[1].cancel()
+
+    def _preparar(self, num):
+        d = ler_arquivo_hino(num)
+        return (d, compilar_hino(d)) if d else None
+
+    def _avisar(self, num):
+        """ Chamado com o resultado já guardado no futuro, então espiar() o encontra pronto. """
+        try: self.pronto.emit(num)
+        except: pass   # janela já fechada
+
+    def espiar(self, num):
+        """ (hino_data, linhas_tempo) se já estiver pronto, sem consumir; senão None. """
+        with self.lock: fut = self.futuros.get(num)
+        if fut is None or not fut.done() or fut.cancelled(): return None
+        try: return fut.result()
+        except Exception: return None
+
+    def obter(self, num):
+        """ Consome o pré-carregamento. Se ainda nem começou, desiste (a leitura direta é mais rápida que a fila). """
+        with self.lock: fut = self.futuros.pop(num, None)
+        if fut is None or fut.cancel(): return None
+        try: return fut.result()
+        except Exception: return None
+
+    def descartar(self, num):
+        with self.lock: fut = self.futuros.pop(num, None)
+        if fut is not None: fut.cancel()
@@ -0,0 +1,217 @@
+# benchmarks.py - Micro-benchmarks do editor. Uso: python benchmarks.py [nome ...]  (sem nomes roda todos)
+
+import sys
+import time
+import random
+from pathlib import Path
+
+# Adicionar pasta do projeto ao path (e a raiz do repositorio, para compartilhado/)
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(1, str(Path(__file__).resolve().parent.parent))
+
+from PIL import Image, ImageDraw, ImageFont, ImageEnhance, ImageOps
+from core.config import GLOBAL_CONFIG_DEFAULT, RENDER_WORKERS
+
+
+def medir(func, repeticoes=3):
+    """Melhor tempo (ms) entre as repeticoes"""
+    melhor = None
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        func()
+        dt = (time.perf_counter() - t0) * 1000
+        melhor = dt if melhor is None else min(melhor, dt)
+    return melhor
+
+
+def pagina_sintetica(w=2480, h=3508, seed=0):
+    """Pagina A4 a 300dpi com 'pautas' e borroes de texto, para o renderer ter o que recortar"""
+    rnd = random.Random(seed)
+    img = Image.new("RGBA", (w, h), "white")
+    draw = ImageDraw.Draw(img)
+    for y in range(300, h - 200, 400):
+        for k in range(5):
+            draw.line([(100, y + k * 20), (w - 100, y + k * 20)], fill="black", width=2)
+        for x in range(150, w - 150, 60):
+            draw.text((x, y + 140), rnd.choice(["la", "mi", "sol", "do", "re"]), fill="black")
+    return img
+
+
+def estado_sintetico(n_notas, pages):
+    """Notas distribuidas pelas pautas das paginas, no formato de get_current_state"""
+    rnd = random.Random(n_notas)
+    tipos = ["SEMINIMA", "COLCHEIA", "MINIMA", "SEMINIMA PONTUADA", "PAUSA SEMINIMA"]
+    itens = [{'type': 'TAG', 't': 'TAG_VERSO', 'x': 120, 'y': 300}]
+    acumulado = 0
+    por_pagina = max(1, n_notas // len(pages))
+    for img in pages:
+        for i in range(por_pagina):
+            linha = i // 30
+            y = acumulado + 300 + (linha % 8) * 400
+            itens.append({'type': 'NOTE', 't': rnd.choice(tipos), 'x': 150 + (i % 30) * 75, 'y': y})
+        acumulado += img.height + 20
+    return itens
+
+
+def bench_recortes():
+    """Render de hinos grandes: recortes em serie x em paralelo (confere que a saida e identica)"""
+    from rendering.layout import compute_layout, paint_layout
+    font = ImageFont.load_default()
+    print(f"{'notas':>6} {'paginas':>8} {'serie ms':>10} {'paralelo ms':>12} {'threads':>8}")
+    for n_notas, n_paginas in ((100, 1), (300, 2), (600, 3)):
+        pages = [pagina_sintetica(seed=i) for i in range(n_paginas)]
+        state = estado_sintetico(n_notas, pages)
+        ops, w, h = compute_layout(state, (800, 20, 1600, 200), None, [p.size for p in pages],
+                                   GLOBAL_CONFIG_DEFAULT, font, font)
+        serial = paint_layout(ops, w, h, pages, workers=1)
+        paralelo = paint_layout(ops, w, h, pages, workers=RENDER_WORKERS)
+        assert serial.tobytes() == paralelo.tobytes(), "saida paralela diferente da serial"
+        t_serial = medir(lambda: paint_layout(ops, w, h, pages, workers=1))
+        t_par = medir(lambda: paint_layout(ops, w, h, pages, workers=RENDER_WORKERS))
+        print(f"{n_notas:>6} {n_paginas:>8} {t_serial:>10.1f} {t_par:>12.1f} {RENDER_WORKERS:>8}")
+
+
+def bench_incremental():
+    """Preview apos mover uma nota: folha inteira x so as linhas alteradas (confere que a saida e identica)"""
+    from rendering.layout import compute_layout, paint_layout, IncrementalCompositor
+    font = ImageFont.load_default()
+    print(f"{'notas':>6} {'paginas':>8} {'inteiro ms':>11} {'incremental ms':>15} {'linhas':>8}")
+    for n_notas, n_paginas in ((100, 1), (300, 2), (600, 3)):
+        pages = [pagina_sintetica(seed=i) for i in range(n_paginas)]
+        state = estado_sintetico(n_notas, pages)
+        layout = lambda st: compute_layout(st, (800, 20, 1600, 200), None, [p.size for p in pages],
+                                           GLOBAL_CONFIG_DEFAULT, font, font)
+        chaves = [("sintetica", i) for i in range(n_paginas)]
+        comp = IncrementalCompositor()
+        comp.update(*layout(state), pages, chaves, workers=RENDER_WORKERS)
+        # Edicao: a nota do meio troca de tipo e anda alguns pixels, alternando a cada repeticao
+        alvo = len(state) // 2
+        variantes = [state, [dict(it) for it in state]]
+        variantes[1][alvo].update(t="MINIMA", x=variantes[1][alvo]['x'] + 7)
+        layouts = [layout(v) for v in variantes]
+        estado = {'i': 0}
+
+        def passo_incremental():
+            estado['i'] += 1
+            ops, w, h = layouts[estado['i'] % 2]
+            comp.update(ops, w, h, pages, chaves, workers=RENDER_WORKERS)
+
+        for ops, w, h in layouts:
+            inteiro = paint_layout(ops, w, h, pages, workers=RENDER_WORKERS)
+            assert comp.update(ops, w, h, pages, chaves, workers=RENDER_WORKERS).tobytes() == inteiro.tobytes(), \
+                "render incremental diferente do inteiro"
+        ops, w, h = layouts[1]
+        t_inteiro = medir(lambda: paint_layout(ops, w, h, pages, workers=RENDER_WORKERS))
+        t_incr = medir(passo_incremental)
+        refeitas, total = comp.last_stats
+        print(f"{n_notas:>6} {n_paginas:>8} {t_inteiro:>11.1f} {t_incr:>15.1f} {refeitas:>4}/{total:<3}")
+
+
+def _recorte_antigo(pagina, box, size, contrast, grayscale):
+    # Cadeia anterior a compartilhado/enhance.py, mantida so para comparacao
+    img = pagina.crop(box).resize(size, Image.Resampling.LANCZOS)
+    img = ImageEnhance.Contrast(img).enhance(contrast)
+    if grayscale:
+        img = ImageOps.grayscale(img).convert("RGB")
+    return img
+
+
+def bench_realce():
+    """Contraste/cinza dos recortes: cadeia ImageEnhance/ImageOps x tabela unica (confere a saida,
+    tambem numa pagina colorida, onde o cinza nao pode vir antes do contraste)"""
+    from rendering.layout import CropJob, process_crop
+    cinza = pagina_sintetica()
+    r, g, b, a = cinza.split()
+    colorida = Image.merge("RGBA", (r, g.point(lambda v: v * 3 // 4), b.point(lambda v: v // 2), a))
+    casos = (("cabecalho", cinza, (800, 20, 1600, 200), 2.0, True),
+             ("compasso", cinza, (100, 300, 220, 420), 2.0, True),
+             ("silaba", cinza, (400, 420, 460, 510), 1.5, False),
+             ("cab. cor", colorida, (800, 20, 1600, 200), 2.0, True),
+             ("sil. cor", colorida, (400, 420, 460, 510), 1.5, False))
+    print(f"{'recorte':>10} {'antigo ms':>10} {'tabela ms':>10} {'ganho':>6}")
+    for nome, pagina, box, contrast, grayscale in casos:
+        size = (int((box[2] - box[0]) * 1.3), int((box[3] - box[1]) * 1.3))
+        job = CropJob(0, box, size, contrast, grayscale)
+        antigo = _recorte_antigo(pagina, box, size, contrast, grayscale)
+        novo = process_crop([pagina], job)
+        assert antigo.convert("RGB").tobytes() == novo.convert("RGB").tobytes(), f"{nome}: saida diferente"
+        rep = 200
+        t_antigo = medir(lambda: [_recorte_antigo(pagina, box, size, contrast, grayscale) for _ in range(rep)]) / rep
+        t_novo = medir(lambda: [process_crop([pagina], job) for _ in range(rep)]) / rep
+        print(f"{nome:>10} {t_antigo:>10.3f} {t_novo:>10.3f} {t_antigo / t_novo:>5.1f}x")
+
+
+def bench_faixas():
+    """Exportacao: folha inteira x faixas (confere que as faixas empilhadas reproduzem a folha)"""
+    from rendering.layout import compute_layout, paint_layout, paint_strips
+    font = ImageFont.load_default()
+    print(f"{'notas':>6} {'paginas':>8} {'inteiro ms':>11} {'faixas ms':>10} {'faixas':>7} {'maior faixa MB':>15} {'folha MB':>9}")
+    for n_notas, n_paginas in ((300, 2), (900, 6)):
+        pages = [pagina_sintetica(seed=i) for i in range(n_paginas)]
+        state = estado_sintetico(n_notas, pages)
+        ops, w, h = compute_layout(state, (800, 20, 1600, 200), None, [p.size for p in pages],
+                                   GLOBAL_CONFIG_DEFAULT, font, font)
+        inteiro = paint_layout(ops, w, h, pages, workers=RENDER_WORKERS)
+        montada = Image.new('RGB', (w, h), 'white')
+        alturas = []
+        for y0, faixa in paint_strips(ops, w, h, lambda i: pages[i], 2000, RENDER_WORKERS):
+            montada.paste(faixa, (0, y0))
+            alturas.append(faixa.height)
+        assert montada.tobytes() == inteiro.tobytes(), "faixas diferentes da folha inteira"
+        t_inteiro = medir(lambda: paint_layout(ops, w, h, pages, workers=RENDER_WORKERS))
+        t_faixas = medir(lambda: [f for f in paint_strips(ops, w, h, lambda i: pages[i], 2000, RENDER_WORKERS)])
+        mb = lambda altura: w * altura * 3 / (1024 * 1024)
+        print(f"{n_notas:>6} {n_paginas:>8} {t_inteiro:>11.1f} {t_faixas:>10.1f} {len(alturas):>7} "
+              f"{mb(max(alturas)):>15.1f} {mb(h):>9.1f}")
+
+
+def bench_rolagem():
+    """Rolagem de uma cena com 1000 notas: boundingRect largo anterior x justo, perto e longe (nivel de detalhe)"""
+    import os
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication, QGraphicsView
+    from PyQt6.QtCore import QRectF
+    from PyQt6.QtGui import QPainter
+    from ui.graphics_items import NoteItem
+    from ui.graphics_scene import MusicalScene
+
+    class NotaLarga(NoteItem):
+        # Retangulo anterior, mantido so para comparacao
+        def boundingRect(self):
+            return QRectF(-150, -100, 300, 400)
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    print(f"{'retangulo':>10} {'zoom':>6} {'quadros':>8} {'ms/quadro':>10}")
+    for nome, classe in (("largo", NotaLarga), ("justo", NoteItem)):
+        scene = MusicalScene()
+        for i in range(1000):
+            scene.addItem(classe("SEMINIMA", 150 + (i % 30) * 75, 300 + (i // 30) * 200, lambda: False))
+        view = QGraphicsView(scene)
+        view.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.SmartViewportUpdate)
+        view.setRenderHint(QPainter.RenderHint.Antialiasing)
+        view.resize(1200, 800)
+        view.show()
+        for zoom in (1.0, 0.25):
+            view.resetTransform()
+            view.scale(zoom, zoom)
+            app.processEvents()
+            bar = view.verticalScrollBar()
+            posicoes = list(range(bar.minimum(), bar.maximum() + 1, max(1, (bar.maximum() - bar.minimum()) // 60)))
+
+            def rolar():
+                for v in posicoes:
+                    bar.setValue(v)
+                    view.viewport().repaint()
+
+            t = medir(rolar)
+            print(f"{nome:>10} {zoom:>6.2f} {len(posicoes):>8} {t / len(posicoes):>10.2f}")
+        view.close()
+
+
+BENCHMARKS = {'recortes': bench_recortes, 'incremental': bench_incremental, 'realce': bench_realce,
+              'faixas': bench_faixas, 'rolagem': bench_rolagem}
+
+if __name__ == "__main__":
+    for nome in (sys.argv[1:] or BENCHMARKS):
+        print(f"== {nome} ==")
+        BENCHMARKS[nome]()
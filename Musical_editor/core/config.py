@@ -32,7 +32,8 @@ GLOBAL_CONFIG_DEFAULT = {
     "BOTTOM_PADDING": 50,
     "SNAP_GRID": 20,
     "API_COOLDOWN": 40,
-    "AUTO_PREVIEW_DELAY": 2000
+    "AUTO_PREVIEW_DELAY": 2000,
+    "FONT_FILES": "arial.ttf, Arial.ttf, LiberationSans-Regular.ttf, DejaVuSans.ttf, FreeSans.ttf"  # ordem de preferencia (FontRegistry)
 }
 
 # Configuração global (padrão)
@@ -62,6 +63,9 @@ MAPA_ATALHOS = {
 
 # ====================== CONSTANTES ======================
 MAX_HIST = 50
+PAGE_CACHE_MAX_MB = 512  # paginas decodificadas mantidas em memoria, PIL e QPixmap somados; cada tipo so remove os seus (core/page_cache.py)
+RENDER_WORKERS = max(1, min(8, os.cpu_count() or 1))  # threads para os recortes (resize/contraste); o render inteiro ganha no maximo ~1.3x (rendering/layout.py process_crops)
+STRIP_HEIGHT = 4000  # altura alvo (px) de cada faixa na exportacao em faixas
 
 # ====================== API ======================
 MINHA_API_KEY = os.getenv("GEMINI_API_KEY")
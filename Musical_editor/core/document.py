@@ -0,0 +1,225 @@
+# document.py - Modelo de documento das notas, independente da cena
+#
+# Cada nota/tag/caixa e um NoteRecord compacto (__slots__). O documento mantem notas e tags
+# numa lista ordenada por Y (insercao/remocao com bisect), entao a ordem de leitura - linhas
+# agrupadas por LINE_THRESHOLD e cada linha por X - sai de uma passada linear, sem reordenar
+# tudo a cada salvamento ou render. Salvar, renderizar, desfazer e a busca da tag de coro leem daqui.
+# As tags tambem ficam num TagRegionIndex, que responde por bisect qual tag governa um ponto.
+
+import math
+from bisect import bisect_left, bisect_right
+from itertools import count
+from operator import itemgetter
+
+LINE_THRESHOLD = 80    # diferenca de Y (px) ate a qual duas notas estao na mesma linha
+TAG_REACH_Y = 50       # tag vale para notas abaixo dela, ou na mesma altura e a direita
+
+
+def group_rows(items, get_x, get_y):
+    """Itens ja ordenados por Y -> ordem de leitura (linha a linha, cada linha por X).
+    A linha comeca no primeiro item e inclui os seguintes a menos de LINE_THRESHOLD dele."""
+    ordered = []
+    line = []
+    line_y_ref = None
+    for it in items:
+        y = get_y(it)
+        if line and abs(y - line_y_ref) < LINE_THRESHOLD:
+            line.append(it)
+            continue
+        if line:
+            line.sort(key=get_x)
+            ordered.extend(line)
+        line = [it]
+        line_y_ref = y
+    if line:
+        line.sort(key=get_x)
+        ordered.extend(line)
+    return ordered
+
+
+def reading_order(items, get_x=itemgetter('x'), get_y=itemgetter('y')):
+    """Ordem de leitura de itens soltos (estado vindo de arquivo): ordena por Y e agrupa"""
+    return group_rows(sorted(items, key=get_y), get_x, get_y)
+
+
+def is_chorus_tag(tipo):
+    return "CORO" in tipo or "FINAL" in tipo
+
+
+class TagRegionIndex:
+    """Tags de secao ordenadas por (y, x, seq). Uma tag governa (x, y) se esta acima dela
+    (mais de TAG_REACH_Y) ou na mesma altura e a esquerda; vale a ultima nessa ordem.
+
+    As tags bem acima do ponto formam um prefixo da lista e as da mesma altura o bloco
+    seguinte: dois bisects e uma volta curta so pelo bloco (faixa de 2*TAG_REACH_Y px)."""
+
+    def __init__(self):
+        self._keys = []     # (y, x, seq)
+        self._tags = []     # (tipo, valor) paralelo a _keys
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, x, y, seq, tipo, value=None):
+        key = (y, x, seq)
+        idx = bisect_left(self._keys, key)
+        self._keys.insert(idx, key)
+        self._tags.insert(idx, (tipo, value))
+
+    def remove(self, x, y, seq):
+        idx = bisect_left(self._keys, (y, x, seq))
+        if idx < len(self._keys) and self._keys[idx] == (y, x, seq):
+            del self._keys[idx]
+            del self._tags[idx]
+
+    def clear(self):
+        self._keys, self._tags = [], []
+
+    def governing(self, x, y):
+        """(tipo, valor) da tag que governa o ponto, ou None"""
+        above = bisect_left(self._keys, (y - TAG_REACH_Y,))
+        end = bisect_right(self._keys, (y + TAG_REACH_Y, math.inf))
+        for idx in range(end - 1, above - 1, -1):
+            if self._keys[idx][1] < x:
+                return self._tags[idx]
+        return self._tags[above - 1] if above else None
+
+    def chorus_at(self, x, y):
+        """Ponto em regiao de CORO/FINAL (recorte com os parametros CHORUS_*)"""
+        tag = self.governing(x, y)
+        return tag is not None and is_chorus_tag(tag[0])
+
+    @classmethod
+    def from_state(cls, items):
+        """Indice das tags de um estado do renderer (dicts com type/t/x/y)"""
+        index = cls()
+        for seq, it in enumerate(items):
+            if it['type'] == 'TAG':
+                index.add(it['x'], it['y'], seq, it['t'], it)
+        return index
+
+
+class NoteRecord:
+    """Nota, tag ou caixa. kind: 'NOTE', 'TAG', 'HEADER' ou 'TIME'.
+    cp: recorte individual {'w','h','y'} (so notas). rect: (left, top, w, h) local (so caixas)."""
+    __slots__ = ('kind', 'tipo', 'x', 'y', 'cp', 'rect', 'key')
+
+    def __init__(self, kind, tipo, x=0.0, y=0.0, cp=None, rect=None):
+        self.kind = kind
+        self.tipo = tipo
+        self.x = x
+        self.y = y
+        self.cp = cp
+        self.rect = rect
+        self.key = None   # (y, seq) enquanto esta no documento
+
+
+class NoteDocument:
+    def __init__(self):
+        self._seq = count()
+        self._keys = []      # (y, seq) ordenado - notas e tags
+        self._records = []   # paralelo a _keys
+        self.tags = TagRegionIndex()   # so tags, valor = registro
+        self.boxes = []      # cabecalho/compasso, em ordem de insercao
+        self._order = None   # ordem de leitura em cache, refeita na proxima leitura apos mudanca
+
+    def __len__(self):
+        return len(self._records) + len(self.boxes)
+
+    def _insert(self, rec):
+        rec.key = (rec.y, next(self._seq))
+        idx = bisect_left(self._keys, rec.key)
+        self._keys.insert(idx, rec.key)
+        self._records.insert(idx, rec)
+        if rec.kind == 'TAG':
+            self.tags.add(rec.x, rec.y, rec.key[1], rec.tipo, rec)
+
+    def _discard(self, rec):
+        idx = bisect_left(self._keys, rec.key)
+        del self._keys[idx]
+        del self._records[idx]
+        if rec.kind == 'TAG':
+            self.tags.remove(rec.x, rec.y, rec.key[1])
+        rec.key = None
+
+    def add(self, rec):
+        if rec.key is not None or rec in self.boxes:
+            return
+        if rec.kind in ('HEADER', 'TIME'):
+            self.boxes.append(rec)
+        else:
+            self._insert(rec)
+        self._order = None
+
+    def remove(self, rec):
+        if rec.kind in ('HEADER', 'TIME'):
+            if rec not in self.boxes:
+                return
+            self.boxes.remove(rec)
+        elif rec.key is None:
+            return
+        else:
+            self._discard(rec)
+        self._order = None
+
+    def move(self, rec, x, y):
+        """Nova posicao; so notas/tags no documento trocam de lugar na lista ordenada"""
+        if rec.x == x and rec.y == y:
+            return
+        if rec.key is None:
+            rec.x, rec.y = x, y
+            return
+        self._discard(rec)
+        rec.x, rec.y = x, y
+        self._insert(rec)
+        self._order = None
+
+    def clear(self):
+        for rec in self._records:
+            rec.key = None
+        self._keys, self._records, self.boxes = [], [], []
+        self.tags.clear()
+        self._order = None
+
+    def ordered(self):
+        """Notas e tags em ordem de leitura"""
+        if self._order is None:
+            self._order = group_rows(self._records, lambda r: r.x, lambda r: r.y)
+        return self._order
+
+    def to_saved(self):
+        """Formato do JSON do projeto (tipo/x/y/custom_*, caixas com w/h), em ordem de leitura"""
+        out = []
+        for rec in self.ordered():
+            data = {"tipo": rec.tipo, "x": round(rec.x, 1), "y": round(rec.y, 1)}
+            if rec.kind == 'NOTE' and rec.cp:
+                data['custom_w'] = rec.cp['w']
+                data['custom_h'] = rec.cp['h']
+                data['custom_y'] = rec.cp['y']
+            out.append(data)
+        for rec in self.boxes:
+            out.append({
+                "tipo": rec.tipo,
+                "x": round(rec.x, 1), "y": round(rec.y, 1),
+                "w": round(rec.rect[2], 1), "h": round(rec.rect[3], 1)
+            })
+        return out
+
+    def to_render_state(self):
+        """Snapshot para o ImageRenderer (formato de get_current_state), notas ja em ordem de leitura"""
+        out = []
+        for rec in self.ordered():
+            d = {'type': rec.kind, 't': rec.tipo, 'x': rec.x, 'y': rec.y}
+            if rec.cp:
+                d['cp'] = dict(rec.cp)
+            out.append(d)
+        for rec in self.boxes:
+            left, top, w, h = rec.rect
+            out.append({
+                'type': rec.kind,
+                'r': (rec.x, rec.y, rec.x + w, rec.y + h),
+                'box': (rec.x + left, rec.y + top, rec.x + left + w, rec.y + top + h),
+                'x': rec.x,
+                'y': rec.y
+            })
+        return out
@@ -0,0 +1,6 @@
+# fonts.py
+# O FontRegistry fica em compartilhado/font_registry.py (fora do editor, compartilhado com o player);
+# o log dele e ligado ao do editor por init_logger (core/logger.py).
+from compartilhado.font_registry import FontRegistry, FONT_FILES, FONT_SEARCH_DIRS
+
+__all__ = ["FontRegistry", "FONT_FILES", "FONT_SEARCH_DIRS"]
@@ -74,6 +74,12 @@ def log_warning(msg):
 
 def init_logger():
     """Inicializa logger na startup"""
+    # Modulos compartilhados (compartilhado/font_registry.py) usam logging puro: mesmo arquivo e console
+    shared = logging.getLogger("compartilhado")
+    shared.setLevel(logging.DEBUG)
+    for handler in (file_handler, console_handler):
+        if handler not in shared.handlers:
+            shared.addHandler(handler)
     print("=" * 60)
     print("LOGGER INICIALIZADO")
     print(f"Arquivo de log: {LOG_FILE}")
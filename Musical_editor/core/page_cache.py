@@ -0,0 +1,134 @@
+# page_cache.py
+import os
+import threading
+from collections import OrderedDict
+from PIL import Image
+from core.config import PAGE_CACHE_MAX_MB
+from core.logger import log_debug, log_error
+
+
+class PageCache:
+    """Paginas de partitura ja decodificadas, compartilhadas por renderer, cena e preview.
+
+    Chave: (caminho, mtime_ns, tamanho) - arquivo alterado no disco gera nova entrada.
+    As imagens devolvidas sao compartilhadas: quem for alterar deve trabalhar numa copia.
+    Imagens PIL e QPixmaps dividem um unico orcamento (PAGE_CACHE_MAX_MB, somados), mas cada insercao
+    so remove entradas do proprio tipo: um decode no RenderWorker nunca solta um QPixmap fora da
+    thread da interface (os pixmaps saem quando a propria interface guarda outro pixmap).
+    O pixmap da cena nao deixa uma copia PIL no cache: ela so entra quando o renderer pede a pagina.
+    """
+    _entries = OrderedDict()   # (path, mtime_ns, size, kind) -> (obj, n_bytes)
+    _total_bytes = 0
+    _lock = threading.RLock()
+
+    @classmethod
+    def page_key(cls, path):
+        """(caminho, mtime_ns, tamanho): identifica a versao do arquivo no disco (OSError se nao existe)"""
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        return (path, st.st_mtime_ns, st.st_size)
+
+    @classmethod
+    def _key(cls, path, kind):
+        return cls.page_key(path) + (kind,)
+
+    @classmethod
+    def _get(cls, key):
+        with cls._lock:
+            entry = cls._entries.get(key)
+            if entry is not None:
+                cls._entries.move_to_end(key)
+                return entry[0]
+        return None
+
+    @classmethod
+    def _put(cls, key, obj, n_bytes):
+        with cls._lock:
+            # Versoes antigas do mesmo arquivo nao servem mais
+            stale = [k for k in cls._entries if k[0] == key[0] and k[3] == key[3] and k != key]
+            for k in stale:
+                cls._total_bytes -= cls._entries.pop(k)[1]
+            if key not in cls._entries:
+                cls._entries[key] = (obj, n_bytes)
+                cls._total_bytes += n_bytes
+            cls._evict(key[3])
+            return cls._entries[key][0] if key in cls._entries else obj
+
+    @classmethod
+    def _evict(cls, kind):
+        """Remove as entradas mais antigas do tipo kind ate caber no orcamento (a mais recente fica)"""
+        budget = PAGE_CACHE_MAX_MB * 1024 * 1024
+        if cls._total_bytes <= budget:
+            return
+        for key in [k for k in cls._entries if k[3] == kind][:-1]:
+            cls._total_bytes -= cls._entries.pop(key)[1]
+            log_debug(f"PageCache: removendo {os.path.basename(key[0])} ({kind})")
+            if cls._total_bytes <= budget:
+                break
+
+    @classmethod
+    def get_image(cls, path):
+        """Pagina como PIL RGBA (decodificada uma unica vez por versao do arquivo)"""
+        try:
+            key = cls._key(path, "pil")
+        except OSError:
+            return None
+        img = cls._get(key)
+        if img is not None:
+            return img
+        img = cls._decode(path)
+        if img is None:
+            return None
+        return cls._put(key, img, img.width * img.height * 4)
+
+    @classmethod
+    def _decode(cls, path):
+        try:
+            with Image.open(path) as src:
+                img = src.convert("RGBA")
+        except Exception as e:
+            log_error(f"Erro ao decodificar pagina {path}", e)
+            return None
+        log_debug(f"PageCache: decodificada {os.path.basename(path)} {img.width}x{img.height}")
+        return img
+
+    @classmethod
+    def get_pixmap(cls, path):
+        """Pagina como QPixmap para a cena. Reaproveita a imagem PIL se ela ja estiver em cache; senao
+        decodifica so para montar o pixmap e solta a copia PIL. Deve ser chamado na thread da interface."""
+        from PyQt6.QtGui import QImage, QPixmap
+        try:
+            key = cls._key(path, "pixmap")
+        except OSError:
+            return None
+        pix = cls._get(key)
+        if pix is not None:
+            return pix
+        img = cls._get(key[:3] + ("pil",))
+        if img is None:
+            img = cls._decode(path)
+        if img is None:
+            return None
+        im_data = img.tobytes("raw", "RGBA")  # precisa existir ate o fromImage copiar
+        qimage = QImage(im_data, img.width, img.height, QImage.Format.Format_RGBA8888)
+        pix = QPixmap.fromImage(qimage)
+        if pix.isNull():
+            return None
+        return cls._put(key, pix, img.width * img.height * 4)
+
+    @classmethod
+    def invalidate(cls, path=None):
+        """Esquece um arquivo (ou tudo, com path=None)"""
+        with cls._lock:
+            if path is None:
+                cls._entries.clear()
+                cls._total_bytes = 0
+                return
+            path = os.path.abspath(path)
+            for k in [k for k in cls._entries if k[0] == path]:
+                cls._total_bytes -= cls._entries.pop(k)[1]
+
+    @classmethod
+    def stats(cls):
+        with cls._lock:
+            return {"entradas": len(cls._entries), "mb": round(cls._total_bytes / (1024 * 1024), 1)}
@@ -0,0 +1,38 @@
+# page_layout.py
+from bisect import bisect_right
+
+PAGE_GAP = 20  # espaco entre paginas empilhadas (a linha separadora fica no meio dele)
+
+
+class PageLayout:
+    """Paginas empilhadas na vertical com PAGE_GAP entre elas.
+
+    Unica fonte da regra de empilhamento: a cena posiciona as paginas por offsets e o
+    renderer descobre a pagina de cada nota por find_page (bisect na tabela de offsets).
+    """
+    __slots__ = ("sizes", "gap", "offsets", "total_height")
+
+    def __init__(self, page_sizes, gap=PAGE_GAP):
+        self.sizes = [tuple(size) for size in page_sizes]
+        self.gap = gap
+        self.offsets = []
+        y = 0
+        for _, h in self.sizes:
+            self.offsets.append(y)
+            y += h + gap
+        self.total_height = y
+
+    def __len__(self):
+        return len(self.sizes)
+
+    def find_page(self, y):
+        """(indice da pagina, y relativo a ela) para um y da cena; (None, 0) fora das paginas.
+        Cada pagina responde pela propria altura mais o espaco abaixo dela."""
+        if y < 0 or y >= self.total_height:
+            return None, 0
+        idx = bisect_right(self.offsets, y) - 1
+        return idx, y - self.offsets[idx]
+
+    def separator_y(self, idx):
+        """Y da linha que separa a pagina idx da seguinte"""
+        return self.offsets[idx] + self.sizes[idx][1] + self.gap // 2
@@ -174,3 +174,44 @@ class GeminiWorker(QThread):
             log_error(f"Erro geral no GeminiWorker", error_msg)
             self.progress_signal.emit(f"Erro: {str(error_msg)}")
             self.finished_signal.emit("", False, str(error_msg))
+
+
+class RenderWorker(QThread):
+    """Renderiza o preview fora da thread da interface.
+
+    Recebe um snapshot da cena (NoteDocument.to_render_state), nunca os itens vivos.
+    Um job cancelado termina na proxima checagem (a cada pagina, recorte e faixa) e nao emite resultado.
+    """
+    finished_signal = pyqtSignal(int, object)  # job_id, imagem PIL (None em caso de erro)
+
+    def __init__(self, job_id, state, image_paths, config, compositor=None, ordered=False):
+        super().__init__()
+        self.job_id = job_id
+        self.state = state
+        self.ordered = ordered
+        self.image_paths = list(image_paths)
+        self.config = config
+        self.compositor = compositor
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def run(self):
+        from rendering.image_renderer import ImageRenderer
+        start_time = time.time()
+        try:
+            renderer = ImageRenderer(None, self.image_paths, state=self.state, config=self.config,
+                                     compositor=self.compositor, ordered=self.ordered)
+            img = renderer.render(cancel_check=self.is_cancelled)
+        except Exception as e:
+            log_error(f"Erro no RenderWorker (job {self.job_id})", e)
+            img = None
+        if self._cancelled:
+            log_debug(f"Preview job {self.job_id} descartado")
+            return
+        log_debug(f"Preview job {self.job_id} pronto em {time.time() - start_time:.2f}s")
+        self.finished_signal.emit(self.job_id, img)
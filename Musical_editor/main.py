@@ -3,8 +3,9 @@
 import sys
 from pathlib import Path
 
-# Adicionar pasta do projeto ao path
+# Adicionar pasta do projeto ao path (e a raiz do repositorio, para compartilhado/)
 sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(1, str(Path(__file__).resolve().parent.parent))
 
 from PyQt6.QtWidgets import QApplication
 from core.logger import init_logger, log_info, log_error
@@ -0,0 +1,84 @@
+# render_all.py - Renderiza os previews de todos os projetos, sem abrir a interface
+#
+# Uso: python render_all.py [--force] [--jobs N] [projeto.json ...]
+# Le cada JSON de JSON_FOLDER (notas/configuracoes/imagens), renderiza direto do estado salvo
+# e grava PREVIEW_FOLDER/<projeto>.jpg. Projetos cujo JSON e imagens sao mais antigos que a
+# saida sao pulados. Um processo por projeto (ProcessPoolExecutor).
+
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+# Adicionar pasta do projeto ao path (e a raiz do repositorio, para compartilhado/)
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(1, str(Path(__file__).resolve().parent.parent))
+
+from core.config import JSON_FOLDER, PREVIEW_FOLDER
+from core.utils import natural_sort_key
+
+
+def render_project(json_path, output_folder, force=False):
+    """Renderiza um projeto (roda no processo filho). Retorna (nome, status, segundos, detalhe)."""
+    from rendering.image_renderer import ImageRenderer
+    from rendering.project import load_project, state_from_notes, project_inputs_mtime
+
+    start = time.perf_counter()
+    name = os.path.splitext(os.path.basename(json_path))[0]
+    output_path = os.path.join(output_folder, f"{name}.jpg")
+    try:
+        images, notes, config = load_project(json_path)
+        if not force and os.path.exists(output_path) and \
+                os.path.getmtime(output_path) >= project_inputs_mtime(json_path, images):
+            return name, "em dia", time.perf_counter() - start, output_path
+
+        # Processos em paralelo: uma thread de recortes por processo basta
+        renderer = ImageRenderer(None, images, state=state_from_notes(notes), config=config, workers=1)
+        img = renderer.render()
+        if img is None:
+            return name, "vazio", time.perf_counter() - start, "nada para renderizar"
+        img.save(output_path, quality=95)
+        return name, "ok", time.perf_counter() - start, f"{img.width}x{img.height}"
+    except Exception as e:
+        return name, "erro", time.perf_counter() - start, str(e)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Renderiza os previews de todos os projetos")
+    parser.add_argument("projects", nargs="*", help="JSONs especificos (padrao: todos de JSON_FOLDER)")
+    parser.add_argument("--force", action="store_true", help="renderiza mesmo se a saida estiver em dia")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="processos em paralelo")
+    parser.add_argument("--output", default=str(PREVIEW_FOLDER), help="pasta de saida")
+    args = parser.parse_args()
+
+    projects = args.projects or sorted(glob.glob(os.path.join(JSON_FOLDER, "*.json")), key=natural_sort_key)
+    if not projects:
+        print(f"Nenhum projeto em {JSON_FOLDER}")
+        return 0
+    os.makedirs(args.output, exist_ok=True)
+
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        futures = [pool.submit(render_project, p, args.output, args.force) for p in projects]
+        for future in as_completed(futures):
+            name, status, seconds, detail = future.result()
+            results.append((name, status, seconds, detail))
+            print(f"{name:<30} {status:<8} {seconds:7.2f}s  {detail}")
+
+    total = time.perf_counter() - start
+    counts = {s: sum(1 for r in results if r[1] == s) for s in ("ok", "em dia", "vazio", "erro")}
+    rendered = [r[2] for r in results if r[1] == "ok"]
+    print("-" * 60)
+    print(f"{len(results)} projetos em {total:.2f}s ({args.jobs} processos): "
+          + ", ".join(f"{n} {s}" for s, n in counts.items() if n))
+    if rendered:
+        print(f"render: media {sum(rendered) / len(rendered):.2f}s, maior {max(rendered):.2f}s")
+    return 1 if counts["erro"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,116 +1,71 @@
 # image_renderer.py - CORRIGIDO: Ordena por Y (linha), depois X (coluna)
 
 import os
-from PIL import Image, ImageDraw, ImageEnhance, ImageOps, ImageFont
-from core.config import GLOBAL_CONFIG
-from ui.graphics_items import NoteItem, LabelItem, HeaderBoxItem, TimeSigBoxItem
+from PIL import Image
+from core.fonts import FontRegistry
+from core.config import GLOBAL_CONFIG, RENDER_WORKERS, STRIP_HEIGHT
+from core.page_cache import PageCache
+from core.document import reading_order
+from rendering.layout import compute_layout, paint_layout, paint_strips
+from rendering.pdf_stream import StreamingPdfWriter
 from core.logger import log_info, log_debug, log_error, log_warning
 
 class ImageRenderer:
-    def __init__(self, scene, image_paths):
+    def __init__(self, scene, image_paths, state=None, config=None, compositor=None, workers=RENDER_WORKERS,
+                 ordered=False):
+        """state: lista de dicts no formato de get_current_state - snapshot da cena ou vindo de
+        rendering/project.py (sem cena; scene pode ser None). config: padrao GLOBAL_CONFIG.
+        compositor: IncrementalCompositor do preview (so as linhas alteradas sao refeitas).
+        workers: threads para os recortes.
+        ordered: state ja esta em ordem de leitura (NoteDocument.to_render_state); sem state,
+        o snapshot vem do documento da cena e tambem ja vem ordenado."""
         self.scene = scene
         self.image_paths = image_paths
-
-    def render(self):
+        self.state = state
+        self.ordered = ordered or state is None
+        self.config = config if config is not None else GLOBAL_CONFIG
+        self.compositor = compositor
+        self.workers = workers
+
+    def get_fonts(self):
+        """(nome da nota, tag) vindas do FontRegistry, com os arquivos de FONT_FILES da configuracao -
+        sempre os mesmos objetos enquanto ela nao muda, como o compositor espera"""
+        FontRegistry.configure(self.config.get("FONT_FILES"))
+        return FontRegistry.get(18), FontRegistry.get(22)
+
+    def render(self, cancel_check=None):
         """Renderiza preview da imagem final"""
         log_info("Iniciando renderizacao de preview")
-        return self._render_internal(use_export_mode=False)
+        return self._render_internal(use_export_mode=False, cancel_check=cancel_check)
 
     def export_clean_sheet_with_crops(self):
         """Exporta folha limpa com recortes das silabas"""
         log_info("Iniciando exportacao de folha limpa")
         return self._render_internal(use_export_mode=True)
 
-    def _render_internal(self, use_export_mode=False):
+    def _render_internal(self, use_export_mode=False, cancel_check=None):
         """Logica interna compartilhada de renderizacao"""
-        state = self.get_current_state()
-        if not state:
-            log_warning("Estado vazio, nada para renderizar")
-            return None
-
-        # Separar notas de headers/timesigs
-        notes_and_tags = [item for item in state if item['type'] in ['NOTE', 'TAG']]
-
-        if not notes_and_tags:
-            log_warning("Nenhuma nota ou tag para renderizar")
+        prepared = self._prepare_items()
+        if prepared is None:
             return None
-
-        # ORDENAR: Agrupar por Y (linha), depois por X (coluna) dentro de cada linha
-        notes_and_tags.sort(key=lambda n: n['y'])
-
-        # Agrupar por linhas (Y similar)
-        LINE_THRESHOLD = 80
-        sorted_notes = []
-        current_line = []
-
-        if notes_and_tags:
-            current_line.append(notes_and_tags[0])
-            line_y_ref = notes_and_tags[0]['y']
-
-            for i in range(1, len(notes_and_tags)):
-                item = notes_and_tags[i]
-                if abs(item['y'] - line_y_ref) < LINE_THRESHOLD:
-                    current_line.append(item)
-                else:
-                    # Ordenar linha atual por X
-                    current_line.sort(key=lambda n: n['x'])
-                    sorted_notes.extend(current_line)
-                    current_line = [item]
-                    line_y_ref = item['y']
-
-            # Ordenar ultima linha por X
-            if current_line:
-                current_line.sort(key=lambda n: n['x'])
-                sorted_notes.extend(current_line)
-
-        notes_and_tags = sorted_notes
-
-        log_info("Notas ordenadas por Y (linha), depois X (coluna):")
-        for idx, item in enumerate(notes_and_tags):
-            log_debug(f"  {idx+1}. {item.get('t', 'N/A')} em Y={item.get('y', 0)}, X={item.get('x', 0)}")
-
-        # Resto do codigo continua igual...
-        PAGE_W = GLOBAL_CONFIG.get("PAGE_WIDTH", 2000)
-        SPACING = GLOBAL_CONFIG.get("SPACING_NOTE", 160)
-        CROP_W = GLOBAL_CONFIG.get("CROP_WIDTH", 60)
-        CROP_H = GLOBAL_CONFIG.get("CROP_HEIGHT", 90)
-        CROP_OFF_Y = GLOBAL_CONFIG.get("CROP_OFFSET_Y", 40)
-        CROP_ZOOM = GLOBAL_CONFIG.get("CROP_ZOOM", 1.3)
-        MARGIN_R = GLOBAL_CONFIG.get("RIGHT_MARGIN", 150)
-        PAD_B = GLOBAL_CONFIG.get("BOTTOM_PADDING", 50)
-
-        # Extrair retangulos especiais
-        header_rect_coords = None
-        timesig_rect_coords = None
-        for item in self.scene.items():
-            if isinstance(item, HeaderBoxItem):
-                r = item.rect()
-                p = item.pos()
-                header_rect_coords = (p.x() + r.left(), p.y() + r.top(), p.x() + r.right(), p.y() + r.bottom())
-            elif isinstance(item, TimeSigBoxItem):
-                r = item.rect()
-                p = item.pos()
-                timesig_rect_coords = (p.x() + r.left(), p.y() + r.top(), p.x() + r.right(), p.y() + r.bottom())
-
-        W, H = PAGE_W, max(4000, len(self.image_paths) * 4000)
-        img_out = Image.new('RGB', (W, H), color='white')
-        draw = ImageDraw.Draw(img_out)
+        notes_and_tags, header_rect_coords, timesig_rect_coords = prepared
 
         # Fontes
-        try:
-            font_note_name = ImageFont.truetype("arial.ttf", 18)
-            font_tag = ImageFont.truetype("arial.ttf", 22)
-        except:
-            font_note_name = ImageFont.load_default()
-            font_tag = ImageFont.load_default()
+        font_note_name, font_tag = self.get_fonts()
 
         # Carregar imagens
         source_images = []
+        page_keys = []   # versao de cada pagina, para o compositor saber se as fontes mudaram
         try:
             for path in self.image_paths:
+                if cancel_check and cancel_check():
+                    log_debug("Renderizacao cancelada")
+                    return None
                 if os.path.exists(path):
-                    src = Image.open(path).convert("RGBA")
-                    source_images.append(src)
+                    src = PageCache.get_image(path)
+                    if src is not None:
+                        source_images.append(src)
+                        page_keys.append(PageCache.page_key(path))
             log_debug(f"Imagens carregadas: {len(source_images)}")
         except Exception as e:
             log_error(f"Erro ao carregar imagens: {e}")
@@ -120,194 +75,125 @@ class ImageRenderer:
             log_error("Nenhuma imagem disponivel")
             return None
 
-        # ---------------------------------------------------------
-        # 1. CABECALHO
-        # ---------------------------------------------------------
-        header_height_pasted = 0
-        if source_images and header_rect_coords:
-            log_info("Processando cabecalho")
-            first_img = source_images[0]
-            hx1, hy1, hx2, hy2 = header_rect_coords
-            hy1 = max(0, int(hy1))
-            hy2 = min(first_img.height, int(hy2))
-            hx1 = max(0, int(hx1))
-            hx2 = min(first_img.width, int(hx2))
-
-            if hy2 > hy1 and hx2 > hx1:
-                header_crop = first_img.crop((hx1, hy1, hx2, hy2))
-                new_hw = int(header_crop.width * CROP_ZOOM)
-                new_hh = int(header_crop.height * CROP_ZOOM)
-                header_crop = header_crop.resize((new_hw, new_hh), Image.Resampling.LANCZOS)
-                enhancer = ImageEnhance.Contrast(header_crop)
-                header_crop = enhancer.enhance(2.0)
-                header_crop = ImageOps.grayscale(header_crop).convert("RGB")
-                paste_x = int((W - new_hw) // 2)
-                img_out.paste(header_crop, (paste_x, 0))
-                header_height_pasted = new_hh
-                log_debug(f"Cabecalho: {new_hw}x{new_hh}")
-
-        start_y_offset = header_height_pasted + 100
-        cursor_x = 100
-        cursor_y_staff_center = start_y_offset
-        row_height = 450
-        current_y_ref = notes_and_tags[0]['y'] if notes_and_tags else 0
-
-        # ---------------------------------------------------------
-        # 2. COMPASSO
-        # ---------------------------------------------------------
-        if source_images and timesig_rect_coords:
-            log_info("Processando compasso")
-            first_img = source_images[0]
-            tx1, ty1, tx2, ty2 = timesig_rect_coords
-            tx1 = max(0, int(tx1))
-            tx2 = min(first_img.width, int(tx2))
-            ty1 = max(0, int(ty1))
-            ty2 = min(first_img.height, int(ty2))
-
-            if tx2 > tx1 and ty2 > ty1:
-                ts_crop = first_img.crop((tx1, ty1, tx2, ty2))
-                new_w = int(ts_crop.width * CROP_ZOOM)
-                new_h = int(ts_crop.height * CROP_ZOOM)
-                ts_crop = ts_crop.resize((new_w, new_h), Image.Resampling.LANCZOS)
-                enhancer = ImageEnhance.Contrast(ts_crop)
-                ts_crop = enhancer.enhance(2.0)
-                ts_crop = ImageOps.grayscale(ts_crop).convert("RGB")
-                dest_y_ts = int(cursor_y_staff_center - (new_h // 2))
-                img_out.paste(ts_crop, (cursor_x, dest_y_ts))
-                cursor_x += new_w + 50
-                log_debug(f"Compasso: {new_w}x{new_h}")
-
-        # ---------------------------------------------------------
-        # 3. NOTAS E TAGS (ORDENADAS POR Y, DEPOIS X)
-        # ---------------------------------------------------------
-        for item in notes_and_tags:
-            item_y = item['y']
-
-            # Quebra de linha
-            if item_y > current_y_ref + 150:
-                cursor_y_staff_center += row_height
-                cursor_x = 100
-                current_y_ref = item_y
-
-            if item['type'] == 'TAG':
-                tag_text = item['t'].replace("TAG_", "")
-                bg_color = "#3498db"
-                if "CORO" in tag_text:
-                    bg_color = "#e67e22"
-                elif "FINAL" in tag_text:
-                    bg_color = "#27ae60"
-                elif "VERSO" in tag_text:
-                    bg_color = "#2980b9"
-
-                tag_w, tag_h = 100, 40
-                tag_x1 = cursor_x
-                tag_y1 = cursor_y_staff_center - 20
-                tag_x2 = tag_x1 + tag_w
-                tag_y2 = tag_y1 + tag_h
+        # Passada 1: posicoes e altura final, sem tocar em pixels
+        page_sizes = [img.size for img in source_images]
+        ops, W, H = compute_layout(notes_and_tags, header_rect_coords, timesig_rect_coords, page_sizes,
+                                   self.config, font_note_name, font_tag)
+        log_debug(f"Layout: {len(ops)} operacoes, folha {W}x{H}")
+
+        # Passada 2: recortes processados em paralelo, colagem serial na tela de tamanho exato
+        if self.compositor is not None:
+            img_out = self.compositor.update(ops, W, H, source_images, page_keys, workers=self.workers, cancel_check=cancel_check)
+            if img_out is not None:
+                log_debug(f"Render incremental: {self.compositor.last_stats[0]}/{self.compositor.last_stats[1]} linhas refeitas")
+        else:
+            img_out = paint_layout(ops, W, H, source_images, workers=self.workers, cancel_check=cancel_check)
+        if img_out is None:
+            log_debug("Renderizacao cancelada")
+            return None
 
-                draw.rectangle([tag_x1, tag_y1, tag_x2, tag_y2], fill=bg_color, outline=None)
-                bbox = draw.textbbox((0, 0), tag_text, font=font_tag)
-                text_w = bbox[2] - bbox[0]
-                text_h = bbox[3] - bbox[1]
-                text_x = tag_x1 + (tag_w - text_w) / 2
-                text_y = tag_y1 + (tag_h - text_h) / 2 - 2
-                draw.text((text_x, text_y), tag_text, fill="white", font=font_tag)
-                cursor_x += GLOBAL_CONFIG.get("SPACING_TAG", 220)
-                log_debug(f"Tag '{tag_text}' adicionada")
+        log_info("Renderizacao concluida com sucesso")
+        return img_out
 
-            else:  # NOTE
-                display_name = item['t'].replace("_", " ").title()
+    def export_streaming(self, output_path, strip_height=STRIP_HEIGHT):
+        """Exporta a folha em faixas horizontais, sem montar a imagem inteira.
+
+        output_path .pdf: um PDF com uma pagina por faixa (StreamingPdfWriter - cada pagina vai para o
+        disco assim que a faixa fica pronta). Outra extensao (.jpg/.png): um arquivo por faixa,
+        nome_parte01.jpg, nome_parte02.jpg... Nos dois casos, em memoria ficam so a faixa atual,
+        as paginas de origem que ela usa e seus recortes.
+        As paginas sao lidas do disco a cada faixa (sem passar pelo PageCache).
+        Retorna a lista de arquivos gravados (vazia se nao havia nada para exportar).
+        """
+        prepared = self._prepare_items()
+        if prepared is None:
+            return []
+        notes_and_tags, header_rect_coords, timesig_rect_coords = prepared
+        font_note_name, font_tag = self.get_fonts()
+
+        # So os cabecalhos dos arquivos: tamanho sem decodificar os pixels
+        paths, page_sizes = [], []
+        for path in self.image_paths:
+            if os.path.exists(path):
                 try:
-                    draw.text((cursor_x, cursor_y_staff_center - 70), display_name, fill="black", font=font_note_name, anchor="mb")
-                except ValueError:
-                    draw.text((cursor_x - 30, cursor_y_staff_center - 90), display_name, fill="black", font=font_note_name)
-
-                # Recorte da silaba
-                if not any(x in item['t'] for x in ["PAUSA", "RESPIRACAO"]):
-                    local_w = item.get('cp', {}).get('w', CROP_W) if 'cp' in item else CROP_W
-                    local_h = item.get('cp', {}).get('h', CROP_H) if 'cp' in item else CROP_H
-                    local_y = item.get('cp', {}).get('y', CROP_OFF_Y) if 'cp' in item else CROP_OFF_Y
-
-                    accumulated_y = 0
-                    source_img_to_use = None
-                    relative_y = 0
-
-                    for src_img in source_images:
-                        h = src_img.height
-                        if accumulated_y <= item_y < (accumulated_y + h + 20):
-                            source_img_to_use = src_img
-                            relative_y = item_y - accumulated_y
-                            break
-                        accumulated_y += h + 20
-
-                    if source_img_to_use:
-                        crop_x1 = int(item['x'] - local_w // 2)
-                        crop_y1 = int(relative_y + local_y)
-                        crop_x2 = int(item['x'] + local_w // 2)
-                        crop_y2 = int(relative_y + local_y + local_h)
+                    with Image.open(path) as src:
+                        page_sizes.append(src.size)
+                    paths.append(path)
+                except Exception as e:
+                    log_error(f"Erro ao ler tamanho da imagem {path}", e)
+        if not paths:
+            log_error("Nenhuma imagem disponivel")
+            return []
+
+        def load_page(idx):
+            with Image.open(paths[idx]) as src:
+                return src.convert("RGB")
+
+        ops, W, H = compute_layout(notes_and_tags, header_rect_coords, timesig_rect_coords, page_sizes,
+                                   self.config, font_note_name, font_tag)
+        log_info(f"Exportacao em faixas: folha {W}x{H}, faixas de ~{strip_height}px -> {output_path}")
+
+        as_pdf = output_path.lower().endswith(".pdf")
+        base, ext = os.path.splitext(output_path)
+        written = []
+
+        def strips():
+            for n, (y0, strip) in enumerate(paint_strips(ops, W, H, load_page, strip_height, self.workers), start=1):
+                log_debug(f"Faixa {n} pronta (y={y0}, {strip.width}x{strip.height})")
+                yield n, strip
+
+        if as_pdf:
+            # Erro no meio: o writer descarta o arquivo parcial e o destino fica como estava
+            with StreamingPdfWriter(output_path, resolution=150) as pdf:
+                for _, strip in strips():
+                    pdf.add_page(strip)
+                if not pdf.page_ids:
+                    pdf.abort()
+            if pdf.page_ids:
+                written.append(output_path)
+        else:
+            for n, strip in strips():
+                part_path = f"{base}_parte{n:02d}{ext}"
+                strip.save(part_path, quality=95)
+                written.append(part_path)
+        log_info(f"Exportacao em faixas concluida: {len(written)} arquivo(s)")
+        return written
+
+    def _prepare_items(self):
+        """Notas/tags em ordem de leitura + retangulos de cabecalho e compasso (ou None se vazio)"""
+        state = self.state if self.state is not None else self.get_current_state()
+        if not state:
+            log_warning("Estado vazio, nada para renderizar")
+            return None
 
-                        crop_x1 = max(0, crop_x1)
-                        crop_y1 = max(0, crop_y1)
-                        crop_x2 = min(source_img_to_use.width, crop_x2)
-                        crop_y2 = min(source_img_to_use.height, crop_y2)
+        # Separar notas de headers/timesigs
+        notes_and_tags = [item for item in state if item['type'] in ['NOTE', 'TAG']]
 
-                        if crop_x2 > crop_x1 and crop_y2 > crop_y1:
-                            cropped_text = source_img_to_use.crop((crop_x1, crop_y1, crop_x2, crop_y2))
-                            new_text_w = int(cropped_text.width * CROP_ZOOM)
-                            new_text_h = int(cropped_text.height * CROP_ZOOM)
-                            cropped_text = cropped_text.resize((new_text_w, new_text_h), Image.Resampling.LANCZOS)
-                            enhancer = ImageEnhance.Contrast(cropped_text)
-                            cropped_text = enhancer.enhance(1.5)
-                            dest_x = int(cursor_x - (new_text_w // 2))
-                            dest_y = int(cursor_y_staff_center + 65)
-                            img_out.paste(cropped_text, (dest_x, dest_y))
+        if not notes_and_tags:
+            log_warning("Nenhuma nota ou tag para renderizar")
+            return None
 
-                cursor_x += SPACING
+        # ORDENAR: Agrupar por Y (linha), depois por X (coluna) dentro de cada linha
+        if not self.ordered:
+            notes_and_tags = reading_order(notes_and_tags)
 
-            # Quebra de linha horizontal
-            if cursor_x > W - MARGIN_R:
-                cursor_x = 100
-                cursor_y_staff_center += row_height
+        log_info("Notas ordenadas por Y (linha), depois X (coluna):")
+        for idx, item in enumerate(notes_and_tags):
+            log_debug(f"  {idx+1}. {item.get('t', 'N/A')} em Y={item.get('y', 0)}, X={item.get('x', 0)}")
 
-        # Cortar imagem
-        img_inverted = ImageOps.invert(img_out.convert('RGB'))
-        bbox = img_inverted.getbbox()
-        if bbox:
-            crop_h = min(H, bbox[3] + PAD_B)
-            img_out = img_out.crop((0, 0, W, crop_h))
+        # Extrair retangulos especiais
+        header_rect_coords = None
+        timesig_rect_coords = None
+        for item in state:
+            if item['type'] == 'HEADER':
+                header_rect_coords = item['box']
+            elif item['type'] == 'TIME':
+                timesig_rect_coords = item['box']
 
-        log_info("Renderizacao concluida com sucesso")
-        return img_out
+        return notes_and_tags, header_rect_coords, timesig_rect_coords
 
     def get_current_state(self):
-        """Retorna estado atual da cena"""
-        raw = []
-        for i in self.scene.items():
-            if isinstance(i, (NoteItem, LabelItem)):
-                d = {
-                    'type': 'NOTE' if isinstance(i, NoteItem) else 'TAG',
-                    't': i.tipo,
-                    'x': i.x(),
-                    'y': i.y()
-                }
-                if hasattr(i, 'custom_crop_params') and i.custom_crop_params:
-                    d['cp'] = i.custom_crop_params
-                raw.append(d)
-            elif isinstance(i, HeaderBoxItem):
-                r = i.rect()
-                raw.append({
-                    'type': 'HEADER',
-                    'r': (i.x(), i.y(), i.x() + r.width(), i.y() + r.height()),
-                    'x': i.x(),
-                    'y': i.y()
-                })
-            elif isinstance(i, TimeSigBoxItem):
-                r = i.rect()
-                raw.append({
-                    'type': 'TIME',
-                    'r': (i.x(), i.y(), i.x() + r.width(), i.y() + r.height()),
-                    'x': i.x(),
-                    'y': i.y()
-                })
+        """Retorna estado atual da cena, em ordem de leitura (chamar na thread da interface)"""
+        raw = self.scene.document.to_render_state()
         log_debug(f"Estado atual tem {len(raw)} itens")
         return raw
@@ -0,0 +1,386 @@
+# layout.py - Layout da folha em duas passadas
+#
+# Passada 1 (compute_layout): decide a posicao de cada recorte, tag e nome de nota e a altura
+# final, usando so medidas (tamanho das paginas e das fontes). Nenhum pixel e processado.
+# Passada 2 (paint_layout): aloca a tela no tamanho exato e desenha/cola cada operacao uma vez.
+# IncrementalCompositor guarda a ultima folha e, a cada render, so redesenha as linhas que mudaram.
+
+import math
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageDraw, ImageEnhance
+from core.page_layout import PageLayout
+from core.document import TagRegionIndex
+from compartilhado.enhance import enhance_contrast, is_gray
+
+# Recorte de uma pagina: box ja limitado a pagina, size = tamanho final apos o zoom
+CropJob = namedtuple("CropJob", "page box size contrast grayscale")
+
+# Operacoes de desenho, na ordem em que o renderer antigo desenhava
+CropOp = namedtuple("CropOp", "job dest")                    # cola o recorte processado em dest
+RectOp = namedtuple("RectOp", "box fill")                    # fundo de tag
+TextOp = namedtuple("TextOp", "xy text font fill anchor fallback_xy bbox")
+
+TAG_W, TAG_H = 100, 40
+START_X = 100
+ROW_HEIGHT = 450
+LINE_BREAK_Y = 150
+BAND_MARGIN = 4   # folga vertical de cada linha (antialias do texto pode passar 1-2px do bbox)
+
+_measure = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+
+
+def tag_color(tag_text):
+    if "CORO" in tag_text:
+        return "#e67e22"
+    elif "FINAL" in tag_text:
+        return "#27ae60"
+    elif "VERSO" in tag_text:
+        return "#2980b9"
+    return "#3498db"
+
+
+def _clip_box(box, size):
+    x1, y1, x2, y2 = box
+    w, h = size
+    return (max(0, int(x1)), max(0, int(y1)), min(w, int(x2)), min(h, int(y2)))
+
+
+def _crop_job(page, box, page_size, zoom, contrast, grayscale):
+    x1, y1, x2, y2 = _clip_box(box, page_size)
+    if x2 <= x1 or y2 <= y1:
+        return None
+    return CropJob(page, (x1, y1, x2, y2), (int((x2 - x1) * zoom), int((y2 - y1) * zoom)), contrast, grayscale)
+
+
+def _text_op(xy, text, font, fill, anchor=None, fallback_xy=None):
+    try:
+        bbox = _measure.textbbox(xy, text, font=font, anchor=anchor)
+    except ValueError:
+        # Fonte sem suporte a anchor: desenha na posicao alternativa, sem anchor
+        xy, anchor, fallback_xy = fallback_xy, None, None
+        bbox = _measure.textbbox(xy, text, font=font)
+    return TextOp(xy, text, font, fill, anchor, fallback_xy, bbox)
+
+
+def _op_top(op):
+    if isinstance(op, CropOp):
+        return op.dest[1]
+    if isinstance(op, RectOp):
+        return op.box[1]
+    return op.bbox[1]
+
+
+def _op_bottom(op):
+    if isinstance(op, CropOp):
+        return op.dest[1] + op.job.size[1]
+    if isinstance(op, RectOp):
+        return op.box[3] + 1
+    return op.bbox[3]
+
+
+def compute_layout(notes_and_tags, header_rect, timesig_rect, page_sizes, config, font_note_name, font_tag):
+    """Passada 1: lista de operacoes e altura final da folha (ultimo pixel usado + BOTTOM_PADDING)"""
+    W = config.get("PAGE_WIDTH", 2000)
+    SPACING = config.get("SPACING_NOTE", 160)
+    CROP_W = config.get("CROP_WIDTH", 60)
+    CROP_H = config.get("CROP_HEIGHT", 90)
+    CROP_OFF_Y = config.get("CROP_OFFSET_Y", 40)
+    CHORUS_W = config.get("CHORUS_WIDTH", 50)
+    CHORUS_H = config.get("CHORUS_HEIGHT", 80)
+    CHORUS_OFF_Y = config.get("CHORUS_OFFSET_Y", 40)
+    CROP_ZOOM = config.get("CROP_ZOOM", 1.3)
+    MARGIN_R = config.get("RIGHT_MARGIN", 150)
+    PAD_B = config.get("BOTTOM_PADDING", 50)
+    pages = PageLayout(page_sizes)
+    tags = TagRegionIndex.from_state(notes_and_tags)   # mesma regra do editor para CORO/FINAL
+    ops = []
+
+    # 1. CABECALHO
+    header_height_pasted = 0
+    if page_sizes and header_rect:
+        job = _crop_job(0, header_rect, page_sizes[0], CROP_ZOOM, 2.0, True)
+        if job:
+            ops.append(CropOp(job, (int((W - job.size[0]) // 2), 0)))
+            header_height_pasted = job.size[1]
+
+    cursor_x = START_X
+    cursor_y_staff_center = header_height_pasted + 100
+    current_y_ref = notes_and_tags[0]['y'] if notes_and_tags else 0
+
+    # 2. COMPASSO
+    if page_sizes and timesig_rect:
+        job = _crop_job(0, timesig_rect, page_sizes[0], CROP_ZOOM, 2.0, True)
+        if job:
+            ops.append(CropOp(job, (cursor_x, int(cursor_y_staff_center - (job.size[1] // 2)))))
+            cursor_x += job.size[0] + 50
+
+    # 3. NOTAS E TAGS (ja ordenadas por linha, depois X)
+    for item in notes_and_tags:
+        item_y = item['y']
+
+        # Quebra de linha
+        if item_y > current_y_ref + LINE_BREAK_Y:
+            cursor_y_staff_center += ROW_HEIGHT
+            cursor_x = START_X
+            current_y_ref = item_y
+
+        if item['type'] == 'TAG':
+            tag_text = item['t'].replace("TAG_", "")
+            tag_x1 = cursor_x
+            tag_y1 = cursor_y_staff_center - 20
+            ops.append(RectOp((tag_x1, tag_y1, tag_x1 + TAG_W, tag_y1 + TAG_H), tag_color(tag_text)))
+            bbox = _measure.textbbox((0, 0), tag_text, font=font_tag)
+            text_x = tag_x1 + (TAG_W - (bbox[2] - bbox[0])) / 2
+            text_y = tag_y1 + (TAG_H - (bbox[3] - bbox[1])) / 2 - 2
+            ops.append(_text_op((text_x, text_y), tag_text, font_tag, "white"))
+            cursor_x += config.get("SPACING_TAG", 220)
+
+        else:  # NOTE
+            display_name = item['t'].replace("_", " ").title()
+            ops.append(_text_op((cursor_x, cursor_y_staff_center - 70), display_name, font_note_name, "black",
+                                anchor="mb", fallback_xy=(cursor_x - 30, cursor_y_staff_center - 90)))
+
+            # Recorte da silaba
+            if not any(x in item['t'] for x in ["PAUSA", "RESPIRACAO"]):
+                cp = item.get('cp') or {}
+                if not cp and tags.chorus_at(item['x'], item_y):
+                    base_w, base_h, base_y = CHORUS_W, CHORUS_H, CHORUS_OFF_Y
+                else:
+                    base_w, base_h, base_y = CROP_W, CROP_H, CROP_OFF_Y
+                local_w = cp.get('w', base_w)
+                local_h = cp.get('h', base_h)
+                local_y = cp.get('y', base_y)
+                page, relative_y = pages.find_page(item_y)
+                if page is not None:
+                    box = (item['x'] - local_w // 2, relative_y + local_y,
+                           item['x'] + local_w // 2, relative_y + local_y + local_h)
+                    job = _crop_job(page, box, page_sizes[page], CROP_ZOOM, 1.5, False)
+                    if job:
+                        ops.append(CropOp(job, (int(cursor_x - (job.size[0] // 2)), int(cursor_y_staff_center + 65))))
+
+            cursor_x += SPACING
+
+        # Quebra de linha horizontal
+        if cursor_x > W - MARGIN_R:
+            cursor_x = START_X
+            cursor_y_staff_center += ROW_HEIGHT
+
+    bottom = max((_op_bottom(op) for op in ops), default=0)
+    height = max(1, int(bottom) + PAD_B)
+    return ops, W, height
+
+
+def process_crop(source_images, job):
+    """Recorta, amplia e aplica contraste (e cinza, no cabecalho/compasso) em um recorte.
+    No cinza, se o recorte ja e cinza (R == G == B) a conversao vem antes do resize: o LANCZOS roda
+    em 1 banda em vez de 4 com o mesmo resultado. Recorte colorido segue a ordem original.
+    A tabela (enhance_contrast) so entra no cabecalho/compasso; nas silabas ImageEnhance e mais rapido."""
+    img = source_images[job.page].crop(job.box)
+    if job.grayscale and is_gray(img):
+        img = img.convert("L")
+    img = img.resize(job.size, Image.Resampling.LANCZOS)
+    if not job.grayscale:
+        return ImageEnhance.Contrast(img).enhance(job.contrast)
+    return enhance_contrast(img, job.contrast, job.grayscale)
+
+
+def process_crops(source_images, jobs, workers=1, cancel_check=None):
+    """Processa os recortes (crop -> resize -> contraste) em paralelo; devolve {job: imagem}.
+    O Pillow libera o GIL no resize/enhance, entao threads bastam. Recortes repetidos sao feitos uma vez.
+    Ganho esperado: so esta etapa escala com as threads. Num hino de 600 notas ela e ~1/4 do render;
+    a colagem e o texto (_paint_ops) seguram o GIL e seguem em serie, entao o render inteiro ganha no
+    maximo ~1.3x. Com workers == 1 (maquina de 1 nucleo) ou menos de 2 recortes por thread, o executor
+    nem e criado - e o caso do preview incremental, que so refaz os recortes novos.
+    cancel_check(): consultado antes de cada recorte; se devolver True, os restantes sao pulados e o
+    retorno e None."""
+    unique = list(dict.fromkeys(jobs))
+
+    def run(job):
+        if cancel_check and cancel_check():
+            return None
+        return process_crop(source_images, job)
+
+    if workers <= 1 or len(unique) < 2 * workers:
+        crops = {}
+        for job in unique:
+            crops[job] = run(job)
+            if crops[job] is None:
+                return None
+        return crops
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        crops = dict(zip(unique, pool.map(run, unique)))
+    if cancel_check and cancel_check():
+        return None
+    return crops
+
+
+def _paint_ops(img_out, ops, crops, offset_y=0):
+    """Desenha as operacoes na ordem; offset_y desloca tudo para cima (pintura de uma faixa isolada)"""
+    draw = ImageDraw.Draw(img_out)
+    for op in ops:
+        if isinstance(op, CropOp):
+            img_out.paste(crops[op.job], (op.dest[0], op.dest[1] - offset_y))
+        elif isinstance(op, RectOp):
+            x1, y1, x2, y2 = op.box
+            draw.rectangle([x1, y1 - offset_y, x2, y2 - offset_y], fill=op.fill, outline=None)
+        elif op.anchor:
+            try:
+                draw.text((op.xy[0], op.xy[1] - offset_y), op.text, fill=op.fill, font=op.font, anchor=op.anchor)
+            except ValueError:
+                draw.text((op.fallback_xy[0], op.fallback_xy[1] - offset_y), op.text, fill=op.fill, font=op.font)
+        else:
+            draw.text((op.xy[0], op.xy[1] - offset_y), op.text, fill=op.fill, font=op.font)
+
+
+def paint_layout(ops, width, height, source_images, workers=1, cancel_check=None):
+    """Passada 2: tela no tamanho exato, cada operacao desenhada uma unica vez.
+    Os recortes sao processados antes (em paralelo); a colagem segue serial, na ordem original.
+    cancel_check(): consultado a cada recorte; se devolver True, desiste e retorna None."""
+    crops = process_crops(source_images, [op.job for op in ops if isinstance(op, CropOp)], workers, cancel_check)
+    if crops is None:
+        return None
+    img_out = Image.new('RGB', (width, height), color='white')
+    _paint_ops(img_out, ops, crops)
+    return img_out
+
+
+def row_bands(ops, height):
+    """Agrupa as operacoes em faixas horizontais disjuntas [y0, y1) - na pratica, as linhas da folha
+    (ROW_HEIGHT entre elas) e o cabecalho. Devolve [(y0, y1, ops da faixa na ordem original)]."""
+    spans = []
+    for i, op in enumerate(ops):
+        y0 = max(0, int(_op_top(op)) - BAND_MARGIN)
+        y1 = min(height, int(math.ceil(_op_bottom(op))) + BAND_MARGIN)
+        if y1 > y0:
+            spans.append((y0, y1, i))
+    spans.sort()
+    bands = []
+    for y0, y1, i in spans:
+        if bands and y0 < bands[-1][1]:
+            bands[-1][1] = max(bands[-1][1], y1)
+            bands[-1][2].append(i)
+        else:
+            bands.append([y0, y1, [i]])
+    return [(y0, y1, tuple(ops[i] for i in sorted(idx))) for y0, y1, idx in bands]
+
+
+def paint_strips(ops, width, height, load_page, strip_height, workers=1):
+    """Passada 2 em faixas: gera (y0, imagem da faixa) de cima para baixo, sem a folha inteira na memoria.
+
+    As faixas sao cortadas entre linhas (row_bands), entao nenhuma operacao fica dividida entre duas.
+    load_page(idx) devolve a pagina de origem; so as paginas da faixa atual ficam carregadas.
+    """
+    bands = row_bands(ops, height)
+    pages = {}
+    next_band = 0
+    y0 = 0
+    while y0 < height:
+        # Junta linhas ate passar de strip_height (uma linha maior que isso vira uma faixa sozinha)
+        strip_ops = []
+        y1 = y0
+        while next_band < len(bands) and (not strip_ops or bands[next_band][1] - y0 <= strip_height):
+            _, y1, row_ops = bands[next_band]
+            strip_ops.extend(row_ops)
+            next_band += 1
+        y1 = height if next_band == len(bands) else max(y1, min(y0 + strip_height, bands[next_band][0]))
+
+        jobs = list(dict.fromkeys(op.job for op in strip_ops if isinstance(op, CropOp)))
+        needed = {job.page for job in jobs}
+        pages = {idx: img for idx, img in pages.items() if idx in needed}
+        for idx in needed - pages.keys():
+            pages[idx] = load_page(idx)
+        crops = process_crops(pages, jobs, workers)
+
+        strip = Image.new('RGB', (width, y1 - y0), color='white')
+        _paint_ops(strip, strip_ops, crops, offset_y=y0)
+        del crops
+        yield y0, strip
+        y0 = y1
+
+
+def _merge_ranges(ranges):
+    merged = []
+    for a, b in sorted(ranges):
+        if merged and a <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], b)
+        else:
+            merged.append([a, b])
+    return merged
+
+
+class IncrementalCompositor:
+    """Ultima folha renderizada + conteudo de cada linha; update() so recompoe as linhas alteradas.
+
+    Cada linha e comparada pelo conteudo (tupla de operacoes: posicoes, recortes, textos), entao
+    mover ou trocar uma nota refaz a linha dela (e as seguintes, se a quebra de linha mudar).
+    Recortes ja processados ficam guardados por CropJob. Largura ou paginas diferentes recomecam do zero:
+    as paginas sao comparadas por page_keys (PageCache.page_key - caminho e versao do arquivo), nao
+    pela identidade dos objetos, que o Python pode reaproveitar depois que o cache solta uma imagem.
+    Seguro para varios RenderWorker: update() roda sob lock e devolve uma copia da folha.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.last_stats = (0, 0)   # (linhas refeitas, total de linhas)
+        self.reset()
+
+    def reset(self):
+        self.image = None
+        self.width = 0
+        self.height = 0
+        self.sources = ()
+        self.rows = {}    # (y0, y1) -> tupla de operacoes
+        self.crops = {}   # CropJob -> imagem processada
+
+    def update(self, ops, width, height, source_images, page_keys, workers=1, cancel_check=None):
+        with self._lock:
+            # Um job cancelado enquanto esperava o lock nao chega a trabalhar
+            if cancel_check and cancel_check():
+                return None
+            sources = tuple(page_keys)
+            if sources != self.sources or width != self.width:
+                self.reset()
+                self.sources = sources
+                self.width = width
+
+            # Recortes: so os que ainda nao existem; os que sairam do layout sao descartados
+            jobs = list(dict.fromkeys(op.job for op in ops if isinstance(op, CropOp)))
+            new_crops = process_crops(source_images, [j for j in jobs if j not in self.crops], workers, cancel_check)
+            if new_crops is None:
+                return None
+            self.crops.update(new_crops)
+            self.crops = {j: self.crops[j] for j in jobs}
+
+            bands = row_bands(ops, height)
+            new_rows = {(y0, y1): row_ops for y0, y1, row_ops in bands}
+            if self.image is None:
+                dirty = [(0, height)]
+                self.image = Image.new('RGB', (width, height), color='white')
+            else:
+                if height != self.height:
+                    canvas = Image.new('RGB', (width, height), color='white')
+                    canvas.paste(self.image.crop((0, 0, width, min(height, self.height))), (0, 0))
+                    self.image = canvas
+                dirty = [k for k, row_ops in new_rows.items() if self.rows.get(k) != row_ops]
+                dirty += [k for k in self.rows if k not in new_rows]
+
+            for a, b in _merge_ranges(dirty):
+                a, b = max(0, a), min(height, b)
+                if b <= a:
+                    continue
+                if cancel_check and cancel_check():
+                    # Folha ficou com parte das faixas novas: a proxima atualizacao redesenha tudo
+                    # (os recortes guardados continuam valendo)
+                    self.image = None
+                    return None
+                band_ops = [op for y0, y1, row_ops in bands if y0 < b and y1 > a for op in row_ops]
+                band = Image.new('RGB', (width, b - a), color='white')
+                _paint_ops(band, band_ops, self.crops, offset_y=a)
+                self.image.paste(band, (0, a))
+
+            self.height = height
+            self.rows = new_rows
+            self.last_stats = (sum(1 for k in new_rows if k in dirty), len(new_rows))
+            return self.image.copy()
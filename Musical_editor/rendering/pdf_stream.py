@@ -0,0 +1,109 @@
+# pdf_stream.py - PDF gravado pagina a pagina
+#
+# O save_all do Pillow junta todas as append_images numa lista antes de escrever o arquivo. Aqui cada
+# pagina vira um JPEG (DCTDecode) escrito no disco assim que chega; so os offsets dos objetos ficam
+# em memoria, e a arvore de paginas + xref vao no fim. O arquivo e montado em <caminho>.part e so
+# troca de nome no close(): um erro no meio nunca deixa um PDF truncado no destino.
+
+import io
+import os
+
+
+class StreamingPdfWriter:
+    """PDF com uma imagem por pagina, escrito incrementalmente.
+
+    with StreamingPdfWriter(caminho) as pdf:
+        for faixa in faixas:
+            pdf.add_page(faixa)
+    """
+
+    CATALOG = 1
+    PAGES = 2
+
+    def __init__(self, path, resolution=150, quality=95):
+        self.path = path
+        self.resolution = resolution
+        self.quality = quality
+        self.offsets = {}      # numero do objeto -> posicao no arquivo
+        self.page_ids = []
+        self._next_id = 3
+        self._tmp_path = path + ".part"
+        self._file = open(self._tmp_path, "wb")
+        self._file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    def abort(self):
+        """Descarta o arquivo parcial"""
+        if not self._file.closed:
+            self._file.close()
+        try:
+            os.remove(self._tmp_path)
+        except OSError:
+            pass
+
+    def _new_id(self):
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def _write_obj(self, obj_id, body, stream=None):
+        self.offsets[obj_id] = self._file.tell()
+        self._file.write(f"{obj_id} 0 obj\n".encode("ascii"))
+        self._file.write(body.encode("ascii"))
+        if stream is not None:
+            self._file.write(b"\nstream\n")
+            self._file.write(stream)
+            self._file.write(b"\nendstream")
+        self._file.write(b"\nendobj\n")
+
+    def add_page(self, image):
+        """Grava uma pagina com a imagem ocupando a pagina inteira; a imagem pode ser descartada depois"""
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        buf = io.BytesIO()
+        image.save(buf, "JPEG", quality=self.quality)
+        data = buf.getvalue()
+        del buf
+
+        w, h = image.size
+        pw = w * 72.0 / self.resolution
+        ph = h * 72.0 / self.resolution
+        colors = "/DeviceRGB" if image.mode == "RGB" else "/DeviceGray"
+
+        img_id, content_id, page_id = self._new_id(), self._new_id(), self._new_id()
+        self._write_obj(img_id,
+                        f"<< /Type /XObject /Subtype /Image /Width {w} /Height {h} /ColorSpace {colors} "
+                        f"/BitsPerComponent 8 /Filter /DCTDecode /Length {len(data)} >>", data)
+        content = f"q {pw:.4f} 0 0 {ph:.4f} 0 0 cm /Im0 Do Q".encode("ascii")
+        self._write_obj(content_id, f"<< /Length {len(content)} >>", content)
+        self._write_obj(page_id,
+                        f"<< /Type /Page /Parent {self.PAGES} 0 R /MediaBox [0 0 {pw:.4f} {ph:.4f}] "
+                        f"/Resources << /XObject << /Im0 {img_id} 0 R >> >> /Contents {content_id} 0 R >>")
+        self.page_ids.append(page_id)
+
+    def close(self):
+        """Escreve catalogo, arvore de paginas, xref e trailer"""
+        if self._file.closed:
+            return
+        kids = " ".join(f"{p} 0 R" for p in self.page_ids)
+        self._write_obj(self.PAGES, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>")
+        self._write_obj(self.CATALOG, f"<< /Type /Catalog /Pages {self.PAGES} 0 R >>")
+
+        xref_pos = self._file.tell()
+        size = self._next_id
+        lines = [f"xref\n0 {size}\n", "0000000000 65535 f \n"]
+        for obj_id in range(1, size):
+            lines.append(f"{self.offsets[obj_id]:010d} 00000 n \n")
+        lines.append(f"trailer\n<< /Size {size} /Root {self.CATALOG} 0 R >>\nstartxref\n{xref_pos}\n%%EOF\n")
+        self._file.write("".join(lines).encode("ascii"))
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
@@ -0,0 +1,60 @@
+# project.py - Projeto salvo pelo editor (JSON em JSON_FOLDER) -> estado do renderer, sem cena Qt
+
+import json
+import os
+from core.config import GLOBAL_CONFIG_DEFAULT
+
+
+def load_project(json_path):
+    """Le o JSON do projeto: (caminhos das imagens, notas salvas, configuracoes completas)"""
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    images = [p for p in (data.get('imagens') or [data.get('imagem_fundo')]) if p]
+    notes = data.get('notas', data.get('data', []))
+    config = GLOBAL_CONFIG_DEFAULT.copy()
+    config.update(data.get('configuracoes') or {})
+    return images, notes, config
+
+
+def _box(x, y, r):
+    """Retangulo (x, y, w, h) relativo ao item em (x, y) -> caixa na cena, como em get_current_state"""
+    rx, ry, rw, rh = r
+    return (x + rx, y + ry, x + rx + rw, y + ry + rh)
+
+
+def state_from_notes(notes):
+    """Notas no formato salvo (tipo/x/y/custom_*, HEADER_BOX/TIMESIG_BOX com w/h) -> estado do renderer.
+    Mesma interpretacao de MainWindow.load_scene_data, sem criar itens graficos."""
+    state = []
+    for d in notes:
+        t = d.get('t', d.get('tipo', ''))
+        kind = d.get('type')
+        x, y = d.get('x', 0), d.get('y', 0)
+        if kind is None:
+            if "HEADER_BOX" in t:
+                kind = 'HEADER'
+            elif "TIMESIG_BOX" in t:
+                kind = 'TIME'
+            elif "TAG" in t:
+                kind = 'TAG'
+            else:
+                kind = 'NOTE'
+
+        if kind in ('HEADER', 'TIME'):
+            r = d.get('r') or (0, 0, d.get('w', 0), d.get('h', 0))
+            state.append({'type': kind, 'r': tuple(r), 'box': d.get('box') or _box(x, y, r), 'x': x, 'y': y})
+        elif kind in ('NOTE', 'TAG'):
+            item = {'type': kind, 't': t, 'x': x, 'y': y}
+            cp = d.get('cp')
+            if not cp and 'custom_w' in d:
+                cp = {'w': d['custom_w'], 'h': d['custom_h'], 'y': d['custom_y']}
+            if kind == 'NOTE' and cp:
+                item['cp'] = dict(cp)
+            state.append(item)
+    return state
+
+
+def project_inputs_mtime(json_path, images):
+    """Ultima modificacao entre o JSON e as imagens existentes (para saber se a saida esta em dia)"""
+    paths = [json_path] + [p for p in images if os.path.exists(p)]
+    return max(os.path.getmtime(p) for p in paths)
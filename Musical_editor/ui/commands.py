@@ -0,0 +1,102 @@
+# commands.py - Comandos de desfazer/refazer (QUndoStack)
+#
+# Cada comando guarda so a diferenca (itens adicionados/removidos, posicoes antigas/novas,
+# tipo ou recorte anterior) e age nos proprios itens da cena: desfazer nao recarrega a cena
+# nem as imagens de fundo. redo() e idempotente porque o push() chama redo() logo apos a acao
+# ja ter acontecido na interface (arrasto, desenho de caixa).
+# O NoteDocument da cena acompanha: adicionar/remover passam por MusicalScene, mover chama item_moved.
+
+from PyQt6.QtGui import QUndoCommand
+
+MOVE_COMMAND_ID = 1
+
+
+class AddItemsCommand(QUndoCommand):
+    def __init__(self, scene, items, text="Adicionar"):
+        super().__init__(text)
+        self.scene = scene
+        self.items = list(items)
+
+    def redo(self):
+        for item in self.items:
+            if item.scene() is not self.scene:
+                self.scene.addItem(item)
+
+    def undo(self):
+        for item in self.items:
+            if item.scene() is self.scene:
+                self.scene.removeItem(item)
+
+
+class RemoveItemsCommand(AddItemsCommand):
+    def __init__(self, scene, items, text="Excluir"):
+        super().__init__(scene, items, text)
+
+    def redo(self):
+        AddItemsCommand.undo(self)
+
+    def undo(self):
+        AddItemsCommand.redo(self)
+
+
+class MoveItemsCommand(QUndoCommand):
+    """Posicoes antes/depois de cada item. Setas seguidas nos mesmos itens viram um comando so."""
+
+    def __init__(self, moves, text="Mover", merge=False):
+        super().__init__(text)
+        self.moves = dict(moves)   # item -> (QPointF antiga, QPointF nova)
+        self.merge = merge
+
+    def id(self):
+        return MOVE_COMMAND_ID if self.merge else -1
+
+    def mergeWith(self, other):
+        if not other.merge or other.moves.keys() != self.moves.keys():
+            return False
+        for item, (_, new_pos) in other.moves.items():
+            self.moves[item] = (self.moves[item][0], new_pos)
+        return True
+
+    def _apply(self, index):
+        for item, positions in self.moves.items():
+            item.setPos(positions[index])
+            if item.scene() is not None:
+                item.scene().item_moved(item)   # reordena no documento
+
+    def redo(self):
+        self._apply(1)
+
+    def undo(self):
+        self._apply(0)
+
+
+class RetypeCommand(QUndoCommand):
+    def __init__(self, item, new_tipo, text="Trocar tipo"):
+        super().__init__(text)
+        self.item = item
+        self.old_tipo = item.tipo
+        self.new_tipo = new_tipo
+
+    def redo(self):
+        self.item.set_tipo(self.new_tipo)
+
+    def undo(self):
+        self.item.set_tipo(self.old_tipo)
+
+
+class CropParamsCommand(QUndoCommand):
+    def __init__(self, item, new_params, text="Ajustar recorte"):
+        super().__init__(text)
+        self.item = item
+        self.old_params = dict(item.custom_crop_params) if item.custom_crop_params else None
+        self.new_params = dict(new_params) if new_params else None
+
+    def _apply(self, params):
+        self.item.custom_crop_params = dict(params) if params else None
+        self.item.update()
+
+    def redo(self):
+        self._apply(self.new_params)
+
+    def undo(self):
+        self._apply(self.old_params)
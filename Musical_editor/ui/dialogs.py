@@ -1,7 +1,7 @@
 # dialogs.py (COMPLETO)
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QTabWidget, QWidget,
-    QPushButton, QLabel, QSpinBox, QDoubleSpinBox, QScrollArea,
+    QPushButton, QLabel, QSpinBox, QDoubleSpinBox, QScrollArea, QLineEdit,
     QMessageBox, QInputDialog
 )
 from PyQt6.QtGui import QPixmap, QImage
@@ -48,6 +48,9 @@ class SettingsDialog(QDialog):
         self.spin_snap = self.add_spin(form_page, "Grade / Snap:", GLOBAL_CONFIG["SNAP_GRID"])
         self.spin_spacing = self.add_spin(form_page, "Espaço Notas:", GLOBAL_CONFIG["SPACING_NOTE"])
         self.spin_page_w = self.add_spin(form_page, "Largura Página:", GLOBAL_CONFIG["PAGE_WIDTH"])
+        self.edit_fonts = QLineEdit(GLOBAL_CONFIG.get("FONT_FILES", ""))
+        self.edit_fonts.setToolTip("Arquivos de fonte em ordem de preferência, separados por vírgula")
+        form_page.addRow(QLabel("Fontes:"), self.edit_fonts)
         tabs.addTab(tab_page, "Página / Zoom")
 
         self.layout.addWidget(tabs)
@@ -80,6 +83,7 @@ class SettingsDialog(QDialog):
         GLOBAL_CONFIG["SNAP_GRID"] = self.spin_snap.value()
         GLOBAL_CONFIG["SPACING_NOTE"] = self.spin_spacing.value()
         GLOBAL_CONFIG["PAGE_WIDTH"] = self.spin_page_w.value()
+        GLOBAL_CONFIG["FONT_FILES"] = self.edit_fonts.text().strip()
         log_debug("Configurações salvas com sucesso")
         self.accept()
 
@@ -209,12 +213,14 @@ class PreviewDialog(QDialog):
         if self.pil_image is None:
             return
 
-        im_data = self.pil_image.convert("RGBA").tobytes("raw", "RGBA")
-        qimage = QImage(
-            im_data, self.pil_image.width, self.pil_image.height,
-            QImage.Format.Format_RGBA8888
-        )
-        self.original_pixmap = QPixmap.fromImage(qimage)
+        # Converte PIL -> QPixmap uma vez; o zoom so reescala o pixmap guardado
+        if self.original_pixmap is None:
+            im_data = self.pil_image.convert("RGBA").tobytes("raw", "RGBA")
+            qimage = QImage(
+                im_data, self.pil_image.width, self.pil_image.height,
+                QImage.Format.Format_RGBA8888
+            )
+            self.original_pixmap = QPixmap.fromImage(qimage)
 
         if self.original_pixmap.isNull():
             log_error("Falha ao converter para QPixmap")
@@ -4,10 +4,18 @@ from PyQt6.QtCore import Qt, QRectF, QPointF
 from PyQt6.QtGui import QPainter, QPen, QBrush, QColor, QFont, QPainterPath
 from core.cache import ImageCache
 from core.config import GLOBAL_CONFIG
+from core.document import NoteRecord
+
+# Area pintada da nota sem o recorte: shape (-20,-60,40,80) + meia largura da caneta de 2px
+NOTE_RECT = QRectF(-21, -61, 42, 82)
+# Nivel de detalhe (escala da vista): abaixo de LOD_ICON so o marcador, abaixo de LOD_CROP sem recorte
+LOD_ICON = 0.35
+LOD_CROP = 0.6
 
 class LabelItem(QGraphicsObject):
     def __init__(self, tipo, x, y, snap_enabled_callback):
         super().__init__()
+        self.record = NoteRecord('TAG', tipo, x, y)
         self.tipo = tipo
         self.snap_callback = snap_enabled_callback
         self.label_text = tipo.replace("TAG_", "")
@@ -58,9 +66,14 @@ class LabelItem(QGraphicsObject):
         return super().itemChange(change, value)
 
 
+def _rect_tuple(rect):
+    return (rect.left(), rect.top(), rect.width(), rect.height())
+
+
 class HeaderBoxItem(QGraphicsRectItem):
     def __init__(self, rect):
         super().__init__(rect)
+        self.record = NoteRecord('HEADER', "HEADER_BOX", rect=_rect_tuple(rect))
         self.setFlags(
             QGraphicsRectItem.GraphicsItemFlag.ItemIsMovable |
             QGraphicsRectItem.GraphicsItemFlag.ItemIsSelectable
@@ -75,6 +88,10 @@ class HeaderBoxItem(QGraphicsRectItem):
         painter.setFont(QFont("Arial", 14, QFont.Weight.Bold))
         painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "CABEÇALHO")
 
+    def setRect(self, rect):
+        super().setRect(rect)
+        self.record.rect = _rect_tuple(rect)
+
     def itemChange(self, change, value):
         if change == QGraphicsRectItem.GraphicsItemChange.ItemPositionChange and self.scene():
             snap = GLOBAL_CONFIG["SNAP_GRID"]
@@ -85,6 +102,7 @@ class HeaderBoxItem(QGraphicsRectItem):
 class TimeSigBoxItem(QGraphicsRectItem):
     def __init__(self, rect):
         super().__init__(rect)
+        self.record = NoteRecord('TIME', "TIMESIG_BOX", rect=_rect_tuple(rect))
         self.setFlags(
             QGraphicsRectItem.GraphicsItemFlag.ItemIsMovable |
             QGraphicsRectItem.GraphicsItemFlag.ItemIsSelectable
@@ -99,6 +117,10 @@ class TimeSigBoxItem(QGraphicsRectItem):
         painter.setFont(QFont("Arial", 10, QFont.Weight.Bold))
         painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "COMPASSO")
 
+    def setRect(self, rect):
+        super().setRect(rect)
+        self.record.rect = _rect_tuple(rect)
+
     def itemChange(self, change, value):
         if change == QGraphicsRectItem.GraphicsItemChange.ItemPositionChange and self.scene():
             snap = GLOBAL_CONFIG["SNAP_GRID"]
@@ -109,20 +131,77 @@ class TimeSigBoxItem(QGraphicsRectItem):
 class NoteItem(QGraphicsObject):
     def __init__(self, tipo, x, y, snap_enabled_callback, custom_crop_params=None):
         super().__init__()
+        self.record = NoteRecord('NOTE', tipo, x, y, custom_crop_params)
         self.tipo = tipo
         self.snap_callback = snap_enabled_callback
         self.pixmap_small = ImageCache.get_pixmap(tipo, 20)
         self.setPos(x, y)
-        self.custom_crop_params = custom_crop_params
+        # ItemSendsGeometryChanges: itemChange recebe a posicao durante o arraste (snap e recorte de hover)
         self.setFlags(
             QGraphicsObject.GraphicsItemFlag.ItemIsMovable |
-            QGraphicsObject.GraphicsItemFlag.ItemIsSelectable
+            QGraphicsObject.GraphicsItemFlag.ItemIsSelectable |
+            QGraphicsObject.GraphicsItemFlag.ItemSendsGeometryChanges
         )
         self.setAcceptHoverEvents(True)
         self.is_hovered = False
+        self.hover_crop = None   # (retangulo, cor) enquanto o mouse esta em cima
+
+    @property
+    def custom_crop_params(self):
+        return self.record.cp
+
+    @custom_crop_params.setter
+    def custom_crop_params(self, params):
+        self.record.cp = params
+        if self.is_hovered:
+            self.set_hover_crop()
+
+    def set_tipo(self, tipo):
+        """Troca o tipo no lugar (mesma posicao e recorte)"""
+        self.tipo = tipo
+        self.record.tipo = tipo
+        self.pixmap_small = ImageCache.get_pixmap(tipo, 20)
+        if self.is_hovered:
+            self.set_hover_crop()
+        self.update()
+
+    def crop_box(self):
+        """(retangulo, cor) do recorte que o renderer vai usar - None para pausas/respiracoes"""
+        if any(x in self.tipo for x in ["PAUSA", "RESPIRACAO", "TAG"]):
+            return None
+        document = getattr(self.scene(), 'document', None)
+        if self.custom_crop_params:
+            w_box = self.custom_crop_params['w']
+            h_box = self.custom_crop_params['h']
+            y_box = self.custom_crop_params['y']
+            color_pen = QColor(255, 0, 255)
+        elif document is not None and document.tags.chorus_at(self.x(), self.y()):
+            w_box = GLOBAL_CONFIG["CHORUS_WIDTH"]
+            h_box = GLOBAL_CONFIG["CHORUS_HEIGHT"]
+            y_box = GLOBAL_CONFIG["CHORUS_OFFSET_Y"]
+            color_pen = QColor(255, 165, 0)
+        else:
+            w_box = GLOBAL_CONFIG["CROP_WIDTH"]
+            h_box = GLOBAL_CONFIG["CROP_HEIGHT"]
+            y_box = GLOBAL_CONFIG["CROP_OFFSET_Y"]
+            color_pen = QColor(0, 255, 255)
+        return QRectF(-w_box / 2, y_box, w_box, h_box), color_pen
+
+    def set_hover_crop(self, enabled=True):
+        """Liga/desliga o recorte pontilhado; a geometria cresce so enquanto ele aparece"""
+        self.prepareGeometryChange()
+        self.hover_crop = self.crop_box() if enabled else None
+        hovered = getattr(self.scene(), 'hovered_notes', None)
+        if hovered is not None:
+            if enabled:
+                hovered.add(self)
+            else:
+                hovered.discard(self)
 
     def boundingRect(self):
-        return QRectF(-150, -100, 300, 400)
+        if self.hover_crop is None:
+            return NOTE_RECT
+        return NOTE_RECT.united(self.hover_crop[0].adjusted(-1, -1, 1, 1))
 
     def shape(self):
         path = QPainterPath()
@@ -130,6 +209,8 @@ class NoteItem(QGraphicsObject):
         return path
 
     def paint(self, painter, option, widget):
+        lod = option.levelOfDetailFromTransform(painter.worldTransform())
+
         # Seleção
         if self.is_hovered or self.isSelected():
             painter.setPen(QPen(Qt.GlobalColor.yellow, 2))
@@ -140,6 +221,8 @@ class NoteItem(QGraphicsObject):
         y_mark = -40
         painter.drawLine(-5, -45, 5, -35)
         painter.drawLine(-5, -35, 5, -45)
+        if lod < LOD_ICON:
+            return
 
         # Ícone
         if not self.pixmap_small.isNull():
@@ -147,48 +230,24 @@ class NoteItem(QGraphicsObject):
             painter.drawPixmap(target_rect.toRect(), self.pixmap_small)
 
         # Lógica Visual do Recorte (Pontilhado)
-        if self.is_hovered and not any(x in self.tipo for x in ["PAUSA", "RESPIRACAO", "TAG"]):
-            is_chorus_mode = False
-            if self.scene():
-                tags = [it for it in self.scene().items() if isinstance(it, LabelItem)]
-                tags.sort(key=lambda item: (item.y(), item.x()))
-                last_valid_tag = None
-                for tag in tags:
-                    if tag.y() < (self.y() - 50) or (abs(tag.y() - self.y()) <= 50 and tag.x() < self.x()):
-                        last_valid_tag = tag
-                if last_valid_tag and ("CORO" in last_valid_tag.tipo or "FINAL" in last_valid_tag.tipo):
-                    is_chorus_mode = True
-
-            if self.custom_crop_params:
-                w_box = self.custom_crop_params['w']
-                h_box = self.custom_crop_params['h']
-                y_box = self.custom_crop_params['y']
-                color_pen = QColor(255, 0, 255)
-            elif is_chorus_mode:
-                w_box = GLOBAL_CONFIG["CHORUS_WIDTH"]
-                h_box = GLOBAL_CONFIG["CHORUS_HEIGHT"]
-                y_box = GLOBAL_CONFIG["CHORUS_OFFSET_Y"]
-                color_pen = QColor(255, 165, 0)
-            else:
-                w_box = GLOBAL_CONFIG["CROP_WIDTH"]
-                h_box = GLOBAL_CONFIG["CROP_HEIGHT"]
-                y_box = GLOBAL_CONFIG["CROP_OFFSET_Y"]
-                color_pen = QColor(0, 255, 255)
-
+        if self.hover_crop is not None and lod >= LOD_CROP:
+            rect, color_pen = self.hover_crop
             pen_crop = QPen(color_pen)
             pen_crop.setStyle(Qt.PenStyle.DashLine)
             pen_crop.setWidth(2)
             painter.setPen(pen_crop)
             painter.setBrush(Qt.BrushStyle.NoBrush)
-            painter.drawRect(QRectF(-w_box / 2, y_box, w_box, h_box))
+            painter.drawRect(rect)
 
     def hoverEnterEvent(self, event):
         self.is_hovered = True
+        self.set_hover_crop()
         self.update()
         super().hoverEnterEvent(event)
 
     def hoverLeaveEvent(self, event):
         self.is_hovered = False
+        self.set_hover_crop(False)
         self.update()
         super().hoverLeaveEvent(event)
 
@@ -199,4 +258,7 @@ class NoteItem(QGraphicsObject):
                 x = round(value.x() / grid) * grid
                 y = round(value.y() / grid) * grid
                 return QPointF(x, y)
+        elif change == QGraphicsObject.GraphicsItemChange.ItemPositionHasChanged and self.is_hovered:
+            # Arrastando a nota sob o mouse: ela pode entrar ou sair de uma regiao de coro
+            self.set_hover_crop()
         return super().itemChange(change, value)
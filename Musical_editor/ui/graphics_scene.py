@@ -0,0 +1,52 @@
+# graphics_scene.py
+from PyQt6.QtWidgets import QGraphicsScene
+from core.document import NoteDocument
+
+
+class MusicalScene(QGraphicsScene):
+    """Cena do editor com o NoteDocument sincronizado: itens com `record` (notas, tags, caixas)
+    entram/saem do documento junto com a cena. Fundo, linhas e fantasma ficam de fora.
+    Tag que entra, sai ou muda de lugar refaz o recorte das notas sob o mouse (pode virar coro)."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.document = NoteDocument()
+        self.hovered_notes = set()   # NoteItems com recorte de hover ligado (NoteItem.set_hover_crop)
+
+    def addItem(self, item):
+        super().addItem(item)
+        record = getattr(item, 'record', None)
+        if record is not None:
+            if record.key is None:
+                record.x, record.y = item.x(), item.y()   # item pode ter sido posicionado antes de entrar
+            self.document.add(record)
+            if record.kind == 'TAG':
+                self._tags_changed()
+
+    def removeItem(self, item):
+        record = getattr(item, 'record', None)
+        if record is not None:
+            self.document.remove(record)
+        super().removeItem(item)
+        self.hovered_notes.discard(item)
+        if record is not None and record.kind == 'TAG':
+            self._tags_changed()
+
+    def clear(self):
+        self.document.clear()
+        self.hovered_notes.clear()
+        super().clear()
+
+    def item_moved(self, item):
+        """Posicao final de um item (comando de mover/desfazer) -> documento"""
+        record = getattr(item, 'record', None)
+        if record is not None:
+            self.document.move(record, item.x(), item.y())
+            if record.kind == 'TAG':
+                self._tags_changed()
+
+    def _tags_changed(self):
+        """Recorte de hover em cache (NoteItem.hover_crop) depende da tag que governa a nota"""
+        for item in list(self.hovered_notes):
+            item.set_hover_crop()
+            item.update()
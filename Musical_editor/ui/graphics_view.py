@@ -21,6 +21,7 @@ class MusicalView(QGraphicsView):
         self.ghost_item = None
         self.start_pos = None
         self.current_drawing_box = None
+        self.replaced_boxes = []
         log_debug("MusicalView inicializada")
 
     def set_scene(self, scene):
@@ -109,9 +110,10 @@ class MusicalView(QGraphicsView):
                 log_info("Iniciando desenho de retângulo")
                 self.start_pos = self.mapToScene(event.pos())
                 t_type = HeaderBoxItem if self.main.is_drawing_header else TimeSigBoxItem
-                for i in self.scene().items():
-                    if isinstance(i, t_type):
-                        self.scene().removeItem(i)
+                # Sai da cena ja; entra no historico junto com a caixa nova, ao soltar o mouse
+                self.replaced_boxes = [i for i in self.scene().items() if isinstance(i, t_type)]
+                for i in self.replaced_boxes:
+                    self.scene().removeItem(i)
                 return
 
             # Adicionar Nota
@@ -135,24 +137,26 @@ class MusicalView(QGraphicsView):
                 log_debug(f"Item real encontrado, não adicionando nota")
 
         super().mousePressEvent(event)
+        if event.button() == Qt.MouseButton.LeftButton:
+            self.main.begin_move()
 
     def mouseReleaseEvent(self, event):
         log_debug("Mouse liberado")
         # Finaliza desenho de retângulo
         if (self.main.is_drawing_header or self.main.is_drawing_timesig) and self.start_pos:
             log_info("Finalizando desenho de retângulo")
+            self.main.replace_box(self.replaced_boxes, self.current_drawing_box)
             self.start_pos = None
             self.current_drawing_box = None
+            self.replaced_boxes = []
             self.main.is_drawing_header = False
             self.main.is_drawing_timesig = False
             self.setCursor(Qt.CursorShape.ArrowCursor)
-            self.main.save_state()
             return
 
-        if event.button() == Qt.MouseButton.LeftButton:
-            self.main.save_state()
-
         super().mouseReleaseEvent(event)
+        if event.button() == Qt.MouseButton.LeftButton:
+            self.main.end_move()
 
     def contextMenuEvent(self, event):
         sp = self.mapToScene(event.pos())
@@ -209,9 +213,7 @@ class MusicalView(QGraphicsView):
                 dy = 1
 
             if dx or dy:
-                self.main.save_state()
-                for i in sel:
-                    i.moveBy(dx, dy)
+                self.main.nudge_selected(dx, dy)
                 return
 
         super().keyPressEvent(event)
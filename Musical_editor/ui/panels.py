@@ -5,10 +5,11 @@ import json
 from functools import partial
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
-    QScrollArea, QGroupBox, QGridLayout, QSplitter, QListWidgetItem,QMessageBox
+    QScrollArea, QGroupBox, QGridLayout, QSplitter, QListWidgetItem,QMessageBox,
+    QDockWidget
 )
 from PyQt6.QtCore import Qt, QSize
-from PyQt6.QtGui import QIcon, QBrush, QColor
+from PyQt6.QtGui import QIcon, QBrush, QColor, QImage, QPixmap
 
 
 from core.config import FERRAMENTAS_ORGANIZADAS, IMG_FOLDER, JSON_FOLDER, OUTPUT_FOLDER,PREVIEW_FOLDER
@@ -358,3 +359,39 @@ class RightPanel(QWidget):
         log_debug(f"Atualizando ferramenta para: {tool_name}")
         self.lbl_tool_name.setText(tool_name)
         self.lbl_icon_preview.setPixmap(ImageCache.get_pixmap(tool_name, 35))
+
+
+class PreviewDock(QDockWidget):
+    """Painel de preview automatico: mostra o ultimo render concluido, ajustado a largura"""
+    def __init__(self, parent=None):
+        super().__init__("Preview", parent)
+        self.setObjectName("PreviewDock")
+        self.original_pixmap = None
+
+        self.scroll = QScrollArea()
+        self.scroll.setWidgetResizable(True)
+        self.scroll.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.img_label = QLabel("Aguardando alteracoes...")
+        self.img_label.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignHCenter)
+        self.scroll.setWidget(self.img_label)
+        self.setWidget(self.scroll)
+        self.setMinimumWidth(300)
+
+    def set_image(self, pil_image):
+        """Recebe a imagem PIL do RenderWorker (ja na thread da interface)"""
+        if pil_image is None:
+            return
+        im_data = pil_image.convert("RGBA").tobytes("raw", "RGBA")
+        qimage = QImage(im_data, pil_image.width, pil_image.height, QImage.Format.Format_RGBA8888)
+        self.original_pixmap = QPixmap.fromImage(qimage)
+        self.update_display()
+
+    def update_display(self):
+        if self.original_pixmap is None or self.original_pixmap.isNull():
+            return
+        width = max(50, self.scroll.viewport().width() - 10)
+        self.img_label.setPixmap(self.original_pixmap.scaledToWidth(width, Qt.TransformationMode.SmoothTransformation))
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_display()
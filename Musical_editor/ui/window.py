@@ -8,7 +8,7 @@ from functools import partial
 
 from PyQt6.QtCore import Qt, QRectF, QPointF, pyqtSignal, QSize, QEvent, QThread, QTimer, QMimeData
 from PyQt6.QtWidgets import (
-    QApplication, QMainWindow, QGraphicsView, QGraphicsScene, 
+    QApplication, QMainWindow, QGraphicsView, 
     QGraphicsItem, QGraphicsPixmapItem, QGraphicsRectItem, QWidget, QVBoxLayout, 
     QHBoxLayout, QPushButton, QCheckBox, QLabel, QScrollArea, 
     QFrame, QFileDialog, QMessageBox, QMenu, QGraphicsObject,
@@ -17,12 +17,12 @@ from PyQt6.QtWidgets import (
     QTabWidget, QToolBox, QGridLayout, QGroupBox, QStyle,
     QAbstractItemView 
 )
-from PyQt6.QtGui import QPixmap, QPen, QShortcut, QKeySequence
+from PyQt6.QtGui import QPen, QShortcut, QKeySequence, QUndoStack
 
 # Importar de config
 from core.config import (
     IMG_FOLDER, JSON_FOLDER, GLOBAL_CONFIG, FERRAMENTAS_ORGANIZADAS, MAPA_ATALHOS,PREVIEW_FOLDER,
-    ICONS_FOLDER, OUTPUT_FOLDER, MINHA_API_KEY
+    ICONS_FOLDER, OUTPUT_FOLDER, MINHA_API_KEY, MAX_HIST
 )
 
 # Importar logger
@@ -31,13 +31,18 @@ from core.logger import log_info, log_debug, log_error, log_warning, init_logger
 # Importar módulos locais
 from core.utils import clean_filename, natural_sort_key
 from core.cache import ImageCache
+from core.page_cache import PageCache
+from core.page_layout import PageLayout
 from ui.graphics_view import MusicalView
+from ui.graphics_scene import MusicalScene
 from ui.dialogs import SettingsDialog, PreviewDialog
 from rendering.image_renderer import ImageRenderer
+from rendering.layout import IncrementalCompositor
 from ui.list_widgets import ImageListWidget, ProjectListWidget
-from ui.panels import LeftPanel, RightPanel
+from ui.panels import LeftPanel, RightPanel, PreviewDock
 from ui.graphics_items import NoteItem, LabelItem, HeaderBoxItem, TimeSigBoxItem
-from core.workers import GeminiWorker
+from ui.commands import AddItemsCommand, RemoveItemsCommand, MoveItemsCommand, RetypeCommand, CropParamsCommand
+from core.workers import GeminiWorker, RenderWorker
 
 # Importar PIL
 from PIL import Image, ImageDraw, ImageEnhance, ImageOps, ImageFont
@@ -64,8 +69,9 @@ class MainWindow(QMainWindow):
             self.current_tool = "SEMINIMA"
             self.current_image_paths = []
             self.current_json_path = None
-            self.history = []
-            self.history_pos = -1
+            self.undo_stack = QUndoStack(self)
+            self.undo_stack.setUndoLimit(MAX_HIST)
+            self.move_start = {}  # item -> posicao no inicio do arrasto
             self.is_drawing_header = False
             self.is_drawing_timesig = False
             self.cooldown_remaining = 0
@@ -73,6 +79,10 @@ class MainWindow(QMainWindow):
             self.progress_dialog = None
             self.progress_timer = None
             self.progress_value = 0
+            self.render_job_id = 0
+            self.render_workers = []
+            self.preview_compositor = IncrementalCompositor()
+            self.page_layout = PageLayout([])
             log_debug("Estado inicial configurado")
 
             # Timers
@@ -82,11 +92,16 @@ class MainWindow(QMainWindow):
             self.preview_timer = QTimer(self)
             self.preview_timer.setSingleShot(True)
             self.preview_timer.timeout.connect(self.generate_auto_preview)
+            # Edicoes do modelo em rajada (varios comandos no mesmo ciclo) viram uma atualizacao so
+            self.model_timer = QTimer(self)
+            self.model_timer.setSingleShot(True)
+            self.model_timer.setInterval(0)
+            self.model_timer.timeout.connect(self.apply_model_changes)
             log_debug("Timers configurados")
 
             # Cria a cena ANTES de init_ui
-            self.scene = QGraphicsScene()
-            log_debug("QGraphicsScene criada")
+            self.scene = MusicalScene()
+            log_debug("MusicalScene criada")
 
             # UI
             log_info("Inicializando UI...")
@@ -94,8 +109,10 @@ class MainWindow(QMainWindow):
             log_info("UI inicializada com sucesso")
 
             # Conecta sinal DEPOIS que view foi criada
-            self.scene.changed.connect(self.on_scene_changed)
-            log_debug("Sinal scene.changed conectado")
+            # Mudancas reais do modelo vem do historico (adicionar/mover/excluir/trocar/recorte);
+            # scene.changed tambem dispara em hover, fantasma e cada passo de arrasto, e nao e usado
+            self.undo_stack.indexChanged.connect(self.on_model_changed)
+            log_debug("Historico conectado ao controle de alteracoes")
 
             self.setup_shortcuts()
             log_debug("Atalhos configurados")
@@ -139,6 +156,11 @@ class MainWindow(QMainWindow):
         splitter.setStretchFactor(1, 4)
         splitter.setStretchFactor(2, 1)
         main_layout.addWidget(splitter)
+
+        # Preview automatico (renderizado em segundo plano)
+        self.preview_dock = PreviewDock(self)
+        self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, self.preview_dock)
+        self.preview_dock.hide()
         log_debug("init_ui concluido")
 
     def setup_center_panel(self, parent_widget):
@@ -175,6 +197,7 @@ class MainWindow(QMainWindow):
         self.add_btn(layout, "Desenhar Compasso", self.enable_timesig_drawing, "#e67e22")
         layout.addSpacing(20)
         self.add_btn(layout, "PREVIEW", self.generate_preview, "#8e44ad")
+        self.add_btn(layout, "Exportar PDF", self.export_sheet_streaming, "#16a085")
         layout.addSpacing(20)
 
         self.snap_active = QCheckBox("Snap Grid")
@@ -186,9 +209,10 @@ class MainWindow(QMainWindow):
         self.chk_continuous.setStyleSheet("color: white;")
         layout.addWidget(self.chk_continuous)
 
-        """self.chk_auto_preview = QCheckBox("Preview Auto")
+        self.chk_auto_preview = QCheckBox("Preview Auto")
         self.chk_auto_preview.setStyleSheet("color: white;")
-        layout.addWidget(self.chk_auto_preview)"""
+        self.chk_auto_preview.toggled.connect(self.toggle_auto_preview)
+        layout.addWidget(self.chk_auto_preview)
 
         layout.addStretch()
 
@@ -219,6 +243,8 @@ class MainWindow(QMainWindow):
 
         QShortcut(QKeySequence("Delete"), self).activated.connect(self.delete_selected)
         QShortcut(QKeySequence("Ctrl+Z"), self).activated.connect(self.undo)
+        QShortcut(QKeySequence("Ctrl+Y"), self).activated.connect(self.redo)
+        QShortcut(QKeySequence("Ctrl+Shift+Z"), self).activated.connect(self.redo)
         QShortcut(QKeySequence("Ctrl+0"), self).activated.connect(lambda: self.view.resetTransform())
         QShortcut(QKeySequence("Ctrl+S"), self).activated.connect(lambda: self.trigger_save("em_andamento"))
         log_debug("Atalhos configurados com sucesso")
@@ -402,41 +428,43 @@ class MainWindow(QMainWindow):
     def load_images_to_scene(self, paths):
         """Carrega imagens para cena"""
         log_info(f"Carregando {len(paths)} imagem(ns) para cena")
+        self.reset_history()
         self.scene.clear()
         self.current_image_paths = paths
-        y_offset = 0
 
+        pixmaps = []
         for p in paths:
             if not p or not os.path.exists(p):
                 log_warning(f"Imagem nao encontrada: {p}")
                 continue
-
             try:
                 log_debug(f"Carregando imagem: {p}")
-                pix = QPixmap(p)
-                if pix.isNull():
+                pix = PageCache.get_pixmap(p)
+                if pix is None or pix.isNull():
                     log_error(f"Falha ao carregar pixmap: {p}")
                     continue
-
-                item = self.scene.addPixmap(pix)
-                item.setZValue(-100)
-                item.setPos(0, y_offset)
-                item.setData(0, "background")
-                item.setAcceptedMouseButtons(Qt.MouseButton.NoButton)
-
-                y_offset += pix.height() + 20
-                line = self.scene.addLine(0, y_offset - 10, pix.width(), y_offset - 10, QPen(Qt.GlobalColor.black, 2))
-                line.setZValue(-99)
+                pixmaps.append(pix)
                 log_debug(f"Imagem carregada com sucesso: {p}")
-
             except Exception as e:
                 log_error(f"Erro ao carregar imagem {p}", e)
 
+        # Mesmo empilhamento que o renderer usa para achar a pagina de cada nota
+        self.page_layout = PageLayout([(pix.width(), pix.height()) for pix in pixmaps])
+        for idx, pix in enumerate(pixmaps):
+            item = self.scene.addPixmap(pix)
+            item.setZValue(-100)
+            item.setPos(0, self.page_layout.offsets[idx])
+            item.setData(0, "background")
+            item.setAcceptedMouseButtons(Qt.MouseButton.NoButton)
+
+            line_y = self.page_layout.separator_y(idx)
+            line = self.scene.addLine(0, line_y, pix.width(), line_y, QPen(Qt.GlobalColor.black, 2))
+            line.setZValue(-99)
+
         self.scene.setSceneRect(self.scene.itemsBoundingRect())
-        self.history = []
         self.view.reset_ghost()
         self.view.update_ghost_icon(self.current_tool)
-        self.update_title()
+        self.on_model_changed()
         log_info(f"Cena atualizada com {len(paths)} imagem(ns)")
 
     def add_item_at_mouse(self, p):
@@ -457,7 +485,7 @@ class MainWindow(QMainWindow):
             item = NoteItem(self.current_tool, x, y, self.snap_active.isChecked)
             log_debug(f"Nota adicionada: {self.current_tool}")
 
-        self.scene.addItem(item)
+        self.undo_stack.push(AddItemsCommand(self.scene, [item], f"Adicionar {self.current_tool}"))
 
     def select_tool(self, tool_name):
         """Seleciona ferramenta"""
@@ -502,9 +530,7 @@ class MainWindow(QMainWindow):
             log_info("Salvando automaticamente antes do preview")
             self.trigger_save("em_andamento")
 
-        ordered_state = self.get_current_state()
         renderer = ImageRenderer(self.scene, self.current_image_paths)
-        renderer.ordered_state = ordered_state
         pil_image = renderer.render()
 
         if not pil_image:
@@ -519,17 +545,70 @@ class MainWindow(QMainWindow):
         log_debug(f"Preview gerado com nome base: {base_name}")
         PreviewDialog(pil_image, base_name, self).exec()
 
+    def toggle_auto_preview(self, checked):
+        """Liga/desliga o painel de preview automatico"""
+        self.preview_dock.setVisible(checked)
+        if checked:
+            self.generate_auto_preview()
+        else:
+            self.preview_timer.stop()
+            self.cancel_render_workers()
+
+    def cancel_render_workers(self):
+        """Cancela renders em andamento; o resultado deles sera descartado"""
+        for worker in self.render_workers:
+            worker.cancel()
+
     def generate_auto_preview(self):
-        """Preview automatico"""
+        """Preview automatico: renderiza um snapshot da cena em segundo plano.
+        Um novo pedido cancela o anterior; so o job mais recente chega ao painel."""
         log_debug("Preview automatico acionado")
-        pass
-
-    def on_scene_changed(self):
-        """Quando cena muda"""
-        log_debug("Cena alterada")
-        self.save_state()
-        """if self.chk_auto_preview.isChecked():
-            self.preview_timer.start(GLOBAL_CONFIG.get("AUTO_PREVIEW_DELAY", 2000))"""
+        if not self.current_image_paths or not self.chk_auto_preview.isChecked():
+            return
+
+        self.cancel_render_workers()
+        self.render_job_id += 1
+        state = self.scene.document.to_render_state()  # snapshot na thread da interface, ja em ordem de leitura
+        worker = RenderWorker(self.render_job_id, state, self.current_image_paths, dict(GLOBAL_CONFIG),
+                              self.preview_compositor, ordered=True)
+        worker.finished_signal.connect(self.on_auto_preview_ready)
+        worker.finished.connect(lambda w=worker: self.on_render_worker_done(w))
+        self.render_workers.append(worker)
+        worker.start()
+        log_debug(f"Preview job {self.render_job_id} iniciado ({len(self.render_workers)} ativos)")
+
+    def on_auto_preview_ready(self, job_id, pil_image):
+        """Resultado do RenderWorker; jobs antigos sao ignorados"""
+        if job_id != self.render_job_id:
+            log_debug(f"Preview job {job_id} obsoleto, ignorado")
+            return
+        if pil_image is None:
+            log_warning("Preview automatico sem imagem")
+            return
+        self.preview_dock.set_image(pil_image)
+
+    def on_render_worker_done(self, worker):
+        if worker in self.render_workers:
+            self.render_workers.remove(worker)
+        worker.deleteLater()
+
+    def closeEvent(self, event):
+        """Espera os renders em segundo plano terminarem antes de fechar"""
+        self.preview_timer.stop()
+        self.cancel_render_workers()
+        for worker in list(self.render_workers):
+            worker.wait(5000)
+        super().closeEvent(event)
+
+    def on_model_changed(self, *_):
+        """Notas/tags/caixas mudaram: so marca e agenda; o trabalho derivado roda uma vez por rajada"""
+        self.model_timer.start()
+
+    def apply_model_changes(self):
+        """Estado derivado do modelo: titulo e preview automatico"""
+        log_debug("Modelo alterado")
+        if self.chk_auto_preview.isChecked():
+            self.preview_timer.start(GLOBAL_CONFIG.get("AUTO_PREVIEW_DELAY", 2000))
         self.update_title()
 
     # ========== SALVAMENTO ==========
@@ -595,75 +674,12 @@ class MainWindow(QMainWindow):
 
 
     def get_current_state(self):
-        """Obtem estado atual ordenado por Y depois X"""
-        raw_items = []
-
-        for item in self.scene.items():
-            if isinstance(item, (NoteItem, LabelItem)):
-                data = {"tipo": item.tipo, "x": round(item.x(), 1), "y": round(item.y(), 1)}
-                if isinstance(item, NoteItem) and item.custom_crop_params:
-                    data['custom_w'] = item.custom_crop_params['w']
-                    data['custom_h'] = item.custom_crop_params['h']
-                    data['custom_y'] = item.custom_crop_params['y']
-                raw_items.append(data)
-
-            if isinstance(item, HeaderBoxItem):
-                r = item.rect()
-                p = item.pos()
-                raw_items.append({
-                    "tipo": "HEADER_BOX",
-                    "x": round(p.x(), 1), "y": round(p.y(), 1),
-                    "w": round(r.width(), 1), "h": round(r.height(), 1)
-                })
-
-            if isinstance(item, TimeSigBoxItem):
-                r = item.rect()
-                p = item.pos()
-                raw_items.append({
-                    "tipo": "TIMESIG_BOX",
-                    "x": round(p.x(), 1), "y": round(p.y(), 1),
-                    "w": round(r.width(), 1), "h": round(r.height(), 1)
-                })
-
-        if not raw_items:
-            return []
-
-        # Separar notas de items especiais
-        notes = [i for i in raw_items if "HEADER" not in i["tipo"] and "TIMESIG" not in i["tipo"]]
-        specials = [i for i in raw_items if "HEADER" in i["tipo"] or "TIMESIG" in i["tipo"]]
-
-        # Ordenar notas por Y primeiro, depois por X
-        notes.sort(key=lambda n: n['y'])
-
-        # Agrupar notas por linha (Y similar) e ordenar cada linha por X
-        sorted_notes = []
-        current_line = []
-
-        if notes:
-            current_line.append(notes[0])
-            line_y_ref = notes[0]['y']
-            LINE_THRESHOLD = 80
-
-            for i in range(1, len(notes)):
-                it = notes[i]
-                if abs(it['y'] - line_y_ref) < LINE_THRESHOLD:
-                    current_line.append(it)
-                else:
-                    current_line.sort(key=lambda n: n['x'])
-                    sorted_notes.extend(current_line)
-                    current_line = [it]
-                    line_y_ref = it['y']
-
-            if current_line:
-                current_line.sort(key=lambda n: n['x'])
-                sorted_notes.extend(current_line)
-
-        return sorted_notes + specials
+        """Estado no formato salvo, em ordem de leitura (linha por Y, depois X) - vem do documento"""
+        return self.scene.document.to_saved()
 
     def load_scene_data(self, data):
         """Carrega dados da cena"""
         log_info(f"Carregando {len(data)} itens para cena")
-        self.scene.clear()
         self.load_images_to_scene(self.current_image_paths)
 
         for d in data:
@@ -711,60 +727,96 @@ class MainWindow(QMainWindow):
             except Exception as e:
                 log_error(f"Erro ao carregar item: {d}", e)
 
+        self.on_model_changed()
         log_info(f"Cena carregada com sucesso")
 
+    def editable_items(self, items=None):
+        """Itens do usuario (notas, tags, cabecalho, compasso) - sem fundo nem fantasma"""
+        items = self.scene.items() if items is None else items
+        return [i for i in items if isinstance(i, (NoteItem, LabelItem, HeaderBoxItem, TimeSigBoxItem))]
+
     def delete_selected(self):
         """Deleta selecionados"""
-        count = len(self.scene.selectedItems())
-        log_info(f"Deletando {count} item(ns)")
-        for i in self.scene.selectedItems():
-            self.scene.removeItem(i)
-        self.save_state()
+        items = self.editable_items(self.scene.selectedItems())
+        log_info(f"Deletando {len(items)} item(ns)")
+        if items:
+            self.undo_stack.push(RemoveItemsCommand(self.scene, items, f"Excluir {len(items)} item(ns)"))
 
     def delete_specific_item(self, item):
         """Deleta item especifico"""
         log_debug(f"Deletando item: {item.tipo if hasattr(item, 'tipo') else 'desconhecido'}")
-        self.scene.removeItem(item)
-        self.save_state()
+        self.undo_stack.push(RemoveItemsCommand(self.scene, [item], "Excluir item"))
 
     def swap_item_type(self, item):
-        """Troca tipo de item"""
-        log_debug(f"Trocando tipo de item: {item.tipo}")
-        x, y = item.x(), item.y()
-        self.scene.removeItem(item)
-        self.add_item_at_mouse(self.view.mapToScene(self.view.mapFromGlobal(self.cursor().pos())))
+        """Troca tipo de item (no lugar, mantendo posicao e recorte)"""
+        log_debug(f"Trocando tipo de item: {item.tipo} -> {self.current_tool}")
+        if item.tipo != self.current_tool:
+            self.undo_stack.push(RetypeCommand(item, self.current_tool, f"Trocar por {self.current_tool}"))
 
     def open_individual_crop_dialog(self, item):
         """Abre dialogo de recorte individual"""
         from ui.dialogs import IndividualCropDialog
         log_info("Abrindo dialogo de recorte individual")
         d = IndividualCropDialog(item.custom_crop_params or {}, self)
-        d.exec()
-        item.custom_crop_params = d.result_data
-        item.update()
-
-    def save_state(self):
-        """Salva estado no historico"""
-        self.history.append(self.get_current_state())
-        self.history_pos += 1
-        log_debug(f"Estado salvo no historico (posicao: {self.history_pos})")
+        if d.exec() and d.result_data != item.custom_crop_params:
+            self.undo_stack.push(CropParamsCommand(item, d.result_data))
+
+    def begin_move(self):
+        """Guarda as posicoes dos selecionados no inicio de um arrasto"""
+        self.move_start = {i: i.pos() for i in self.editable_items(self.scene.selectedItems())}
+
+    def end_move(self):
+        """Fim do arrasto: registra um comando so com os itens que mudaram de lugar"""
+        moves = {i: (old, i.pos()) for i, old in self.move_start.items() if i.scene() is self.scene and i.pos() != old}
+        self.move_start = {}
+        if moves:
+            self.undo_stack.push(MoveItemsCommand(moves, f"Mover {len(moves)} item(ns)"))
+
+    def nudge_selected(self, dx, dy):
+        """Move os selecionados com as setas; toques seguidos viram um passo de desfazer"""
+        items = self.editable_items(self.scene.selectedItems())
+        if items:
+            moves = {i: (i.pos(), i.pos() + QPointF(dx, dy)) for i in items}
+            self.undo_stack.push(MoveItemsCommand(moves, "Mover com setas", merge=True))
+
+    def replace_box(self, removed, new_box):
+        """Caixa de cabecalho/compasso redesenhada: remove as anteriores e adiciona a nova, num passo so"""
+        if not removed and new_box is None:
+            return
+        self.undo_stack.beginMacro("Desenhar caixa")
+        if removed:
+            self.undo_stack.push(RemoveItemsCommand(self.scene, removed))
+        if new_box is not None:
+            self.undo_stack.push(AddItemsCommand(self.scene, [new_box]))
+        self.undo_stack.endMacro()
+
+    def reset_history(self):
+        """Historico novo (ao trocar de projeto/imagens: os itens antigos deixam de existir)"""
+        self.move_start = {}
+        self.undo_stack.clear()
 
     def undo(self):
         """Desfaz"""
-        if self.history_pos > 0:
-            self.history_pos -= 1
-            log_info(f"Desfazendo para posicao: {self.history_pos}")
-            self.load_scene_data(self.history[self.history_pos])
+        if self.undo_stack.canUndo():
+            log_info(f"Desfazendo: {self.undo_stack.undoText()}")
+            self.undo_stack.undo()
+
+    def redo(self):
+        """Refaz"""
+        if self.undo_stack.canRedo():
+            log_info(f"Refazendo: {self.undo_stack.redoText()}")
+            self.undo_stack.redo()
 
     def clear_all(self):
-        """Limpa tudo"""
+        """Limpa tudo (pode ser desfeito; o fundo nao e recarregado)"""
         log_info("Limpando cena")
-        self.scene.clear()
-        self.load_images_to_scene(self.current_image_paths)
+        items = self.editable_items()
+        if items:
+            self.undo_stack.push(RemoveItemsCommand(self.scene, items, "Limpar tudo"))
 
     def update_title(self):
         """Atualiza titulo"""
-        item_count = len(self.scene.items())
+        item_count = len(self.scene.document)
         self.setWindowTitle(f"Editor V32 - {item_count} itens")
         log_debug(f"Titulo atualizado: {item_count} itens")
 
@@ -862,6 +914,39 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, "Erro", f"Não foi possível salvar a imagem:\n{str(e)}")
 
 
+    def export_sheet_streaming(self):
+        """Exporta a folha em PDF, faixa por faixa (memoria limitada mesmo com muitas paginas)"""
+        log_info("Iniciando exportacao em faixas (PDF)")
+        if not self.current_image_paths:
+            QMessageBox.warning(self, "Aviso", "Nada para exportar.")
+            return
+
+        try:
+            os.makedirs(PREVIEW_FOLDER, exist_ok=True)
+        except Exception as e:
+            log_error(f"Erro ao criar pasta de previews: {PREVIEW_FOLDER}", e)
+            return
+
+        base_name = "preview"
+        if self.current_json_path:
+            base_name = os.path.splitext(os.path.basename(self.current_json_path))[0]
+        output_path = os.path.join(PREVIEW_FOLDER, f"{base_name}.pdf")
+
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            written = ImageRenderer(self.scene, self.current_image_paths).export_streaming(output_path)
+        except Exception as e:
+            log_error(f"Erro na exportacao em faixas para {output_path}", e)
+            QMessageBox.critical(self, "Erro", f"Não foi possível exportar:\n{str(e)}")
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+
+        if not written:
+            QMessageBox.warning(self, "Aviso", "Nada para exportar.")
+            return
+        QMessageBox.information(self, "Sucesso", f"PDF salvo na pasta de previews:\n{output_path}")
+
     def update_tool_display(self, tool_name):
         """Atualiza exibicao da ferramenta no painel direito"""
         log_debug(f"Atualizando ferramenta para: {tool_name}")
@@ -0,0 +1,4 @@
+# compartilhado - Modulos usados por mais de um app (Musical_editor, Hinario_Digital_WEB, Hinario_Digital).
+# Sem imports de nenhum app nem de Qt, e sem ler configuracao: quem chama passa os valores.
+# Importacao: so os scripts de entrada (main.py, render_all.py, benchmarks.py, scripts avulsos) poem a
+# raiz do repositorio no sys.path, ao lado da propria pasta; modulos de biblioteca nunca mexem no sys.path.
@@ -0,0 +1,68 @@
+# enhance.py - Contraste/cinza em uma unica passada por tabela (LUT)
+#
+# ImageEnhance.Contrast cria uma imagem "degenerada" (cinza medio), converte de modo, copia o alpha e
+# faz o blend - quatro imagens intermediarias por recorte. Aqui a mesma conta vira uma tabela de 256
+# valores aplicada com Image.point, direto no buffer de saida. Compensa nos recortes grandes e no
+# cinza (cabecalho, compasso, OCR); num recorte pequeno colorido (silaba) o histograma da media
+# custa mais que o blend e o renderer segue com ImageEnhance (benchmarks.py realce).
+# Usado pelo editor (rendering/layout.py) e pelo OCR do Hinario_Digital (extrairtexto.py).
+
+from functools import lru_cache
+from PIL import ImageChops
+
+
+@lru_cache(maxsize=256)
+def contrast_lut(mean, factor):
+    """Tabela equivalente a ImageEnhance.Contrast: mean + factor * (p - mean), truncado como no blend do Pillow"""
+    lut = []
+    for p in range(256):
+        v = mean + factor * (p - mean)
+        lut.append(0 if v <= 0 else 255 if v >= 255 else int(v))
+    return tuple(lut)
+
+
+def threshold_lut(lut, limiar):
+    """Compoe uma tabela com um limiar preto/branco (uma passada em vez de duas)"""
+    return tuple(0 if v < limiar else 255 for v in lut)
+
+
+def gray_mean(gray):
+    """Media de uma imagem L pelo histograma, arredondada como em ImageEnhance.Contrast"""
+    hist = gray.histogram()
+    total = sum(hist)
+    if not total:
+        return 0
+    return int(sum(i * c for i, c in enumerate(hist)) / total + 0.5)
+
+
+def band_lut(lut, mode):
+    """Replica a tabela para cada banda do modo; o alpha passa intacto"""
+    lut = list(lut)
+    if mode in ("L", "P", "1"):
+        return lut
+    table = []
+    for band in mode:
+        table += list(range(256)) if band == "A" else lut
+    return table
+
+
+def is_gray(img):
+    """Todos os pixels com R == G == B (alpha ignorado). Nesse caso converter para L antes do
+    resize/contraste da exatamente o mesmo resultado que converter no fim."""
+    if img.mode in ("L", "LA"):
+        return True
+    if img.mode not in ("RGB", "RGBA"):
+        return False
+    r, g, b = img.split()[:3]
+    return ImageChops.difference(r, g).getbbox() is None and ImageChops.difference(g, b).getbbox() is None
+
+
+def enhance_contrast(img, factor, grayscale=False):
+    """Contraste (e, com grayscale, cinza) num passo so, igual a ImageEnhance.Contrast(img).enhance(factor)
+    seguido de ImageOps.grayscale. Entrada L (ja convertida por ser cinza): so a tabela.
+    Devolve L no modo cinza - o paste converte ao colar na folha RGB."""
+    if img.mode == "L":
+        return img.point(list(contrast_lut(gray_mean(img), factor)))
+    lut = contrast_lut(gray_mean(img.convert("L")), factor)
+    out = img.point(band_lut(lut, img.mode))
+    return out.convert("L") if grayscale else out
@@ -0,0 +1,124 @@
+# font_registry.py - Fonte do renderer, unica para o editor e o player
+#
+# Fora das arvores dos apps e sem imports do projeto nem de Qt: o editor (PyQt6) e o player (PySide6)
+# importam daqui do mesmo jeito (compartilhado.font_registry, com a raiz do repositorio no sys.path
+# posta pelo script de entrada - ver compartilhado/__init__.py), entao os dois procuram os mesmos arquivos nas
+# mesmas pastas e chegam a mesma fonte na mesma maquina - o player carrega o arquivo resolvido no Qt.
+# A lista de arquivos vem da configuracao de cada app, passada por ele em FontRegistry.configure.
+# O log vai para o logger deste modulo; quem configura o logging e o ponto de entrada de cada app.
+
+import os
+import logging
+import threading
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+_REPO_DIR = Path(__file__).resolve().parents[1]
+
+# Arquivos tentados em ordem quando a configuracao nao diz outra coisa; o primeiro encontrado em
+# FONT_SEARCH_DIRS e usado
+FONT_FILES = ["arial.ttf", "Arial.ttf", "LiberationSans-Regular.ttf", "DejaVuSans.ttf", "FreeSans.ttf"]
+FONT_SEARCH_DIRS = [
+    _REPO_DIR / "Musical_editor" / "fonts",                    # fontes junto do projeto
+    _REPO_DIR / "Hinario_Digital_WEB" / "fonts",
+    Path(os.environ.get("WINDIR", r"C:\Windows")) / "Fonts",
+    Path.home() / "AppData" / "Local" / "Microsoft" / "Windows" / "Fonts",
+    Path("/usr/share/fonts"), Path("/usr/local/share/fonts"),
+    Path.home() / ".local" / "share" / "fonts", Path.home() / ".fonts",
+    Path("/Library/Fonts"), Path("/System/Library/Fonts"),
+]
+
+
+class FontRegistry:
+    """Fonte do renderer resolvida uma unica vez e objetos FreeType guardados por tamanho.
+
+    Procura os arquivos configurados (configure; padrao FONT_FILES), em ordem de preferencia, dentro
+    de FONT_SEARCH_DIRS, recursivamente, comparando o nome sem diferenciar maiusculas. Sem nenhum
+    arquivo encontrado, usa a fonte embutida do Pillow (load_default) - e isso so e descoberto e
+    registrado no log uma vez por configuracao.
+    """
+    _files = tuple(FONT_FILES)
+    _path = None
+    _resolved = False
+    _fonts = {}   # tamanho -> ImageFont
+    _lock = threading.Lock()
+
+    @classmethod
+    def configure(cls, font_files):
+        """Arquivos preferidos, da configuracao do app: lista ou texto separado por virgulas.
+        Vazio/None volta ao padrao FONT_FILES. Se a lista mudou, a fonte e resolvida de novo."""
+        if isinstance(font_files, str):
+            font_files = font_files.split(",")
+        files = tuple(f.strip() for f in (font_files or ()) if f and f.strip()) or tuple(FONT_FILES)
+        with cls._lock:
+            if files != cls._files:
+                cls._files = files
+                cls._path = None
+                cls._resolved = False
+                cls._fonts = {}
+
+    @classmethod
+    def _search(cls, files):
+        wanted = [name.lower() for name in files]
+        found = {}
+        for folder in FONT_SEARCH_DIRS:
+            if not os.path.isdir(folder):
+                continue
+            for root, _, names in os.walk(folder):
+                for f in names:
+                    key = f.lower()
+                    if key in wanted and key not in found:
+                        found[key] = os.path.join(root, f)
+                if wanted[0] in found:
+                    return found[wanted[0]]
+        for key in wanted:
+            if key in found:
+                return found[key]
+        # Ultima tentativa: o proprio Pillow (procura na pasta de fontes do sistema no Windows)
+        try:
+            from PIL import ImageFont
+        except ImportError:   # player sem Pillow: so as pastas valem
+            return None
+        for name in files:
+            try:
+                ImageFont.truetype(name, 10)
+                return name
+            except OSError:
+                pass
+        return None
+
+    @classmethod
+    def resolve(cls):
+        """Caminho da fonte escolhida (None = fonte embutida do Pillow)"""
+        with cls._lock:
+            if not cls._resolved:
+                cls._path = cls._search(cls._files)
+                cls._resolved = True
+                if cls._path:
+                    log.info(f"FontRegistry: usando fonte {cls._path}")
+                else:
+                    log.warning(f"FontRegistry: nenhuma de {list(cls._files)} encontrada, usando fonte embutida do Pillow")
+            return cls._path
+
+    @classmethod
+    def get(cls, size):
+        """ImageFont no tamanho pedido (criado uma vez por tamanho)"""
+        font = cls._fonts.get(size)
+        if font is not None:
+            return font
+        from PIL import ImageFont
+        path = cls.resolve()
+        font = None
+        if path:
+            try:
+                font = ImageFont.truetype(path, size)
+            except OSError as e:
+                log.warning(f"FontRegistry: falha ao abrir {path} ({e})")
+        if font is None:
+            try:
+                font = ImageFont.load_default(size)   # Pillow >= 10.1 escala a fonte embutida
+            except TypeError:
+                font = ImageFont.load_default()
+        with cls._lock:
+            return cls._fonts.setdefault(size, font)
@@ -0,0 +1,50 @@
+""" Tokenizador de texto silabado, compartilhado pelo player, editor e scripts do Hinario_Digital.
+    Sem dependências além da biblioteca padrão; todos importam como pacote (compartilhado.silabas). """
+import re
+from collections import namedtuple
+
+# Uma única varredura: pausa (__ pl, '' rc, _ pc, " rl), hífen de sílaba ou trecho de texto.
+# Espaços não casam com nenhum grupo e são pulados pelo finditer, como o \s+ do split antigo.
+RE_TOKEN = re.compile(r"""(?P<pausa>__|''|[_"])|(?P<hifen>-)|(?P<texto>(?:[^\s_"\-']|'(?!'))+)""")
+RE_VALIDO = re.compile(r"[\w',~\-.;:!?]")
+PONTUACAO = frozenset([",", ";", ".", "!", "?", ":"])
+SIMBOLOS_PAUSA = ("''", '"', "_", "__")
+TIPO_PAUSA = {"''": "rc", "_": "pc", '"': "rl", "__": "pl"}
+
+# texto como aparece no token; [inicio, fim) na linha original; pausa = '' para sílabas
+Silaba = namedtuple("Silaba", "texto inicio fim pausa")
+
+def tokenizar(linha, colar_pontuacao=False):
+    """ Tokens da linha com posição e tipo de pausa.
+        colar_pontuacao=True reproduz o modo do extrator (pontuação solta vai para a sílaba anterior). """
+    tokens = []
+    for m in RE_TOKEN.finditer(linha):
+        tipo = m.lastgroup; t = m.group()
+        if tipo == "pausa": tokens.append(Silaba(t, m.start(), m.end(), TIPO_PAUSA[t]))
+        elif tipo == "hifen":
+            # Pausa seguida de hífen ("_-") deixa de ser pausa, como no tokenizador antigo
+            if tokens: ult = tokens[-1]; tokens[-1] = Silaba(ult.texto + "-", ult.inicio, m.end(), "")
+            else: tokens.append(Silaba("-", m.start(), m.end(), ""))
+        elif colar_pontuacao:
+            if t in PONTUACAO:
+                if tokens and not tokens[-1].pausa: ult = tokens[-1]; tokens[-1] = Silaba(ult.texto + t, ult.inicio, m.end(), "")
+            else: tokens.append(Silaba(t, m.start(), m.end(), ""))
+        elif RE_VALIDO.search(t): tokens.append(Silaba(t, m.start(), m.end(), ""))
+    return tokens
+
+def get_syllable_tokens(text_line, _findall=RE_TOKEN.findall, _valido=RE_VALIDO.search):
+    """ Separa tokens (palavras e pausas). A vírgula é ignorada. """
+    lista_final = []
+    # findall devolve (pausa, hifen, texto) sem criar objetos Match: é o caminho quente do player
+    for pausa, hifen, texto in _findall(text_line):
+        if hifen:
+            if lista_final: lista_final[-1] += "-"
+            else: lista_final.append("-")
+        elif pausa: lista_final.append(pausa)
+        elif _valido(texto): lista_final.append(texto)
+    return lista_final
+
+def tokenizar_hino(hino_data, com_posicoes=False):
+    """ Tokeniza o hino inteiro de uma vez: [estrofe][linha] -> tokens (str, ou Silaba com com_posicoes). """
+    func = tokenizar if com_posicoes else get_syllable_tokens
+    return [[func(l.get('texto_silabado', '').strip()) for l in est.get('linhas', [])] for est in hino_data.get('estrofes', [])]